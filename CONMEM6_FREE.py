@@ -5,6 +5,7 @@ Script for free exploration in the Square and Circle contexts following the star
 
 Will ask for subject # as input.
 Make sure required 3D objects (osgb files, in the objects directory) in the assets folder and feedback smile images (tif files, in the smiles directory) are in the path. Note that the osgb files are too large to host on github; they are available on Mendeley Data (doi:10.17632/jvm3fhpjwn.1).
+Optimized copies of these assets can be built ahead of time with: python -m conmem.assets --src objects --src textures --src smiles; the script then loads them from assetcache/ automatically.
 No data are output.
 Participant's freely explore the square and circle contexts (in different trials), and manually advance between the contexts at their own pace
 Requires Vizard VR toolkit.
@@ -12,7 +13,6 @@ Requires Vizard VR toolkit.
 
 # Generic /Built-in
 import os
-import time
 
 #Other libs
 import viz
@@ -23,41 +23,51 @@ import vizproximity
 import vizshape
 import vizcam
 import numpy
-import vizinput
 import random
 
+from conmem.clock import sessionClock
+from conmem import session
+from conmem import assets
+from conmem import arena
+from conmem.overlay import Overlay
+
 # Owned
 __author__ = "Josh Julian"
 __license__ = "MIT"
 
 viz.fov(40)
-viz.setMultiSample(4)
-viz.go(viz.FULLSCREEN)
+if session.host is None: #a session host (CONMEM6_SESSION.py) has opened the window already
+	viz.setMultiSample(4)
+	viz.go(viz.FULLSCREEN)
 viz.mouse.setVisible(viz.OFF)
 viz.antialias = 4
 
+#models load once per file, in the background from here on, so the loads overlap the prompts and the instruction screen;
+#trees and boundary segments are clones sharing the loaded geometry
+modelCache = session.modelCache(['tree2.osgb', 'tree4.osgb', 'tree5.osgb', 'tree6.osgb', 'tree10.osgb', 'tree11.osgb', 'tree12.osgb', 'tree13.osgb', 'CIRCLE.osgb', 'SQUARE.osgb'])
+
 
 ###############
 ## VARIABLES ##
 ###############
 
 global subject
-subject = vizinput.input('What is the sub number?') 
+subject = session.askSubject('What is the sub number?')
 global runNum
 
 runs = 2
 ITI = 2
 
-subject = int(subject)
 
 ##env shape
 global radius
 radius = 14.5 #in meters, made global for convenience so be careful 
+collisionMode = 'mesh' #'mesh': Vizard collision against the boundary models; 'analytic': walls computed from the arena shape (conmem.arena)
 
 ##ground
 ground = vizshape.addPlane(size=(40.0,40.0),axis=vizshape.AXIS_Y)
 ground.setPosition(0,0,0)
-t1 = viz.addTexture('tex2.jpg',wrap=viz.REPEAT)
+t1 = viz.addTexture(assets.resolve('tex2.jpg'),wrap=viz.REPEAT)
 ground.texture(t1)
 ground.texmat( viz.Matrix.scale(20,20,1) )
 
@@ -97,29 +107,29 @@ def ContextGen(runNum):
 		global cue6
 		global cue7
 		global cue8
-		cue1 = viz.add('tree4.osgb')
+		cue1 = modelCache.add('tree4.osgb')
 		cue1.setPosition(-20,-10,70)
 		cue1.setScale([2,2,2])
-		cue2 = viz.add('tree6.osgb')
+		cue2 = modelCache.add('tree6.osgb')
 		cue2.setPosition(20,-1,-50)
 		cue2.setScale([3,3,3])
-		cue3 = viz.add('tree2.osgb')
+		cue3 = modelCache.add('tree2.osgb')
 		cue3.setPosition(20,-2,60)
 		cue3.setScale([3,3,3])
-		cue4 = viz.add('tree5.osgb') 
+		cue4 = modelCache.add('tree5.osgb') 
 		cue4.setPosition(-20,-1,-60)
 		cue4.setScale([3,3,3])
 
-		cue5 = viz.add('tree10.osgb')
+		cue5 = modelCache.add('tree10.osgb')
 		cue5.setPosition(60,0,20)
 		cue5.setScale([2.5,2.5,2.5])
-		cue6 = viz.add('tree11.osgb')
+		cue6 = modelCache.add('tree11.osgb')
 		cue6.setPosition(-60,0,-20)
 		cue6.setScale([5,5,5])
-		cue7 = viz.add('tree12.osgb')
+		cue7 = modelCache.add('tree12.osgb')
 		cue7.setPosition(60,-5,-20)
 		cue7.setScale([4,4,4])
-		cue8 = viz.add('tree13.osgb') 
+		cue8 = modelCache.add('tree13.osgb') 
 		cue8.setPosition(-60,-5,20)
 		cue8.setScale([4,4,4])
 
@@ -155,26 +165,26 @@ def ContextGen(runNum):
 		global boundary6
 		global boundary7
 		global boundary8
-		boundary1 = viz.add('CIRCLE.osgb')
+		boundary1 = modelCache.add('CIRCLE.osgb')
 		boundary1.setPosition(0.05,0,-0.05) 
-		boundary2 = viz.add('CIRCLE.osgb')
+		boundary2 = modelCache.add('CIRCLE.osgb')
 		boundary2.setEuler( [ 90, 0, 0 ] ) 
 		boundary2.setPosition(-0.05,0,-0.05) 
-		boundary3 = viz.add('CIRCLE.osgb')
+		boundary3 = modelCache.add('CIRCLE.osgb')
 		boundary3.setEuler( [ -90, 0, 0 ] ) 
 		boundary3.setPosition(0.05,0,0.05) 
-		boundary4 = viz.add('CIRCLE.osgb')
+		boundary4 = modelCache.add('CIRCLE.osgb')
 		boundary4.setEuler( [ 180, 0, 0 ] )
 		boundary4.setPosition(-0.05,0,0.05) 
-		boundary5 = viz.add('SQUARE.osgb')
+		boundary5 = modelCache.add('SQUARE.osgb')
 #		boundary5.setPosition(0.05,0,-0.05) 
-		boundary6 = viz.add('SQUARE.osgb')
+		boundary6 = modelCache.add('SQUARE.osgb')
 		boundary6.setEuler( [ 90, 0, 0 ] ) 
 #		boundary6.setPosition(-0.05,0,-0.05) 
-		boundary7 = viz.add('SQUARE.osgb')
+		boundary7 = modelCache.add('SQUARE.osgb')
 		boundary7.setEuler( [ -90, 0, 0 ] ) 
 #		boundary7.setPosition(0.05,0,0.05) 
-		boundary8 = viz.add('SQUARE.osgb')
+		boundary8 = modelCache.add('SQUARE.osgb')
 		boundary8.setEuler( [ 180, 0, 0 ] )
 #		boundary8.setPosition(-0.05,0,0.05) 
 
@@ -199,26 +209,32 @@ def ContextGen(runNum):
 		boundary3.visible(0)
 		boundary4.visible(0)
 		
+	arenaCollision.setShape(context)
 	return context
 
 
 ##lighting
-mylight = viz.addLight() 
+mylight = session.own(viz.addLight()) 
 mylight.enable() 
 mylight.position(0, 10, 0)
 mylight.spread(180) ##uniform ambient lighting 
 mylight.intensity(2.5)
 
 #setup keyboard controls
-vizcam.WalkNavigate(forward='w',
+session.own(vizcam.WalkNavigate(forward='w',
 						backward='s',
 						left='æ',
 						right='¨',
 						moveScale=1.1,
-						turnScale=0.35)
+						turnScale=0.35))
 
 #turn on collisions
-viz.collision(viz.ON)
+arenaCollision = arena.ArenaCollision(viz.MainView, radius=radius)
+if collisionMode == 'analytic':
+	#after navigation, before the pose is sampled
+	session.onupdate(viz.PRIORITY_LAST_UPDATE - 1, arenaCollision.update)
+else:
+	session.collision(viz.ON)
 
 #######################
 ## PROXIMITY MANAGER ##
@@ -226,7 +242,7 @@ viz.collision(viz.ON)
 
 ##Create proximity manager
 global manager
-manager = vizproximity.Manager()
+manager = session.own(vizproximity.Manager())
 
 #Add main viewpoint as proximity target'
 global target
@@ -247,6 +263,10 @@ def pol2cart(rho, phi):
 ## INSTRUCTIONS ##
 ##################
 
+#text node for scene 2 is created once here and reused by StartRun()
+global overlay
+overlay = Overlay(2, feedback=False)
+
 def StartRun(runNum,openMess,closeMess):
 	
 	if openMess:
@@ -257,37 +277,25 @@ def StartRun(runNum,openMess,closeMess):
 			con = 1
 		Message = 'Press t to start exploration of Arena ' + str(con)
 		#info
-		info = viz.addText(Message,viz.SCREEN,scene=2)
-		info.fontSize(36)
-		info.color(viz.WHITE)
-		info.setPosition([0.3,0.5,0])
-		info.visible(1)
+		overlay.showText(Message,[0.3,0.5,0])
 
 		#wait for response
 		yield viztask.waitKeyDown(['t','T'])
-		info.visible(0)
+		overlay.hideText()
 		yield viztask.waitTime(ITI-1)
 	else: 
 		viz.MainWindow.setScene(2)
 		Message = 'Good job!'
 		#info
-		info = viz.addText(Message,viz.SCREEN,scene=2)
-		info.fontSize(36)
-		info.color(viz.WHITE)
-		info.setPosition([0.4,0.5,0])
-		info.visible(1)
+		overlay.showText(Message,[0.4,0.5,0])
 		yield viztask.waitTime(ITI)
-		info.visible(0)
+		overlay.hideText()
 		if closeMess:
 			Message = 'Free Exploration Complete. Please get experimenter'
 			#info
-			info = viz.addText(Message,viz.SCREEN,scene=2)
-			info.fontSize(36)
-			info.color(viz.WHITE)
-			info.setPosition([0.3,0.5,0])
-			info.visible(1)
+			overlay.showText(Message,[0.3,0.5,0])
 			yield viztask.waitTime(ITI)
-			info.visible(0)
+			overlay.hideText()
 
 #####################################
 #######FREE PHASE FUNCTION #######
@@ -314,10 +322,14 @@ def EXPERIMENT(ITI,runs):
 		runNum = r+1
 		context = ContextGen(runNum)
 		yield StartRun(runNum,1,0)
+		#readiness barrier: no trial starts before every model has loaded
+		yield modelCache.waitReady()
+		if runNum == 1:
+			print('Info: ' + modelCache.report())
 		yield Replace()
 
 	yield StartRun(runNum,0,1)
-	viz.quit()
+	session.quit()
 
 
 ##################################
@@ -325,9 +337,8 @@ def EXPERIMENT(ITI,runs):
 ##################################
 
 ##LAUNCH EXPERIMENT####
-global startTime
-startTime = time.clock()
-viztask.schedule( EXPERIMENT(ITI,runs))
+sessionClock.markSession()
+session.schedule( EXPERIMENT(ITI,runs))
 
 
 
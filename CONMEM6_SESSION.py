@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+
+"""
+Script for running a whole Squircle session in one Vizard process: free exploration, training, then the fMRI test runs.
+
+Will ask for subject # as input, once; the test run numbers come from the phases list below.
+Opens the window and starts loading every model once, then runs CONMEM6_FREE.py, CONMEM6_TRAIN.py and CONMEM6_TEST.py (one per scan run)
+in turn, each as if launched on its own (same data files, same per-run state), but without reopening the window or loading the models
+again, so the next phase or scan run is ready in milliseconds (see conmem.session). Each phase ends where the script would have quit.
+To resume a session part way through, set firstPhase to the index in phases to start from.
+Make sure required 3D objects, feedback smile images and textures are in the path, as for the other scripts.
+Requires Vizard VR toolkit.
+"""
+
+# Generic /Built-in
+import os
+
+#Other libs
+import viz
+import viztask
+import vizinput
+
+from conmem import session
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+viz.fov(40)
+viz.setMultiSample(4)
+viz.go(viz.FULLSCREEN)
+viz.mouse.setVisible(viz.OFF)
+viz.antialias = 4
+
+#every model the three scripts place, loaded once in the background for the whole session
+modelCache = session.modelCache(['tree2.osgb', 'tree4.osgb', 'tree5.osgb', 'tree6.osgb', 'tree10.osgb', 'tree11.osgb', 'tree12.osgb', 'tree13.osgb', 'CIRCLE.osgb', 'SQUARE.osgb'] +
+	['cone.osgb', 'beachball.osgb', 'plant.osgb', 'pumpkin.osgb'])
+
+
+###############
+## VARIABLES ##
+###############
+
+subject = int(vizinput.input('What is the sub number?'))
+
+testRuns = 4
+#(script, test run number) in order
+phases = [('CONMEM6_FREE.py', None), ('CONMEM6_TRAIN.py', None)] + [('CONMEM6_TEST.py', run) for run in range(1, testRuns + 1)]
+firstPhase = 0
+
+
+##########################
+#!! SESSION PHASE LOOP !!#
+##########################
+def SESSION(phases):
+
+	for script, runNum in phases:
+		yield host.run(script, runNum)
+
+	print('Info: ' + host.report())
+	viz.quit()
+
+
+##LAUNCH SESSION####
+host = session.Session(subject, modelCache, os.path.dirname(os.path.abspath(__file__)))
+session.host = host
+viztask.schedule( SESSION(phases[firstPhase:]))
+viz.callback(viz.EXIT_EVENT, host.close)
@@ -5,9 +5,14 @@ Script for Squircle contextual memory behavioral task used during fMRI scanning.
 
 Script needs to be run separately for each scan run, and will ask for subject # and run #s as input.
 Make sure required 3D objects (osgb files, in the objects directory), feedback smile images (tif files, in the smiles directory), and textures (jpg, in the textures directory) are in the path. Note that the osgb files are too large to host on github; they are available on Mendeley Data (they are available on Mendeley Data (doi:10.17632/jvm3fhpjwn.1). 
-Data are output as text files in the dpath directory, defined below (line 51). It's currently set as '..\Data\TestingData\\', and this directory must exist.
-Output files are named TEST_tracking_<subject number>_<runNum number>.txt.
-Output files have four columns: [time since session start, x-pos, y-pos, and orientation], and each trial's start, end, and target object are indicated in separate rows.
+Optimized copies of these assets can be built ahead of time with: python -m conmem.assets --src objects --src textures --src smiles; the script then loads them from assetcache/ automatically.
+Data are output in the dpath directory, defined below in the OPEN DATA FILE section. It's currently set as ../Data/TestingData/ (built with os.path.join), and this directory must exist.
+Output files are named TEST_tracking_<subject number>_<runNum number>.trk (binary, the default logFormat) or .txt (logFormat = 'text').
+Binary files are converted to the text layout with: python -m conmem.tracklog <file>.trk
+Output files have four columns: [time since the scanner trigger (seconds, from the conmem.clock monotonic clock; negative before the trigger), x-pos, y-pos, and orientation], and each trial's start, end, and target object are indicated in separate rows.
+A 'Rotation, <start>, <end>' row after each replace sweep gives the times the 360 deg rotation actually started and ended (rotationDuration sets its length).
+Pose is sampled on every rendered frame into a ring buffer (conmem.framesample) and written to the file at trial boundaries.
+Frame start/end times, per-phase frame-interval histograms and missed vsync deadlines (conmem.frameprofile) are saved next to it as TEST_tracking_<subject number>_<runNum number>.frames.npz.
 Participants controlled movement in the VR environment using a button box. The mapping between the button box and movements is defined in lines 231-240
 Note that for distal cue counterbalancing, distal cues need to be manually flipped across contexts (lines 111-167)
 Requires Vizard VR toolkit.
@@ -15,19 +20,27 @@ Requires Vizard VR toolkit.
 """
 # Generic /Built-in
 import os
-import time
 
 #Other libs
 import viz
 import viztask
-import vizact
 import vizinfo
 import vizproximity
 import vizshape
 import vizcam
 import numpy
-import vizinput
-import random
+
+from conmem import tracklog
+from conmem import framesample
+from conmem import frameprofile
+from conmem import sweep
+from conmem.clock import sessionClock
+from conmem import session
+from conmem import assets
+from conmem import arena
+from conmem import scoring
+from conmem import schedule
+from conmem.overlay import Overlay, SceneSizeCheck
 
 # Owned
 __author__ = "Josh Julian"
@@ -35,10 +48,15 @@ __license__ = "MIT"
 
 
 viz.fov(40)
-viz.setMultiSample(4)
-viz.go(viz.FULLSCREEN)
+if session.host is None: #a session host (CONMEM6_SESSION.py) has opened the window already
+	viz.setMultiSample(4)
+	viz.go(viz.FULLSCREEN)
 viz.mouse.setVisible(viz.OFF)
 viz.antialias = 4
+
+#models load once per file, in the background from here on, so the loads overlap the prompts and the instruction screen;
+#trees and boundary segments are clones sharing the loaded geometry
+modelCache = session.modelCache(['tree2.osgb', 'tree4.osgb', 'tree5.osgb', 'tree6.osgb', 'tree10.osgb', 'tree11.osgb', 'tree12.osgb', 'tree13.osgb', 'CIRCLE.osgb', 'SQUARE.osgb'])
 viz.vsync(viz.ON)
 
 ###################
@@ -46,21 +64,24 @@ viz.vsync(viz.ON)
 ###################
 
 global runNum
-subject = vizinput.input('What is the sub number?') 
-runNum = vizinput.input('What is the run rumber?') 
-dpath = '..\Data\TestingData\\'
-runNum = int(runNum)
+subject = session.askSubject('What is the sub number?')
+runNum = session.askRun('What is the run rumber?')
+dpath = os.path.join('..','Data','TestingData','')
+logFormat = 'binary' #'binary' buffers fixed-width records and writes them in blocks, 'text' writes the tab-separated file directly
 runLength = 8.075*60 #in seconds
 
-fname = dpath + 'TEST_tracking_'+str(subject)+'_'+ str(runNum)+'.txt'
+fname = tracklog.trackFileName(dpath + 'TEST_tracking_'+str(subject)+'_'+ str(runNum), logFormat)
 
 ###check for existing data file <-uncomment for actual testing, along with input function above
+#(the run is then not started, and its data file and schedule are left as they are)
 if os.path.isfile(fname):
 	print('file name already exists')
-	viz.quit()
+	session.quit()
+	#stop the script here, before the schedule is written or the scene built
+	raise SystemExit
 
 #open data file
-tracking_data = open(fname, 'a')
+tracking_data = tracklog.openTrackWriter(fname, logFormat, background=True)
 
 
 
@@ -70,18 +91,35 @@ tracking_data = open(fname, 'a')
 
 #tuple of test objects
 TestObjects = ['cone', 'beachball', 'plant','pumpkin']
-TestObjectLocs = [[(-4,0.07,9),(2,0.29,5),(-7,0.07,-4),(10,0.05,-5)] , [(4,0.07,9),(-2,0.29,5),(7,0.07,-4),(-10,0.05,-5)]]
+#[context][object] = (x, y, z), context 1 = circle, 2 = square; defined once in conmem.scoring, which scores the replace errors
+TestObjectLocs = scoring.OBJECT_LOCS
 scaleFactors = [0.15,1.8,1.25,1.8]
 
 #trials per object
 trials_per_context = 20 #just generate a lot, as participants won't get through this many / run
 
+#context/object schedule: use the one written ahead of the session (python -m conmem.schedule) if there is one,
+#otherwise generate it now, before the trigger, and save it next to the data file
+scheduleName = schedule.scheduleFileName(dpath, subject, runNum)
+if os.path.isfile(scheduleName):
+	C, Trials = schedule.loadSchedule(scheduleName)
+else:
+	#same streams as the CLI, from a fresh seed that is saved with the schedule: --seed <it> writes the same file
+	seed = schedule.newSeed()
+	C, Trials = schedule.makeSchedule(trials_per_context, [seed, subject, runNum])
+	schedule.saveSchedule(scheduleName, C, Trials, 'seed %d subject %d run %d (generated at launch)' % (seed, subject, runNum))
+C = C.tolist()
+Trials = Trials.tolist()
+
 #timing
 ITI=2 #intertrial interval, in seconds
+rotationDuration = 12 #length of the 360 deg sweep at the start of each replace, in seconds (was 720 frames, i.e. 12 s at 60 Hz)
+refreshRate = 60 #display refresh rate in Hz (vsync is on); frames longer than 1.5 refreshes count as missed deadlines
 
 ##env shape
 global radius
 radius = 14.5 #in meters, made global for convenience so be careful 
+collisionMode = 'mesh' #'mesh': Vizard collision against the boundary models; 'analytic': walls computed from the arena shape (conmem.arena)
 
 ##############################
 ## ENVIRONMENT AND CONTROLS ##
@@ -90,7 +128,7 @@ radius = 14.5 #in meters, made global for convenience so be careful
 ##ground
 ground = vizshape.addPlane(size=(40.0,40.0),axis=vizshape.AXIS_Y)
 ground.setPosition(0,0,0)
-t1 = viz.addTexture('tex2.jpg',wrap=viz.REPEAT)
+t1 = viz.addTexture(assets.resolve('tex2.jpg'),wrap=viz.REPEAT)
 ground.texture(t1)
 ground.texmat( viz.Matrix.scale(20,20,1) )
 
@@ -108,120 +146,122 @@ ground3.texmat( viz.Matrix.scale(20,20,1) )
 viz.clearcolor(0.1, 0.1, 0.2)
 
 
+#each tree and boundary file was loaded once (see modelCache above); its placements, in this scene or another, are clones
+
 ##distal cues: add some trees
 
 #scene 1 is circle world
-cue1 = viz.add('tree4.osgb')
+cue1 = modelCache.add('tree4.osgb')
 cue1.setPosition(-20,-10,70)
 cue1.setScale([2,2,2])
-cue2 = viz.add('tree6.osgb')
+cue2 = modelCache.add('tree6.osgb')
 cue2.setPosition(20,-1,-50)
 cue2.setScale([3,3,3])
-cue5 = viz.add('tree10.osgb')
+cue5 = modelCache.add('tree10.osgb')
 cue5.setPosition(60,0,20)
 cue5.setScale([2.5,2.5,2.5])
-cue6 = viz.add('tree11.osgb')
+cue6 = modelCache.add('tree11.osgb')
 cue6.setPosition(-60,0,-20)
 cue6.setScale([5,5,5])
 
 
 # scene 2 is square world
-cue3 = viz.add('tree2.osgb',scene=viz.Scene2)
+cue3 = modelCache.add('tree2.osgb',scene=viz.Scene2)
 cue3.setPosition(20,-2,60)
 cue3.setScale([3,3,3])
-cue4 = viz.add('tree5.osgb',scene=viz.Scene2)
+cue4 = modelCache.add('tree5.osgb',scene=viz.Scene2)
 cue4.setPosition(-20,-1,-60)
 cue4.setScale([3,3,3])
-cue7 = viz.add('tree12.osgb',scene=viz.Scene2)
+cue7 = modelCache.add('tree12.osgb',scene=viz.Scene2)
 cue7.setPosition(60,-5,-20)
 cue7.setScale([4,4,4])
-cue8 = viz.add('tree13.osgb',scene=viz.Scene2) 
+cue8 = modelCache.add('tree13.osgb',scene=viz.Scene2) 
 cue8.setPosition(-60,-5,20)
 cue8.setScale([4,4,4])
 
 #scene 3 is squircle
-cue9 = viz.add('tree4.osgb',scene=viz.Scene3)
+cue9 = modelCache.add('tree4.osgb',scene=viz.Scene3)
 cue9.setPosition(-20,-10,70)
 cue9.setScale([2,2,2])
-cue10 = viz.add('tree6.osgb',scene=viz.Scene3)
+cue10 = modelCache.add('tree6.osgb',scene=viz.Scene3)
 cue10.setPosition(20,-1,-50)
 cue10.setScale([3,3,3])
-cue11 = viz.add('tree2.osgb',scene=viz.Scene3)
+cue11 = modelCache.add('tree2.osgb',scene=viz.Scene3)
 cue11.setPosition(20,-2,60)
 cue11.setScale([3,3,3])
-cue12 = viz.add('tree5.osgb',scene=viz.Scene3) 
+cue12 = modelCache.add('tree5.osgb',scene=viz.Scene3) 
 cue12.setPosition(-20,-1,-60)
 cue12.setScale([3,3,3])
-cue13 = viz.add('tree10.osgb',scene=viz.Scene3)
+cue13 = modelCache.add('tree10.osgb',scene=viz.Scene3)
 cue13.setPosition(60,0,20)
 cue13.setScale([2.5,2.5,2.5])
-cue14 = viz.add('tree11.osgb',scene=viz.Scene3)
+cue14 = modelCache.add('tree11.osgb',scene=viz.Scene3)
 cue14.setPosition(-60,0,-20)
 cue14.setScale([5,5,5])
-cue15 = viz.add('tree12.osgb',scene=viz.Scene3)
+cue15 = modelCache.add('tree12.osgb',scene=viz.Scene3)
 cue15.setPosition(60,-5,-20)
 cue15.setScale([4,4,4])
-cue16 = viz.add('tree13.osgb',scene=viz.Scene3) 
+cue16 = modelCache.add('tree13.osgb',scene=viz.Scene3) 
 cue16.setPosition(-60,-5,20)
 cue16.setScale([4,4,4])
 
 ##add boundary
 
 #context 1 is circle world 
-boundary1 = viz.add('CIRCLE.osgb')
+boundary1 = modelCache.add('CIRCLE.osgb')
 boundary1.setPosition(0.05,0,-0.05) 
-boundary2 = viz.add('CIRCLE.osgb')
+boundary2 = modelCache.add('CIRCLE.osgb')
 boundary2.setPosition(-0.05,0,-0.05) 
 boundary2.setEuler( [ 90, 0, 0 ] ) 
-boundary3 = viz.add('CIRCLE.osgb')
+boundary3 = modelCache.add('CIRCLE.osgb')
 boundary3.setEuler( [ -90, 0, 0 ] ) 
 boundary3.setPosition(0.05,0,0.05) 
-boundary4 = viz.add('CIRCLE.osgb')
+boundary4 = modelCache.add('CIRCLE.osgb')
 boundary4.setEuler( [ 180, 0, 0 ] ) 
 boundary4.setPosition(-0.05,0,0.05) 
 
 #context 2 is square world - may need to adjust x,y positions slightly to get rid of line between segments (this seems monitor dependent)
-boundary5 = viz.add('SQUARE.osgb',scene=viz.Scene2)
+boundary5 = modelCache.add('SQUARE.osgb',scene=viz.Scene2)
 boundary5.setPosition(0.0001,0,-0.0001) 
-boundary6 = viz.add('SQUARE.osgb',scene=viz.Scene2)
+boundary6 = modelCache.add('SQUARE.osgb',scene=viz.Scene2)
 boundary6.setEuler( [ 90, 0, 0 ] ) 
 boundary6.setPosition(-0.0001,0,-0.00010) 
-boundary7 = viz.add('SQUARE.osgb',scene=viz.Scene2)
+boundary7 = modelCache.add('SQUARE.osgb',scene=viz.Scene2)
 boundary7.setEuler( [ -90, 0, 0 ] ) 
 boundary7.setPosition(0.0001,0,0.00010) 
-boundary8 = viz.add('SQUARE.osgb',scene=viz.Scene2)
+boundary8 = modelCache.add('SQUARE.osgb',scene=viz.Scene2)
 boundary8.setEuler( [ 180, 0, 0 ] )
 boundary8.setPosition(-0.0001,0,0.0001) 
 
 #context 3 is squircle world 
-boundary9 = viz.add('CIRCLE.osgb',scene=viz.Scene3)
+boundary9 = modelCache.add('CIRCLE.osgb',scene=viz.Scene3)
 boundary9.setPosition(0.05,0,-0.05) 
-boundary10 = viz.add('SQUARE.osgb',scene=viz.Scene3)
+boundary10 = modelCache.add('SQUARE.osgb',scene=viz.Scene3)
 boundary10.setEuler( [ 90, 0, 0 ] ) 
 boundary10.setPosition(-0.05,0,-0.05) 
-boundary11 = viz.add('SQUARE.osgb',scene=viz.Scene3)
+boundary11 = modelCache.add('SQUARE.osgb',scene=viz.Scene3)
 boundary11.setEuler( [ -90, 0, 0 ] ) 
 boundary11.setPosition(0.05,0,0.05) 
-boundary12 = viz.add('CIRCLE.osgb',scene=viz.Scene3)
+boundary12 = modelCache.add('CIRCLE.osgb',scene=viz.Scene3)
 boundary12.setEuler( [ 180, 0, 0 ] ) 
 boundary12.setPosition(-0.05,0,0.05) 
 
 
 ##lighting
 intense = 2.5
-mylight = viz.addLight() 
+mylight = session.own(viz.addLight()) 
 mylight.enable() 
 mylight.position(0, 10, 0)
 mylight.spread(180) ##uniform ambient lighting 
 mylight.intensity(intense)
 
-mylight2 = viz.addLight(scene=viz.Scene2) 
+mylight2 = session.own(viz.addLight(scene=viz.Scene2)) 
 mylight2.enable() 
 mylight2.position(0, 10, 0)
 mylight2.spread(180) ##uniform ambient lighting 
 mylight2.intensity(intense)
 
-mylight3 = viz.addLight(scene=viz.Scene3) 
+mylight3 = session.own(viz.addLight(scene=viz.Scene3)) 
 mylight3.enable() 
 mylight3.position(0, 10, 0)
 mylight3.spread(180) ##uniform ambient lighting 
@@ -229,7 +269,7 @@ mylight3.intensity(intense)
 
 
 #setup keyboard controls
-vizcam.KeyboardCamera(forward='c',
+session.own(vizcam.KeyboardCamera(forward='c',
 						turnRight='d',
 						turnLeft='b',
 						backward='´',
@@ -237,11 +277,16 @@ vizcam.KeyboardCamera(forward='c',
 						right='¨',
 						moveMode=viz.REL_LOCAL,
 						moveScale=1.1,
-						turnScale=0.45)
+						turnScale=0.45))
 
 
 #turn on collisions
-viz.collision(viz.ON)
+arenaCollision = arena.ArenaCollision(viz.MainView, radius=radius)
+if collisionMode == 'analytic':
+	#after navigation, before the pose is sampled
+	session.onupdate(viz.PRIORITY_LAST_UPDATE - 1, arenaCollision.update)
+else:
+	session.collision(viz.ON)
 
 #######################
 ## PROXIMITY MANAGER ##
@@ -249,7 +294,7 @@ viz.collision(viz.ON)
 
 ##Create proximity manager
 global manager
-manager = vizproximity.Manager()
+manager = session.own(vizproximity.Manager())
 
 #Add main viewpoint as proximity target'
 global target
@@ -267,49 +312,42 @@ def pol2cart(rho, phi):
 
 
 def computeError(corrLoc,actualLoc):
-	error = numpy.sqrt(numpy.square(corrLoc[0]-actualLoc[0])+numpy.square(corrLoc[2]-actualLoc[2]))
+	error = scoring.replaceError(corrLoc,actualLoc)
 	return(error)
 
 
 ##################
 ## INSTRUCTIONS ##
 ##################
+#text and feedback nodes for scene 4 are created once here and reused every trial
+global overlay
+overlay = Overlay(4)
+sceneCheck = SceneSizeCheck()
+
 def Instruction(objName,ITI,endMessage):
 
 		viz.MainWindow.setScene(4)
+		frameProfiler.phase('instruction')
+		#write out the samples buffered during the last phase
+		getData()
+		sceneCheck.sample()
 
 		if endMessage!=1:
 			collectMessage = 'Replace ' + objName
 			#info
-			info = viz.addText(collectMessage,viz.SCREEN,scene=4)
-			info.fontSize(36)
-			info.color(viz.WHITE)
-			info.setPosition([0.4,0.5,0])
-			info.visible(1)
+			overlay.showText(collectMessage,[0.4,0.5,0])
 
 			#wait for iti
 			yield viztask.waitTime(ITI)
 			yield viztask.waitTime(numpy.random.randint(4)) #add random jitter, eventually add a wait for t here as well
-			info.visible(0)
+			overlay.hideText()
 		else:
 			error = objName
-			threshold = [3,5,7,9]
-			if error < threshold[0]:
-				feedback = 1
-			elif error > threshold[0] and error < threshold[1]:
-				feedback = 2
-			elif error > threshold[1] and error < threshold[2]:
-				feedback = 3
-			elif error > threshold[2] and error < threshold[3]:
-				feedback = 4
-			elif error > threshold[3]:
-				feedback = 5
-			smile = viz.add('smile' + str(feedback) + '.tif')
-			feed = viz.addTexQuad(parent=viz.SCREEN,scene=4,size=[500,400])
-			feed.setPosition([0.5, 0.5, 0]) #put quad in view 
-			feed.texture(smile)
+			#feedback level (1-5, thresholds [3,5,7,9]) from conmem.scoring, shared with TRAIN
+			feedback = scoring.feedbackLevel(error)
+			overlay.showFeedback(feedback)
 			yield viztask.waitTime(ITI+2)
-			viz.quit()
+			session.quit()
 
 
 
@@ -319,22 +357,21 @@ def Instruction(objName,ITI,endMessage):
 def Replace(context):
 
 		viz.MainWindow.setScene(context)
+		arenaCollision.setShape(context)
 
 		#teleport to new location each trial
 		x , y = pol2cart(numpy.random.randint(10,radius), numpy.random.randint(0,360))
 		viz.MainView.setPosition(x,0,y)
-        startAng = numpy.random.randint(0,360)
-		viz.MainView.setEuler(startAng,0,0)
+		startAng = numpy.random.randint(0,360)
 
-		#ADD rotation here
-		deg = 0
-		while deg < 360:
-			viz.MainView.setPosition(x,0,y) 
-			viz.MainView.setEuler(startAng + deg,0,0)
-			deg = deg + 0.5
-			yield viztask.waitTime(1 / 720)
+		#rotate once through 360 deg in rotationDuration seconds; yaw follows the clock, so the sweep is the same length on any display
+		frameProfiler.phase('rotation')
+		rotation.start(startAng)
+		yield rotation.wait()
+		frameSampler.mark('Rotation, ' + str(sessionClock.seconds(rotation.startTime)) + ', ' + str(sessionClock.seconds(rotation.endTime)))
 
 		#wait for response
+		frameProfiler.phase('response')
 		yield viztask.waitKeyDown(['a','A'])
 
 
@@ -343,67 +380,31 @@ def Replace(context):
 #####################################
 def WaitForTrig(Quick):
 
+	frameProfiler.phase('trigger')
 	if Quick!=1:
 		viz.MainWindow.setScene(4)
 		#wait for trigger
 		message= 'Run ' + str(runNum) +', waiting for T'
-		waitT = viz.addText(message,viz.SCREEN,scene=4)
-		waitT.fontSize(18)
-		waitT.color(viz.RED)
-		waitT.setPosition([0,0,0])
-		waitT.visible(1)
+		overlay.showText(message,[0,0,0],18,viz.RED)
 		yield viztask.waitKeyDown(['s','S']) #trigger
-		waitT.visible(0)
-		startTime = time.clock()
+		overlay.hideText()
+		sessionClock.markRun() #run epoch is the trigger; all tracking times are relative to it
 
 	else: 
 		yield viztask.waitKeyDown(['s','S']) #trigger
+		sessionClock.markRun()
 
 
 ##############################
 #!! MAIN EXPERIMENTAL LOOP !!#
 ##############################
-def EXPERIMENT(trials_per_context,TestObjects,TestObjectLocs,ITI,scaleFactors,runLength):
-
-	#replace phases
-	Trials = []
-	C = []
-
-	c1 = [0, 0, 0, 0]
-	c2 = c1
-	c3 = c1
-	for n in range(trials_per_context):
-		if n%2==1: 
-			tmp = numpy.random.permutation(3)+1
-		else:
-			tmp = numpy.random.permutation(2)+1
-		C = C+tmp.tolist()
-
-		for t in tmp.tolist():
-
-			if t==1:
-				min_n = min(c1)
-				min_objs = [i for i, x in enumerate(c1) if x == min_n]
-				obj = min_objs[random.randint(0,len(min_objs)-1)]
-				c1[obj]=c1[obj]+1
-
-			elif t==2:
-				min_n = min(c2)
-				min_objs = [i for i, x in enumerate(c2) if x == min_n]
-				obj = min_objs[random.randint(0,len(min_objs)-1)]
-				c2[obj]=c2[obj]+1
-
-			else:
-				min_n = min(c3)
-				min_objs = [i for i, x in enumerate(c3) if x == min_n]
-				obj = min_objs[random.randint(0,len(min_objs)-1)]
-				c3[obj]=c3[obj]+1
-
-			Trials = Trials + [obj]
-
+def EXPERIMENT(C,Trials,TestObjects,TestObjectLocs,ITI,scaleFactors,runLength):
 
 	#allocate replaceError array and wait for trigger
 	replaceError = []
+	#readiness barrier: the models have been loading since launch; no trial starts before they are all in
+	yield modelCache.waitReady()
+	print('Info: ' + modelCache.report())
 	yield WaitForTrig(0)
 
 	count = 0;
@@ -427,8 +428,9 @@ def EXPERIMENT(trials_per_context,TestObjects,TestObjectLocs,ITI,scaleFactors,ru
 
 		#show instructions
 		yield Instruction(objName,ITI,0)
-		data = 'Start replace, ' + Cname + '\n' 
-		tracking_data.write(data)
+		sessionClock.markTrial()
+		frameProfiler.nextTrial()
+		frameSampler.mark('Start replace, ' + Cname)
 
 		#replace phase
 		yield Replace(context)
@@ -437,8 +439,7 @@ def EXPERIMENT(trials_per_context,TestObjects,TestObjectLocs,ITI,scaleFactors,ru
 			error = computeError(viz.MainView.getPosition(),objLoc)
 
 		if context !=3:
-			data = 'Replaced ' + Cname + ', ' + objName + ', ' + str(error) + '\n' 
-			tracking_data.write(data)
+			frameSampler.mark('Replaced ' + Cname + ', ' + objName + ', ' + str(error))
 			replaceError.append(error) #store replace error in a list, just to compute the mean at the end
 		else:
 			TOL = TestObjectLocs[0]
@@ -449,17 +450,18 @@ def EXPERIMENT(trials_per_context,TestObjects,TestObjectLocs,ITI,scaleFactors,ru
 			objLoc = TOL[nn]
 			error2 = computeError(pos,objLoc)
 			if error1 < error2: 
-				data = 'Replaced squircle, ' + objName + ', ' + str(1) + ', ' + str(error1) + ', ' + str(error2) + '\n'
+				data = 'Replaced squircle, ' + objName + ', ' + str(1) + ', ' + str(error1) + ', ' + str(error2)
 			else:
-				data = 'Replaced squircle, ' + objName + ', ' + str(2) + ', ' + str(error1) + ', ' + str(error2) + '\n'
-			tracking_data.write(data)
+				data = 'Replaced squircle, ' + objName + ', ' + str(2) + ', ' + str(error1) + ', ' + str(error2)
+			frameSampler.mark(data)
 
 		count += 1
 
 		#show end message
-		if time.clock() - startTime >= runLength:
+		if sessionClock.run() >= runLength:
 			objName = numpy.mean(replaceError) #not really object name, actually average error for end message
 			yield Instruction(objName,ITI,1)
+			return
 
 
 
@@ -468,22 +470,33 @@ def EXPERIMENT(trials_per_context,TestObjects,TestObjectLocs,ITI,scaleFactors,ru
 ##WRITE OUT PATH DATA FUNCTION####
 ##################################
 
-#Get the tracking data. 
+#Pose is recorded every frame into frameSampler's ring buffer, and event rows are queued there with frameSampler.mark().
+#getData() writes everything buffered so far to the tracking file. It is only called at trial boundaries (Instruction() ITIs), never from the frame loop.
 def getData():
-	orientation = viz.MainView.getEuler()
-	position = viz.MainView.getPosition()
-	currTime = time.clock()
-	#Make a string out of the data. 
-	data = str(currTime-startTime) + '\t' + str(position[0]) + '\t' + str(position[2]) + '\t' +str(orientation[0]) + '\n' 
-	#Write it to the tracking file.
-	tracking_data.write(data)
+	frameSampler.drain(tracking_data)
+
+#Write out whatever is still buffered when Vizard shuts down; close() waits for the writer thread to finish and fsync the file
+#Frame timing goes to a sidecar next to the tracking file (TEST_tracking_<sub>_<run>.frames.npz)
+def closeData():
+	getData()
+	tracking_data.close()
+	profile = frameProfiler.save(frameprofile.sidecarName(fname))
+	print('Info: ' + frameprofile.report(profile, frameProfiler.overhead()))
+	print('Info: ' + sceneCheck.report())
 
 
 ##LAUNCH EXPERIMENT####
-global startTime
-startTime = time.clock()
-viztask.schedule( EXPERIMENT(trials_per_context,TestObjects,TestObjectLocs,ITI,scaleFactors,runLength))
-vizact.ontimer(0.05, getData)
+sessionClock.markSession()
+print(sessionClock.report())
+frameSampler = framesample.FrameSampler(viz.MainView, sessionClock, 'run')
+frameProfiler = frameprofile.FrameProfiler(sessionClock, refreshRate, 'run')
+rotation = sweep.RotationSweep(viz.MainView, sessionClock, rotationDuration, frameTime=frameProfiler.frameTime)
+session.onupdate(viz.PRIORITY_DEFAULT, rotation.update) #after frameProfiler.frameStart stamps the frame, before the pose is sampled at PRIORITY_LAST_UPDATE
+session.onupdate(viz.PRIORITY_FIRST_UPDATE, frameProfiler.frameStart)
+session.schedule( EXPERIMENT(C,Trials,TestObjects,TestObjectLocs,ITI,scaleFactors,runLength))
+session.onupdate(viz.PRIORITY_LAST_UPDATE, frameSampler.record)
+session.onupdate(viz.PRIORITY_LAST_UPDATE, frameProfiler.frameEnd)
+session.onexit(closeData)
 
 ######### SCREEN SHOTS ########
 #counterScreenShots=0;
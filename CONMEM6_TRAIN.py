@@ -5,9 +5,13 @@ Script for Squircle contextual memory behavioral training task
 
 Script will ask for subject # as input.
 Make sure required 3D objects (osgb files, in the objects directory), feedback smile images (tif files, in the smiles directory), and textures (jpg, in the textures directory) are in the path. Note that the osgb files are too large to host on github; they are available on Mendeley Data (they are available on Mendeley Data (doi:10.17632/jvm3fhpjwn.1). 
-Data are output as text files in the dpath directory, defined below (line 51). It's currently set as '..\Data\TrainingData\\', and this directory must exist.
-Output files are named TRAIN_tracking_<subject number>_<runNum number>.txt.
-Output files have four columns: [time since session start, x-pos, y-pos, and orientation], and each trial's start, end, and target object are indicated in separate rows.
+Optimized copies of these assets can be built ahead of time with: python -m conmem.assets --src objects --src textures --src smiles; the script then loads them from assetcache/ automatically.
+Data are output in the dpath directory, defined below in the VARIABLES section. It's currently set as ../Data/TrainingData/ (built with os.path.join), and this directory must exist.
+Output files are named TRAIN_tracking_<subject number>_<context number>_<runNum number>.trk (binary, the default logFormat) or .txt (logFormat = 'text').
+Binary files are converted to the text layout with: python -m conmem.tracklog <file>.trk
+Output files have four columns: [time since session start (seconds, from the conmem.clock monotonic clock), x-pos, y-pos, and orientation], and each trial's start, end, and target object are indicated in separate rows.
+Pose is sampled on every rendered frame into a ring buffer (conmem.framesample) and written to the file at trial boundaries.
+Each collect also logs an 'Entered <object>, <time>, <frame>, <latency>' row: when (and on which frame) the view reached the object, from conmem.proximity, and how long after the object appeared.
 Participants control movement with wasd keys (can also be changed to arrows)
 Note that for distal cue counterbalancing, distal cues need to be manually flipped across contexts (lines 115-173)
 Requires Vizard VR toolkit.
@@ -15,47 +19,63 @@ Requires Vizard VR toolkit.
 
 # Generic /Built-in
 import os
-import time
 
 #Other libs
 import viz
 import viztask
 import vizact
 import vizinfo
-import vizproximity
 import vizshape
 import vizcam
 import numpy
-import vizinput
 import random
 
+from conmem import tracklog
+from conmem import framesample
+from conmem.clock import sessionClock
+from conmem import session
+from conmem import assets
+from conmem import arena
+from conmem import scoring
+from conmem import objectpool
+from conmem.proximity import ProximityEngine
+from conmem.overlay import Overlay, SceneSizeCheck
+
 # Owned
 __author__ = "Josh Julian"
 __license__ = "MIT"
 
 viz.fov(40)
-viz.setMultiSample(4)
-viz.go(viz.FULLSCREEN)
+if session.host is None: #a session host (CONMEM6_SESSION.py) has opened the window already
+	viz.setMultiSample(4)
+	viz.go(viz.FULLSCREEN)
 viz.mouse.setVisible(viz.OFF)
 viz.antialias = 4
 
+#models load once per file, in the background from here on, so the loads overlap the prompts and the instruction screen;
+#trees and boundary segments are clones sharing the loaded geometry
+modelCache = session.modelCache(['tree2.osgb', 'tree4.osgb', 'tree5.osgb', 'tree6.osgb', 'tree10.osgb', 'tree11.osgb', 'tree12.osgb', 'tree13.osgb', 'CIRCLE.osgb', 'SQUARE.osgb'] +
+	['cone.osgb', 'beachball.osgb', 'plant.osgb', 'pumpkin.osgb'])
+
 
 ###############
 ## VARIABLES ##
 ###############
 
 global subject
-subject = vizinput.input('What is the sub number?') 
+subject = session.askSubject('What is the sub number?')
 global runNum
 #runNum = vizinput.input('What is the run rumber?') 
-dpath = '..\Data\TrainingData\\'
+dpath = os.path.join('..','Data','TrainingData','')
+logFormat = 'binary' #'binary' buffers fixed-width records and writes them in blocks, 'text' writes the tab-separated file directly
 runs = 6
+tracking_data = None #opened per run in ContextGen
 #runNum = int(runNum)
-subject = int(subject)
 
 #tuple of test objects
 TestObjects = ['cone', 'beachball', 'plant','pumpkin']
-TestObjectLocs = [[(-4,0.07,9),(2,0.29,5),(-7,0.07,-4),(10,0.05,-5)] , [(4,0.07,9),(-2,0.29,5),(7,0.07,-4),(-10,0.05,-5)]]
+#[context][object] = (x, y, z), context 1 = circle, 2 = square; defined once in conmem.scoring, which scores the replace errors
+TestObjectLocs = scoring.OBJECT_LOCS
 scaleFactors = [0.15,1.8,1.25,1.8]
 
 
@@ -69,11 +89,12 @@ ITI=2 #intertrial interval, in seconds
 ##env shape
 global radius
 radius = 14.5 #in meters, made global for convenience so be careful 
+collisionMode = 'mesh' #'mesh': Vizard collision against the boundary models; 'analytic': walls computed from the arena shape (conmem.arena)
 
 ##ground
 ground = vizshape.addPlane(size=(40.0,40.0),axis=vizshape.AXIS_Y)
 ground.setPosition(0,0,0)
-t1 = viz.addTexture('tex2.jpg',wrap=viz.REPEAT)
+t1 = viz.addTexture(assets.resolve('tex2.jpg'),wrap=viz.REPEAT)
 ground.texture(t1)
 ground.texmat( viz.Matrix.scale(20,20,1) )
 
@@ -96,16 +117,21 @@ def ContextGen(runNum):
 		else:
 			context=1
 
-	fname = dpath + 'TRAIN_tracking_'+str(subject)+'_'+ str(context) + '_' +str(runNum)+'.txt'
+	fname = tracklog.trackFileName(dpath + 'TRAIN_tracking_'+str(subject)+'_'+ str(context) + '_' +str(runNum), logFormat)
 
 	#check for existing data file <-uncomment for actual testing, along with input function above
 	if os.path.isfile(fname):
 		print('file name already exists')
-		viz.quit()
+		session.quit()
+		return None
 
-	#open data file
+	#open data file, closing the previous run's first so its last block is written out
 	global tracking_data
-	tracking_data = open(fname, 'a')
+	if runNum > 1:
+		getData()
+		tracking_data.close()
+	tracking_data = tracklog.openTrackWriter(fname, logFormat, background=True)
+	sessionClock.markRun()
 
 
 	##############################
@@ -124,29 +150,29 @@ def ContextGen(runNum):
 		global cue6
 		global cue7
 		global cue8
-		cue1 = viz.add('tree4.osgb')
+		cue1 = modelCache.add('tree4.osgb')
 		cue1.setPosition(-20,-10,70)
 		cue1.setScale([2,2,2])
-		cue2 = viz.add('tree6.osgb')
+		cue2 = modelCache.add('tree6.osgb')
 		cue2.setPosition(20,-1,-50)
 		cue2.setScale([3,3,3])
-		cue3 = viz.add('tree2.osgb')
+		cue3 = modelCache.add('tree2.osgb')
 		cue3.setPosition(20,-2,60)
 		cue3.setScale([3,3,3])
-		cue4 = viz.add('tree5.osgb') 
+		cue4 = modelCache.add('tree5.osgb') 
 		cue4.setPosition(-20,-1,-60)
 		cue4.setScale([3,3,3])
 
-		cue5 = viz.add('tree10.osgb')
+		cue5 = modelCache.add('tree10.osgb')
 		cue5.setPosition(60,0,20)
 		cue5.setScale([2.5,2.5,2.5])
-		cue6 = viz.add('tree11.osgb')
+		cue6 = modelCache.add('tree11.osgb')
 		cue6.setPosition(-60,0,-20)
 		cue6.setScale([5,5,5])
-		cue7 = viz.add('tree12.osgb')
+		cue7 = modelCache.add('tree12.osgb')
 		cue7.setPosition(60,-5,-20)
 		cue7.setScale([4,4,4])
-		cue8 = viz.add('tree13.osgb') 
+		cue8 = modelCache.add('tree13.osgb') 
 		cue8.setPosition(-60,-5,20)
 		cue8.setScale([4,4,4])
 
@@ -182,26 +208,26 @@ def ContextGen(runNum):
 		global boundary6
 		global boundary7
 		global boundary8
-		boundary1 = viz.add('CIRCLE.osgb')
+		boundary1 = modelCache.add('CIRCLE.osgb')
 		boundary1.setPosition(0.05,0,-0.05) 
-		boundary2 = viz.add('CIRCLE.osgb')
+		boundary2 = modelCache.add('CIRCLE.osgb')
 		boundary2.setEuler( [ 90, 0, 0 ] ) 
 		boundary2.setPosition(-0.05,0,-0.05) 
-		boundary3 = viz.add('CIRCLE.osgb')
+		boundary3 = modelCache.add('CIRCLE.osgb')
 		boundary3.setEuler( [ -90, 0, 0 ] ) 
 		boundary3.setPosition(0.05,0,0.05) 
-		boundary4 = viz.add('CIRCLE.osgb')
+		boundary4 = modelCache.add('CIRCLE.osgb')
 		boundary4.setEuler( [ 180, 0, 0 ] )
 		boundary4.setPosition(-0.05,0,0.05) 
-		boundary5 = viz.add('SQUARE.osgb')
+		boundary5 = modelCache.add('SQUARE.osgb')
 #		boundary5.setPosition(0.05,0,-0.05) 
-		boundary6 = viz.add('SQUARE.osgb')
+		boundary6 = modelCache.add('SQUARE.osgb')
 		boundary6.setEuler( [ 90, 0, 0 ] ) 
 #		boundary6.setPosition(-0.05,0,-0.05) 
-		boundary7 = viz.add('SQUARE.osgb')
+		boundary7 = modelCache.add('SQUARE.osgb')
 		boundary7.setEuler( [ -90, 0, 0 ] ) 
 #		boundary7.setPosition(0.05,0,0.05) 
-		boundary8 = viz.add('SQUARE.osgb')
+		boundary8 = modelCache.add('SQUARE.osgb')
 		boundary8.setEuler( [ 180, 0, 0 ] )
 #		boundary8.setPosition(-0.05,0,0.05) 
 
@@ -226,18 +252,19 @@ def ContextGen(runNum):
 		boundary3.visible(0)
 		boundary4.visible(0)
 		
+	arenaCollision.setShape(context)
 	return context
 
 
 ##lighting
-mylight = viz.addLight() 
+mylight = session.own(viz.addLight()) 
 mylight.enable() 
 mylight.position(0, 10, 0)
 mylight.spread(180) ##uniform ambient lighting 
 mylight.intensity(2.5)
 
 #setup keyboard controls
-vizcam.KeyboardCamera(forward='w',
+session.own(vizcam.KeyboardCamera(forward='w',
 						turnRight='d',
 						turnLeft='a',
 						backward='s',
@@ -245,23 +272,27 @@ vizcam.KeyboardCamera(forward='w',
 						right='¨',
 						moveMode=viz.REL_LOCAL,
 						moveScale=1.1,
-						turnScale=0.45)
+						turnScale=0.45))
 
 #turn on collisions
-viz.collision(viz.ON)
+arenaCollision = arena.ArenaCollision(viz.MainView, radius=radius)
+if collisionMode == 'analytic':
+	#after navigation, before the pose is sampled
+	session.onupdate(viz.PRIORITY_LAST_UPDATE - 1, arenaCollision.update)
+else:
+	session.collision(viz.ON)
 
-#######################
-## PROXIMITY MANAGER ##
-#######################
+######################
+## PROXIMITY ENGINE ##
+######################
 
-##Create proximity manager
-global manager
-manager = vizproximity.Manager()
+##one target (the viewpoint) against the armed object's precomputed footprint, checked once per frame
+global proximity
+proximity = ProximityEngine(viz.MainView, sessionClock)
 
-#Add main viewpoint as proximity target'
-global target
-target = vizproximity.Target(viz.MainView)
-manager.addTarget(target)
+#load the test objects once and give their footprints to the proximity engine; Collect() only shows, moves and hides them
+global objectPool
+objectPool = objectpool.ObjectPool(TestObjects, scaleFactors, proximity, modelCache)
 
 ##################
 ##MATH FUNCTIONS##
@@ -274,37 +305,31 @@ def pol2cart(rho, phi):
 
 
 def computeError(corrLoc,actualLoc):
-	error = numpy.sqrt(numpy.square(corrLoc[0]-actualLoc[0])+numpy.square(corrLoc[2]-actualLoc[2]))
-#	#compute different feedback levels (1-5) for different levels of performance
-	threshold = [3,5,7,9]
-	if error < threshold[0]:
-		feedback = 1
-	elif error > threshold[0] and error < threshold[1]:
-		feedback = 2
-	elif error > threshold[1] and error < threshold[2]:
-		feedback = 3
-	elif error > threshold[2] and error < threshold[3]:
-		feedback = 4
-	elif error > threshold[3]:
-		feedback = 5
+	#error and feedback level (1-5, thresholds [3,5,7,9]) from conmem.scoring, which offline re-scoring uses too
+	error,feedback = scoring.computeError(corrLoc,actualLoc)
 	return(error,feedback)
 
 ##################
 ## INSTRUCTIONS ##
 ##################
+#text and feedback nodes for scene 2 are created once here and reused every trial
+global overlay
+overlay = Overlay(2)
+sceneCheck = SceneSizeCheck()
+
 ##N.B. phase == 1 is collect, otherwise replace
 def Instruction(objName,ITI,phase,feedback):
 
 		viz.MainWindow.setScene(2)
+		#write out the samples buffered during the last phase
+		getData()
+		sceneCheck.sample()
 		if phase:
 
 			if feedback>0:
-				smile = viz.add('smile' + str(feedback) + '.tif')
-				feed = viz.addTexQuad(parent=viz.SCREEN,scene=2,size=[500,400])
-				feed.setPosition([0.5, 0.5, 0]) #put quad in view 
-				feed.texture(smile)
+				overlay.showFeedback(feedback)
 				yield viztask.waitTime(ITI-1)
-				feed.visible(0)
+				overlay.hideFeedback()
 
 			Message = 'Collect ' + objName
 
@@ -312,15 +337,11 @@ def Instruction(objName,ITI,phase,feedback):
 			Message = 'Replace ' + objName
 
 		#info
-		info = viz.addText(Message,viz.SCREEN,scene=2)
-		info.fontSize(36)
-		info.color(viz.WHITE)
-		info.setPosition([0.4,0.5,0])
-		info.visible(1)
+		overlay.showText(Message,[0.4,0.5,0])
 
 		#wait for iti
 		yield viztask.waitTime(ITI+1)
-		info.visible(0)
+		overlay.hideText()
 
 def StartRun(runNum,openMess,closeMess):
 	
@@ -332,42 +353,30 @@ def StartRun(runNum,openMess,closeMess):
 			con = 1
 		Message = 'Press t to start training in Arena ' + str(con)
 		#info
-		info = viz.addText(Message,viz.SCREEN,scene=2)
-		info.fontSize(36)
-		info.color(viz.WHITE)
-		info.setPosition([0.3,0.5,0])
-		info.visible(1)
+		overlay.showText(Message,[0.3,0.5,0])
 
 		#wait for response
 		yield viztask.waitKeyDown(['t','T'])
-		info.visible(0)
+		overlay.hideText()
 		yield viztask.waitTime(ITI-1)
 	else: 
 		viz.MainWindow.setScene(2)
 		Message = 'Good job!'
 		#info
-		info = viz.addText(Message,viz.SCREEN,scene=2)
-		info.fontSize(36)
-		info.color(viz.WHITE)
-		info.setPosition([0.4,0.5,0])
-		info.visible(1)
+		overlay.showText(Message,[0.4,0.5,0])
 		yield viztask.waitTime(ITI)
-		info.visible(0)
+		overlay.hideText()
 		if closeMess:
 			Message = 'Training Complete. Please get experimenter'
 			#info
-			info = viz.addText(Message,viz.SCREEN,scene=2)
-			info.fontSize(36)
-			info.color(viz.WHITE)
-			info.setPosition([0.3,0.5,0])
-			info.visible(1)
+			overlay.showText(Message,[0.3,0.5,0])
 			yield viztask.waitTime(ITI)
-			info.visible(0)
+			overlay.hideText()
 
 #####################################
 #######COLLECT PHASE FUNCTION #######
 #####################################
-def Collect(objName,objLoc,ScaleFac,tel):
+def Collect(objName,objLoc,tel):
 
 		viz.MainWindow.setScene(1)
 		
@@ -377,20 +386,14 @@ def Collect(objName,objLoc,ScaleFac,tel):
 			viz.MainView.setPosition(x,0,y) 
 			viz.MainView.setEuler(numpy.random.randint(0,360),0,0)
 
-		#add object
-		obj = viz.addChild(objName+'.osgb') 
-		obj.setPosition(objLoc)
-		obj.setScale([ScaleFac,ScaleFac,ScaleFac])
-
-		sensor = vizproximity.addBoundingBoxSensor(obj,scale=(1.5,10,1.5))
+		#show the preloaded object at this context's location (scaled and given its footprint once, at startup)
+		objectPool.show(objName,objLoc)
 
-		manager.addSensor(sensor)
-
-		obj.visible(viz.ON)
-
-		yield vizproximity.waitEnter(sensor)
-		obj.remove()
-		manager.removeSensor(sensor)
+		yield proximity.waitEnter(objName)
+		objectPool.hide(objName)
+		#entry time is from the frame the view crossed in; latency is trial time, from the 'Start collect' the object appears with
+		armed, entered, frame = proximity.lastEntry(objName)
+		frameSampler.mark('Entered ' + objName + ', ' + str(sessionClock.seconds(entered,'session')) + ', ' + str(frame) + ', ' + str(sessionClock.seconds(entered,'trial')))
 
 #####################################
 #######COLLECT PHASE FUNCTION #######
@@ -416,9 +419,16 @@ def EXPERIMENT(trials_per_object,initial_collect_per_object,TestObjects,TestObje
 	for r in range(runs):
 		runNum = r+1
 		context = ContextGen(runNum)
+		if context is None:
+			return
 		#test object locations for this world
 		TestObjectLocs = TestObjectLocsALL[context - 1]
 		yield StartRun(runNum,1,0)
+		#readiness barrier: no trial starts before every model has loaded
+		yield modelCache.waitReady()
+		if runNum == 1:
+			print('Info: ' + modelCache.report())
+		objectPool.buildSensors()
 
 		#initial training, just collects
 		if runNum < 3:
@@ -430,13 +440,11 @@ def EXPERIMENT(trials_per_object,initial_collect_per_object,TestObjects,TestObje
 				#get target object for collection
 				objName = TestObjects[nn]
 				objLoc = TestObjectLocs[nn]
-				S=scaleFactors[nn]
 				yield Instruction(objName,ITI,1,0)
-				data = 'Start collect\n' 
-				tracking_data.write(data)
-				yield Collect(objName,objLoc,S,1)
-				data = objName + ' Collected Initial' + '\n' 
-				tracking_data.write(data)
+				sessionClock.markTrial()
+				frameSampler.mark('Start collect')
+				yield Collect(objName,objLoc,1)
+				frameSampler.mark(objName + ' Collected Initial')
 
 		#post-initial training, replace/collect phases
 		Trials = []
@@ -449,53 +457,55 @@ def EXPERIMENT(trials_per_object,initial_collect_per_object,TestObjects,TestObje
 			#get target object for replace/collect
 			objName = TestObjects[nn]
 			objLoc = TestObjectLocs[nn]
-			S=scaleFactors[nn]
 			#show instructions
 			yield Instruction(objName,ITI,0,0)
-			data = 'Start replace\n' 
-			tracking_data.write(data)
+			sessionClock.markTrial()
+			frameSampler.mark('Start replace')
 			#replace phase
 			yield Replace()
 			error,feedback = computeError(viz.MainView.getPosition(),objLoc)
-			data = 'Replaced ' + objName + ', ' + str(error) + '\n' 
-			tracking_data.write(data)
+			frameSampler.mark('Replaced ' + objName + ', ' + str(error))
 			replaceError.append(error) #store replace error in a list, just to compute the mean at the end
 
 			yield Instruction(objName,ITI,1,feedback)
-			data = 'Start collect\n' 
-			tracking_data.write(data)
-			yield Collect(objName,objLoc,S,1) #have feedback every trial no matter what 
-			data = 'Collected ' + objName + '\n' 
-			tracking_data.write(data)
+			sessionClock.markTrial()
+			frameSampler.mark('Start collect')
+			yield Collect(objName,objLoc,1) #have feedback every trial no matter what 
+			frameSampler.mark('Collected ' + objName)
 
 		#all done, shut down, printing mean error just for experimenter to check if needed
 		print('Info: ' + str(numpy.mean(replaceError)))
 		yield StartRun(runNum,0,0)
 	
 	yield StartRun(runNum,0,1)
-	viz.quit()
+	session.quit()
 
 
 ##################################
 ##WRITE OUT PATH DATA FUNCTION####
 ##################################
 
-#Get the tracking data. 
+#Pose is recorded every frame into frameSampler's ring buffer, and event rows are queued there with frameSampler.mark().
+#getData() writes everything buffered so far to the tracking file. It is only called at trial boundaries (Instruction() ITIs), never from the frame loop.
 def getData():
-	orientation = viz.MainView.getEuler()
-	position = viz.MainView.getPosition()
-	currTime = time.clock()
-	#Make a string out of the data. 
-	data = str(currTime-startTime) + '\t' + str(position[0]) + '\t' + str(position[2]) + '\t' +str(orientation[0]) + '\n' 
-	#Write it to the tracking file.
-	tracking_data.write(data)
+	frameSampler.drain(tracking_data)
+
+#Write out whatever is still buffered when Vizard shuts down; close() waits for the writer thread to finish and fsync the file
+def closeData():
+	if tracking_data is not None:
+		getData()
+		tracking_data.close()
+	print('Info: ' + sceneCheck.report())
 
 
 ##LAUNCH EXPERIMENT####
-global startTime
-startTime = time.clock()
-viztask.schedule( EXPERIMENT(trials_per_object,initial_collect_per_object,TestObjects,TestObjectLocs,ITI,scaleFactors,runs))
-vizact.ontimer(0.05, getData)
+sessionClock.markSession()
+print(sessionClock.report())
+frameSampler = framesample.FrameSampler(viz.MainView, sessionClock, 'session')
+session.schedule( EXPERIMENT(trials_per_object,initial_collect_per_object,TestObjects,TestObjectLocs,ITI,scaleFactors,runs))
+session.onupdate(viz.PRIORITY_DEFAULT, proximity.update)
+session.onupdate(viz.PRIORITY_LAST_UPDATE, frameSampler.record)
+session.onexit(closeData)
 
 
 ######### SCREEN SHOTS ########
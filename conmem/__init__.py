@@ -0,0 +1,9 @@
+"""
+Support modules for the Squircle contextual memory task scripts (CONMEM6_*.py).
+
+Modules here are imported by the task scripts at runtime, and some can also be run on their own for offline processing of the output files.
+"""
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
@@ -0,0 +1,67 @@
+"""
+Closed-form arena walls for the circle, square and squircle contexts.
+
+viz.collision(viz.ON) tests the viewpoint against the CIRCLE.osgb / SQUARE.osgb boundary meshes on every movement step, and catches on the
+seams between their segments. ArenaCollision instead keeps MainView inside the arena's shape: a circle, a square, or the squircle built in
+CONMEM6_TEST.py, whose four quadrants are the circle or square segment placed there. A boundary segment placed with yaw 0 covers the
+(+x, -z) quadrant, 90 covers (-x, -z), -90 covers (+x, +z) and 180 covers (-x, +z); the squircle has CIRCLE segments at 0 and 180 and
+SQUARE segments at 90 and -90. Round quadrants end at distance radius from the centre, square ones at |x| = radius and |z| = radius.
+
+update() runs once per frame, after navigation. If the view has moved past the wall (less buffer, the distance the view keeps from it),
+it is put back on the nearest point of the wall in its quadrant: the movement into the wall is dropped and the movement along it is kept,
+so the participant slides along walls. That is a handful of float operations per frame, whatever the models hold.
+"""
+
+# Generic /Built-in
+import math
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+#shapes, numbered as the scripts number their contexts
+CIRCLE = 1
+SQUARE = 2
+SQUIRCLE = 3
+
+#per shape, whether each quadrant's wall is round; quadrants are (+x,-z), (-x,-z), (+x,+z), (-x,+z) (see quadrant())
+ROUND = {
+	CIRCLE: (True, True, True, True),
+	SQUARE: (False, False, False, False),
+	SQUIRCLE: (True, False, False, True),
+	}
+
+
+def quadrant(x, z):
+	return (0 if x >= 0 else 1) + (0 if z < 0 else 2)
+
+
+def constrain(x, z, shape, limit):
+	"""(x, z) moved onto the wall of shape if it is beyond it; limit is the wall's distance from the centre."""
+	if ROUND[shape][quadrant(x, z)]:
+		d2 = x * x + z * z
+		if d2 <= limit * limit:
+			return x, z
+		scale = limit / math.sqrt(d2)
+		return x * scale, z * scale
+	return max(-limit, min(limit, x)), max(-limit, min(limit, z))
+
+
+class ArenaCollision(object):
+
+	def __init__(self, view, shape=CIRCLE, radius=14.5, buffer=0.5):
+		self.view = view
+		self.shape = shape
+		self.limit = radius - buffer
+		self.contacts = 0 #frames the view was held back by a wall
+
+	def setShape(self, shape):
+		self.shape = shape
+
+	def update(self):
+		pos = self.view.getPosition()
+		x, z = constrain(pos[0], pos[2], self.shape, self.limit)
+		if x != pos[0] or z != pos[2]:
+			self.view.setPosition(x, pos[1], z)
+			self.contacts += 1
@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+
+"""
+Offline asset build: validates the models and images the scripts load, and writes optimized copies to a versioned cache.
+
+MANIFEST lists every asset the three scripts ask Vizard for. The build finds each one in the --src directories, checks that it is there
+and looks like the format its extension says, and converts it:
+	models (.osgb)   - osgconv with the OSG optimizer's vertex-cache passes (INDEX_MESH, VERTEX_PRETRANSFORM, VERTEX_POSTTRANSFORM),
+	                   and --compressed so embedded textures are stored GPU-compressed
+	images (.jpg/.tif) - a .dds with a full mipmap chain, BC1 for opaque textures and BC3 for the smiles, with texconv or nvcompress
+Tools come from the Vizard/OSG and NVIDIA/DirectX toolchains and are optional: an asset whose tool is missing is validated but not
+converted, and the scripts keep loading its original.
+
+Each output goes to <out>/v<VERSION>/<key>/<file>, where key hashes the source content, the tool and its options, so an unchanged asset
+is never converted twice and changing the tool settings or VERSION starts a fresh cache. <out>/v<VERSION>/manifest.json maps each
+asset name to its cached file and records its source's size and modification time.
+
+At launch the scripts pass asset names through resolve(), which returns the cached file when the manifest has one whose source is
+unchanged (or no longer on disk), and the name itself otherwise, for Vizard to find on its resource path as before.
+
+	python -m conmem.assets --src objects --src textures --src smiles
+	python -m conmem.assets --src objects --check
+"""
+
+# Generic /Built-in
+import argparse
+import concurrent.futures
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+from conmem import cache
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+#bump when the conversions change, so every asset is rebuilt
+VERSION = 1
+
+ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'assetcache')
+
+#name -> image compression (None for models); BC3 keeps the smiles' alpha
+MANIFEST = dict(
+	[(name + '.osgb', None) for name in ['cone', 'beachball', 'plant', 'pumpkin', 'CIRCLE', 'SQUARE']] +
+	[('tree' + str(n) + '.osgb', None) for n in [2, 4, 5, 6, 10, 11, 12, 13]] +
+	[('tex2.jpg', 'BC1')] +
+	[('smile' + str(n) + '.tif', 'BC3') for n in range(1, 6)])
+
+#leading bytes of each format
+SIGNATURES = {'.jpg': [b'\xff\xd8\xff'], '.tif': [b'II*\x00', b'MM\x00*'], '.osgb': [b'\xa1\x0e\x91\x6c']}
+
+OPTIMIZER = 'DEFAULT INDEX_MESH VERTEX_PRETRANSFORM VERTEX_POSTTRANSFORM'
+
+
+################
+## VALIDATION ##
+################
+
+def findAsset(name, sources):
+	for src in sources:
+		path = os.path.join(src, name)
+		if os.path.isfile(path):
+			return path
+	return None
+
+
+def validate(path):
+	"""Returns None if path looks like a valid file of its type, else a description of the problem."""
+	size = os.path.getsize(path)
+	if size == 0:
+		return 'empty file'
+	signatures = SIGNATURES.get(os.path.splitext(path)[1].lower())
+	if signatures:
+		with open(path, 'rb') as f:
+			head = f.read(8)
+		if not any(head.startswith(s) for s in signatures):
+			return 'does not start like a ' + os.path.splitext(path)[1] + ' file'
+	return None
+
+
+#################
+## CONVERSIONS ##
+#################
+
+def findTool(compression):
+	"""Path of the converter for a model (compression None) or an image, or None if none is installed."""
+	for name in (['osgconv'] if compression is None else ['texconv', 'nvcompress']):
+		path = shutil.which(name)
+		if path is not None:
+			return path
+	return None
+
+
+def convertCommand(tool, src, dst, compression):
+	"""(arguments, environment) to convert src to dst with tool."""
+	name = os.path.splitext(os.path.basename(tool))[0].lower()
+	if name == 'osgconv':
+		return [tool, '--compressed', src, dst], dict(os.environ, OSG_OPTIMIZER=OPTIMIZER)
+	if name == 'texconv':
+		#-m 0: full mipmap chain; texconv names the output after the source, in the -o directory
+		return [tool, '-nologo', '-y', '-m', '0', '-f', compression + '_UNORM', '-o', os.path.dirname(dst), src], None
+	#nvcompress builds mipmaps unless told not to
+	return [tool, '-' + compression.lower(), src, dst], None
+
+
+def outputName(name, compression):
+	return name if compression is None else os.path.splitext(name)[0] + '.dds'
+
+
+def buildAsset(name, source, out, force=False):
+	"""Converts one asset into the cache; returns its manifest entry, or None if there is no tool for it."""
+	compression = MANIFEST[name]
+	tool = findTool(compression)
+	if tool is None:
+		return None
+	toolName = os.path.splitext(os.path.basename(tool))[0].lower()
+	key = cache.makeKey(cache.fileHash(source), toolName, compression, OPTIMIZER if compression is None else None, VERSION)
+	dst = os.path.join(out, key, outputName(name, compression))
+	if force or not os.path.isfile(dst):
+		os.makedirs(os.path.dirname(dst), exist_ok=True)
+		args, env = convertCommand(tool, source, dst, compression)
+		subprocess.run(args, env=env, check=True, stdout=subprocess.DEVNULL)
+		if not os.path.isfile(dst):
+			raise RuntimeError(toolName + ' did not write ' + dst)
+	st = os.stat(source)
+	return {'source': os.path.abspath(source), 'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'cached': os.path.relpath(dst, out).replace(os.sep, '/')}
+
+
+def build(sources, root=ROOT, jobs=None, force=False, check=False):
+	"""Validates every MANIFEST asset and, unless check, converts them; returns the number of problems found."""
+	out = os.path.join(root, 'v' + str(VERSION))
+	problems = 0
+	found = {}
+	for name in sorted(MANIFEST):
+		path = findAsset(name, sources)
+		if path is None:
+			print('MISSING ' + name)
+			problems += 1
+			continue
+		problem = validate(path)
+		if problem is not None:
+			print('INVALID ' + name + ': ' + problem)
+			problems += 1
+			continue
+		found[name] = path
+	print('%d of %d assets found and valid' % (len(found), len(MANIFEST)))
+	if check:
+		return problems
+
+	manifestName = os.path.join(out, 'manifest.json')
+	manifest = _readManifest(manifestName)
+	with concurrent.futures.ThreadPoolExecutor(jobs) as pool:
+		futures = dict((pool.submit(buildAsset, name, path, out, force), name) for name, path in found.items())
+		for future in concurrent.futures.as_completed(futures):
+			name = futures[future]
+			try:
+				entry = future.result()
+			except (subprocess.CalledProcessError, RuntimeError, OSError) as e:
+				print('FAILED ' + name + ': ' + str(e))
+				problems += 1
+				continue
+			if entry is None:
+				print('no tool, kept original: ' + name)
+				manifest.pop(name, None)
+			else:
+				print('cached ' + name + ' -> ' + entry['cached'])
+				manifest[name] = entry
+	os.makedirs(out, exist_ok=True)
+	tmp = manifestName + '.tmp'
+	with open(tmp, 'w') as f:
+		json.dump(manifest, f, indent=1, sort_keys=True)
+	os.replace(tmp, manifestName)
+	return problems
+
+
+############
+## LOOKUP ##
+############
+
+_manifests = {}
+
+def _readManifest(fname):
+	try:
+		with open(fname) as f:
+			return json.load(f)
+	except (OSError, ValueError):
+		return {}
+
+
+def resolve(name, root=ROOT):
+	"""Path of the cached build of asset name if there is a current one, else name unchanged."""
+	out = os.path.join(root, 'v' + str(VERSION))
+	if out not in _manifests:
+		_manifests[out] = _readManifest(os.path.join(out, 'manifest.json'))
+	entry = _manifests[out].get(name)
+	if entry is None:
+		return name
+	cached = os.path.join(out, entry['cached'])
+	if not os.path.isfile(cached):
+		return name
+	try:
+		st = os.stat(entry['source'])
+	except OSError:
+		#the source is not where it was built from (e.g. only the cache was copied to the lab machine)
+		return cached
+	if st.st_size != entry['size'] or st.st_mtime_ns != entry['mtime_ns']:
+		return name
+	return cached
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description='Validate the task assets and build optimized copies into the asset cache.')
+	parser.add_argument('--src', action='append', required=True, help='directory holding assets (repeatable; searched in order)')
+	parser.add_argument('--out', default=ROOT, help='cache root (default: assetcache next to the scripts, where they look)')
+	parser.add_argument('--jobs', type=int, default=None, help='conversions to run at once')
+	parser.add_argument('--force', action='store_true', help='convert again even if a cached build exists')
+	parser.add_argument('--check', action='store_true', help='only validate the manifest')
+	args = parser.parse_args(argv)
+	return 1 if build(args.src, args.out, args.jobs, args.force, args.check) else 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+
+"""
+Batch analysis of a whole TrainingData / TestingData tree.
+
+Finds every TRAIN_tracking_<sub>_<ctx>_<run> and TEST_tracking_<sub>_<run> file (.txt or .trk), computes per-trial metrics for each file in a process pool,
+and writes one tidy tab-separated table per study (TRAIN_trials.tsv, TEST_trials.tsv), one row per trial.
+
+Metrics per trial:
+	error, error2 - replace error (error2 is the square-location error of squircle trials)
+	choice        - squircle trials: 1 if the response was closer to the circle location of the object, 2 if closer to the square location
+	path          - distance walked during the response (replace trials) or the collect (initial collect trials)
+	duration      - trial duration, from its start row to the start of the next trial
+	response      - time from the start row to the response
+	rotation      - TEST only: duration of the Replace() rotation sweep, from its 'Rotation' row (or, in older files, from the yaw)
+
+Per-file metrics are cached under a key made from the hash of the file's contents (cache.contentKey), so re-running after adding a subject
+only processes the new files. With the tracking-file index (conmem.index), the hashes come from the index, and a study's table is only
+written again when one of its files is new, changed or gone, or the table itself is.
+
+	python -m conmem.batch --train ../Data/TrainingData --test ../Data/TestingData --out ../Data/Results
+"""
+
+# Generic /Built-in
+import argparse
+import concurrent.futures
+import os
+import sys
+
+#Other libs
+import numpy
+
+from conmem import cache
+from conmem import index as trackindex
+from conmem import trackload
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+#bump when the metrics change, so cached results are recomputed
+VERSION = 2
+
+#steps longer than this between two samples are teleports, not walking (m)
+TELEPORT = 2.0
+
+METRICS = numpy.dtype([('trial','<i4'),('replace','?'),('context','i1'),('object','i1'),('choice','i1'),('error','<f8'),('error2','<f8'),
+	('path','<f8'),('duration','<f8'),('response','<f8'),('rotation','<f8')])
+
+COLUMNS = ['study','subject','context','run','trial','replace','object','error','error2','choice','path','duration','response','rotation']
+
+
+###########
+## FILES ##
+###########
+
+def findTrackingFiles(roots):
+	"""Returns the tracking files under roots, keyed by name; when a run has both a .trk and a .txt file, the .trk one is used."""
+	found = {}
+	for root in roots:
+		for dirpath, dirnames, filenames in os.walk(root):
+			for f in filenames:
+				name = trackload.parseTrackName(f)
+				if name is None:
+					continue
+				if name not in found or f.endswith('.trk'):
+					found[name] = os.path.join(dirpath, f)
+	return found
+
+
+#############
+## METRICS ##
+#############
+
+def rotationEnd(yaw, start, stop, sweep=359.5):
+	"""Index of the sample where the yaw has turned a full sweep since start, or -1.
+
+	The sweep in TEST Replace() turns the view monotonically through 360 deg while the position is held, so the first
+	sample whose unwrapped yaw is a full turn past the first one marks the end of the rotation phase.
+	"""
+	if stop - start < 2:
+		return -1
+	turned = numpy.unwrap(numpy.radians(yaw[start:stop]))
+	turned = numpy.degrees(turned - turned[0])
+	hit = numpy.flatnonzero(numpy.abs(turned) >= sweep)
+	if len(hit) == 0:
+		return -1
+	return start + int(hit[0])
+
+
+def trialMetrics(track):
+	"""Per-trial METRICS for one loaded tracking file."""
+	pose = track.pose
+	trials = track.trials
+	out = numpy.zeros(len(trials), dtype=METRICS)
+	for field in ['trial','replace','context','object','choice','error','error2']:
+		out[field] = trials[field]
+	out['rotation'] = numpy.nan
+	out['response'] = numpy.nan
+	if len(pose) == 0 or len(trials) == 0:
+		out['path'] = numpy.nan
+		out['duration'] = numpy.nan
+		return out
+
+	#walking distance per sample step, with teleports removed; cumulative sums turn each path length into one subtraction
+	step = numpy.hypot(numpy.diff(pose['x']), numpy.diff(pose['z']))
+	step[step > TELEPORT] = 0
+	walked = numpy.concatenate(([0], numpy.cumsum(step)))
+
+	last = len(pose) - 1
+	start = numpy.minimum(trials['start'], last)
+	stop = numpy.clip(trials['stop'] - 1, 0, last)
+	hasResponse = trials['response'] >= 0
+	response = numpy.where(hasResponse, numpy.clip(trials['response'] - 1, 0, last), stop)
+
+	out['path'] = walked[response] - walked[start]
+	out['duration'] = pose['t'][stop] - pose['t'][start]
+	out['response'][hasResponse] = (pose['t'][response] - pose['t'][start])[hasResponse]
+
+	if track.name is not None and track.name[0] == 'TEST':
+		#sweeps with a logged 'Rotation' row use its times; older files fall back to finding the full turn in the yaw
+		logged = trials['replace'] & ~numpy.isnan(trials['rotEnd'])
+		ends = numpy.minimum(numpy.searchsorted(pose['t'], trials['rotEnd']), last)
+		out['rotation'][logged] = (trials['rotEnd'] - trials['rotStart'])[logged]
+		out['path'][logged] = (walked[response] - walked[numpy.minimum(ends, response)])[logged]
+		for i in numpy.flatnonzero(trials['replace'] & ~logged).tolist():
+			end = rotationEnd(pose['yaw'], int(start[i]), int(response[i]) + 1)
+			if end >= 0:
+				out['rotation'][i] = pose['t'][end] - pose['t'][start[i]]
+				#walking only starts once the sweep is over
+				out['path'][i] = walked[response[i]] - walked[end]
+	return out
+
+
+def fileMetrics(fname, cacheRoot=None, digest=None):
+	"""METRICS for one file, from the cache when its contents have not changed.
+
+	digest: the file's content hash, if already known (see cache.fileHash).
+	"""
+	store = cache.Cache(cacheRoot) if cacheRoot else None
+	if store is not None:
+		key = cache.contentKey(fname, 'batch', VERSION, digest=digest)
+		metrics = store.get(key)
+		if metrics is not None:
+			return metrics
+	metrics = trialMetrics(trackload.loadTracking(fname))
+	if store is not None:
+		store.put(key, metrics)
+	return metrics
+
+
+############
+## OUTPUT ##
+############
+
+def writeTable(fname, rows):
+	"""rows: list of ((study, subject, context, run), METRICS array)."""
+	with open(fname, 'w') as out:
+		out.write('\t'.join(COLUMNS) + '\n')
+		for (study, subject, context, run), metrics in rows:
+			for m in metrics.tolist():
+				trial, replace, trialContext, obj, choice, error, error2, path, duration, response, rotation = m
+				objName = trackload.OBJECTS[obj] if obj >= 0 else ''
+				values = [study, subject, trialContext or context, run, trial, int(replace), objName, error, error2, choice or '', path, duration, response, rotation]
+				out.write('\t'.join(['' if (isinstance(v, float) and v != v) else str(v) for v in values]) + '\n')
+
+
+def runBatch(roots, outDir, jobs=None, cacheRoot=None, index=None):
+	"""Computes metrics for every tracking file under roots and writes <study>_trials.tsv tables to outDir (with index: the stale ones).
+
+	Returns the names of the tables written.
+	"""
+	files = index.files(roots) if index is not None else findTrackingFiles(roots)
+	names = sorted(files, key=lambda n: (n[0], _subjectKey(n[1]), n[3], n[2]))
+	studies = []
+	for study in ['TRAIN', 'TEST']:
+		fnames = [files[n] for n in names if n[0] == study]
+		if not fnames:
+			continue
+		table = os.path.join(outDir, study + '_trials.tsv')
+		#the file list is a parameter too, so a table is written again when one of its files is gone
+		params = (os.path.abspath(table), VERSION, cache.makeKey(*fnames))
+		if index is None or index.stale('batch', fnames, params):
+			studies.append((study, table, fnames, params))
+	if not studies:
+		return []
+	written = [study for study, table, studyFiles, params in studies]
+	names = [n for n in names if n[0] in written]
+	fnames = [files[n] for n in names]
+	digests = [index.digest(f) for f in fnames] if index is not None else [None] * len(fnames)
+	os.makedirs(outDir, exist_ok=True)
+	with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+		results = list(pool.map(fileMetrics, fnames, [cacheRoot] * len(names), digests, chunksize=4))
+	tables = []
+	for study, table, studyFiles, params in studies:
+		writeTable(table, [(n, m) for n, m in zip(names, results) if n[0] == study])
+		if index is not None:
+			for fname in studyFiles:
+				index.done('batch', fname, params, table)
+		tables.append(table)
+	return tables
+
+
+def _subjectKey(subject):
+	#numeric subjects sort numerically, anything else after them by name
+	return (0, int(subject), '') if subject.isdigit() else (1, 0, subject)
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description='Per-trial metrics for every tracking file in a data tree.')
+	parser.add_argument('--train', default=os.path.join('..', 'Data', 'TrainingData'), help='TrainingData directory')
+	parser.add_argument('--test', default=os.path.join('..', 'Data', 'TestingData'), help='TestingData directory')
+	parser.add_argument('--out', default=os.path.join('..', 'Data', 'Results'), help='directory for the output tables')
+	parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: all cores)')
+	parser.add_argument('--cache', default=None, help='cache directory (default: <out>/cache)')
+	parser.add_argument('--no-cache', action='store_true', help='recompute every file')
+	parser.add_argument('--index', default=trackindex.INDEX, help='tracking-file index')
+	parser.add_argument('--no-index', action='store_true', help='write every table again')
+	args = parser.parse_args(argv)
+	cacheRoot = None if args.no_cache else (args.cache or os.path.join(args.out, 'cache'))
+	roots = [r for r in [args.train, args.test] if os.path.isdir(r)]
+	index = None if args.no_index else trackindex.openIndex(roots, args.index)
+	tables = runBatch(roots, args.out, args.jobs, cacheRoot, index)
+	for fname in tables:
+		print(fname)
+	if index is not None:
+		if not tables:
+			print('tables are up to date')
+		index.close()
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -0,0 +1,60 @@
+"""
+On-disk cache for derived arrays, used by the offline analysis modules.
+
+Entries are .npy files named by a key; keys are hashes of whatever identifies the result (input file identity, parameters, code version).
+contentKey() identifies an input file by a hash of its bytes, so a copied, moved or touched file keeps its entries and only a real change
+misses; conmem.index keeps the hashes, so files that have not changed are not read again to hash them.
+"""
+
+# Generic /Built-in
+import hashlib
+import os
+
+#Other libs
+import numpy
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+def makeKey(*parts):
+	return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+
+def fileHash(fname):
+	digest = hashlib.sha1()
+	with open(fname, 'rb') as f:
+		for block in iter(lambda: f.read(1 << 20), b''):
+			digest.update(block)
+	return digest.hexdigest()
+
+
+def contentKey(fname, *parts, digest=None):
+	#digest: the file's hash if it is already known (e.g. from conmem.index), which saves reading the file
+	return makeKey(digest or fileHash(fname), *parts)
+
+
+class Cache(object):
+
+	def __init__(self, root):
+		self.root = root
+		os.makedirs(root, exist_ok=True)
+
+	def path(self, key):
+		return os.path.join(self.root, key + '.npy')
+
+	def get(self, key):
+		"""Returns the cached array for key, or None."""
+		try:
+			return numpy.load(self.path(key), allow_pickle=False)
+		except (IOError, OSError, ValueError):
+			return None
+
+	def put(self, key, array):
+		#write to a temporary name and rename, so a killed run never leaves a truncated entry
+		fname = self.path(key)
+		tmp = fname + '.%d.tmp' % os.getpid()
+		with open(tmp, 'wb') as f:
+			numpy.save(f, array, allow_pickle=False)
+		os.replace(tmp, fname)
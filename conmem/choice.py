@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+
+"""
+Squircle choice analytics: which context's layout participants used when replacing objects in the squircle (context 3) in TEST.
+
+Every 'Replaced squircle, <obj>, <choice>, <error1>, <error2>' row of every TEST run is one trial: choice 1 means the response was closer to
+the object's circle location (error1), 2 closer to its square location (error2). Besides the choice, each trial gets a continuous bias
+	bias = (error2 - error1) / (error1 + error2)
+which is +1 on the circle location, -1 on the square location and 0 halfway between them. Trials are broken down by object and by the
+arena quadrant the response was made in (the squircle's (+x,-z) and (-x,+z) quadrants are round, the other two square; see conmem.arena).
+
+summarize() gives, for the whole study and for every object and quadrant, the proportion of circle choices and the mean bias (pooled over
+trials), with percentile bootstrap confidence intervals. The bootstrap resamples subjects (or, with unit='trial', trials within each
+cell): the draws are one integer array of indices per block of draws, and each statistic is a gather and a sum over it, so 10,000 draws
+over a whole study take a fraction of a second resampling subjects and about a second resampling trials.
+
+Per-file trials are cached under the hash of the file's contents (cache.contentKey). With the tracking-file index (conmem.index), the
+hashes come from the index, and the summary is only computed and written again when a TEST file is new, changed or gone, the bootstrap
+parameters changed, or the table is missing.
+
+	python -m conmem.choice --test ../Data/TestingData --out ../Data/Results/squircle_choice.tsv
+"""
+
+# Generic /Built-in
+import argparse
+import concurrent.futures
+import os
+import sys
+
+#Other libs
+import numpy
+
+from conmem import arena
+from conmem import batch
+from conmem import cache
+from conmem import index as trackindex
+from conmem import trackload
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+#bump when the trial extraction changes, so cached files are read again
+VERSION = 1
+
+TRIALS = numpy.dtype([('subject','<i4'),('run','<i4'),('trial','<i4'),('object','i1'),('choice','i1'),('error','<f8'),('error2','<f8'),
+	('bias','<f8'),('x','<f8'),('z','<f8'),('quadrant','i1')])
+
+#arena quadrants as numbered by arena.quadrant(), with the squircle's wall in each
+QUADRANTS = ['+x-z', '-x-z', '+x+z', '-x+z']
+WALLS = ['round' if r else 'square' for r in arena.ROUND[arena.SQUIRCLE]]
+
+COLUMNS = ['level','group','trials','subjects','circle','circle_lo','circle_hi','bias','bias_lo','bias_hi']
+
+#bootstrap draws are made this many at a time, which bounds the index arrays' memory
+BLOCK = 1000
+
+
+############
+## TRIALS ##
+############
+
+def bias(error, error2):
+	"""+1 on the circle location, -1 on the square location, 0 halfway between them."""
+	with numpy.errstate(invalid='ignore', divide='ignore'):
+		return (error2 - error) / (error + error2)
+
+
+def squircleTrials(track, run=0):
+	"""TRIALS rows (subject 0) for the answered squircle trials of a loaded TEST file."""
+	trials = track.trials
+	rows = trials[(trials['context'] == arena.SQUIRCLE) & (trials['response'] >= 0) & (trials['choice'] > 0)]
+	out = numpy.zeros(len(rows), dtype=TRIALS)
+	out['run'] = run
+	for field in ['trial','object','choice','error','error2']:
+		out[field] = rows[field]
+	out['bias'] = bias(rows['error'], rows['error2'])
+	out['x'] = numpy.nan
+	out['z'] = numpy.nan
+	out['quadrant'] = -1
+	pose = track.pose
+	if len(rows) and len(pose):
+		#the response row is logged before the next pose sample, so the position is the last sample before it
+		at = numpy.clip(rows['response'] - 1, 0, len(pose) - 1)
+		out['x'] = pose['x'][at]
+		out['z'] = pose['z'][at]
+		#arena.quadrant() over arrays
+		out['quadrant'] = (out['x'] < 0).astype(numpy.int8) + 2 * (out['z'] >= 0).astype(numpy.int8)
+	return out
+
+
+def fileTrials(fname, cacheRoot=None, digest=None):
+	"""TRIALS for one TEST file, from the cache when its contents have not changed.
+
+	digest: the file's content hash, if already known (see cache.fileHash).
+	"""
+	store = cache.Cache(cacheRoot) if cacheRoot else None
+	if store is not None:
+		key = cache.contentKey(fname, 'choice', VERSION, digest=digest)
+		trials = store.get(key)
+		if trials is not None:
+			return trials
+	trials = squircleTrials(trackload.loadTracking(fname), trackload.parseTrackName(fname)[3])
+	if store is not None:
+		store.put(key, trials)
+	return trials
+
+
+def testFiles(roots, index=None):
+	"""{name: path} of the TEST tracking files under roots, from index if given."""
+	files = index.files(roots, 'TEST') if index is not None else batch.findTrackingFiles(roots)
+	return dict((n, f) for n, f in files.items() if n[0] == 'TEST')
+
+
+def studyTrials(roots, jobs=None, cacheRoot=None, index=None):
+	"""(subject names, TRIALS of every TEST file under roots); TRIALS['subject'] indexes the names."""
+	files = testFiles(roots, index)
+	names = sorted(files, key=lambda n: (batch._subjectKey(n[1]), n[3]))
+	fnames = [files[n] for n in names]
+	digests = [index.digest(f) for f in fnames] if index is not None else [None] * len(fnames)
+	with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+		results = list(pool.map(fileTrials, fnames, [cacheRoot] * len(names), digests, chunksize=4))
+	subjects = sorted(set(n[1] for n in names), key=batch._subjectKey)
+	for name, trials in zip(names, results):
+		trials['subject'] = subjects.index(name[1])
+	return subjects, numpy.concatenate(results) if results else numpy.zeros(0, dtype=TRIALS)
+
+
+###############
+## BOOTSTRAP ##
+###############
+
+def _interval(draws, ci):
+	"""Percentile interval (lower, upper on the first axis) over the draws of each cell; NaN for cells without a finite draw."""
+	tail = (100.0 - ci) / 2.0
+	flat = draws.reshape(len(draws), -1)
+	out = numpy.full((2, flat.shape[1]), numpy.nan)
+	#nanpercentile warns about all-NaN cells (empty in every draw), so those are left out rather than passed to it
+	finite = numpy.isfinite(flat).any(axis=0)
+	if finite.any():
+		out[:, finite] = numpy.nanpercentile(flat[:, finite], [tail, 100.0 - tail], axis=0)
+	return out.reshape((2,) + draws.shape[1:])
+
+
+def bootstrapSubjects(counts, circles, biases, draws=10000, ci=95.0, rng=None):
+	"""Percentile CIs of the pooled circle proportion and mean bias per cell, resampling subjects.
+
+	counts, circles, biases: (subjects, cells) trial counts, circle choices and summed biases. Returns two (2, cells) arrays.
+	"""
+	rng = numpy.random.default_rng(rng)
+	nSubjects, nCells = counts.shape
+	if nSubjects == 0:
+		return numpy.full((2, nCells), numpy.nan), numpy.full((2, nCells), numpy.nan)
+	proportion = numpy.empty((draws, nCells))
+	meanBias = numpy.empty((draws, nCells))
+	for start in range(0, draws, BLOCK):
+		n = min(BLOCK, draws - start)
+		pick = rng.integers(0, nSubjects, (n, nSubjects))
+		total = counts[pick].sum(axis=1)
+		with numpy.errstate(invalid='ignore', divide='ignore'):
+			proportion[start:start + n] = circles[pick].sum(axis=1) / total
+			meanBias[start:start + n] = biases[pick].sum(axis=1) / total
+	return _interval(proportion, ci), _interval(meanBias, ci)
+
+
+def bootstrapTrials(circle, values, draws=10000, ci=95.0, rng=None):
+	"""Percentile CIs of the circle proportion and mean bias of one cell's trials, resampling trials."""
+	rng = numpy.random.default_rng(rng)
+	n = len(circle)
+	if n == 0:
+		return numpy.full(2, numpy.nan), numpy.full(2, numpy.nan)
+	proportion = numpy.empty(draws)
+	meanBias = numpy.empty(draws)
+	for start in range(0, draws, BLOCK):
+		m = min(BLOCK, draws - start)
+		pick = rng.integers(0, n, (m, n))
+		proportion[start:start + m] = circle[pick].mean(axis=1)
+		meanBias[start:start + m] = values[pick].mean(axis=1)
+	return _interval(proportion, ci), _interval(meanBias, ci)
+
+
+#############
+## SUMMARY ##
+#############
+
+def cells(trials):
+	"""[(level, group, mask over trials)] for the whole study, each object and each quadrant."""
+	out = [('all', 'all', numpy.ones(len(trials), dtype=bool))]
+	for i, obj in enumerate(trackload.OBJECTS):
+		out.append(('object', obj, trials['object'] == i))
+	for i, name in enumerate(QUADRANTS):
+		out.append(('quadrant', name + ' ' + WALLS[i], trials['quadrant'] == i))
+	return out
+
+
+def summarize(trials, nSubjects, draws=10000, ci=95.0, unit='subject', seed=None):
+	"""One row (a list in COLUMNS order) per cell of cells(trials)."""
+	rng = numpy.random.default_rng(seed)
+	groups = cells(trials)
+	masks = numpy.array([mask for level, group, mask in groups]).reshape(len(groups), len(trials))
+	circle = (trials['choice'] == 1).astype(float)
+	#bias is undefined for a response exactly on both locations; such trials still count for the choice
+	values = numpy.nan_to_num(trials['bias'])
+
+	#(subjects, cells) sums, one matrix product each
+	bySubject = numpy.zeros((nSubjects, len(trials)))
+	bySubject[trials['subject'], numpy.arange(len(trials))] = 1
+	counts = bySubject @ masks.T
+	circles = bySubject @ (masks * circle).T
+	biases = bySubject @ (masks * values).T
+
+	if unit == 'subject':
+		circleCI, biasCI = bootstrapSubjects(counts, circles, biases, draws, ci, rng)
+	else:
+		intervals = [bootstrapTrials(circle[mask], values[mask], draws, ci, rng) for mask in masks]
+		circleCI = numpy.array([c for c, b in intervals]).T.reshape(2, len(groups))
+		biasCI = numpy.array([b for c, b in intervals]).T.reshape(2, len(groups))
+
+	rows = []
+	total = counts.sum(axis=0)
+	for i, (level, group, mask) in enumerate(groups):
+		n = int(total[i])
+		pCircle = circles[:, i].sum() / n if n else numpy.nan
+		meanBias = biases[:, i].sum() / n if n else numpy.nan
+		rows.append([level, group, n, int((counts[:, i] > 0).sum()), pCircle, circleCI[0, i], circleCI[1, i], meanBias, biasCI[0, i], biasCI[1, i]])
+	return rows
+
+
+def writeSummary(fname, rows):
+	with open(fname, 'w') as out:
+		out.write('\t'.join(COLUMNS) + '\n')
+		for row in rows:
+			out.write('\t'.join(['' if (isinstance(v, float) and v != v) else ('%.4f' % v if isinstance(v, float) else str(v)) for v in row]) + '\n')
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description='Circle/square choice proportions and bias in the squircle, with bootstrap CIs.')
+	parser.add_argument('--test', default=os.path.join('..', 'Data', 'TestingData'), help='TestingData directory')
+	parser.add_argument('--out', default=os.path.join('..', 'Data', 'Results', 'squircle_choice.tsv'), help='output table')
+	parser.add_argument('--draws', type=int, default=10000, help='bootstrap draws')
+	parser.add_argument('--ci', type=float, default=95.0, help='confidence level (%%)')
+	parser.add_argument('--unit', choices=['subject', 'trial'], default='subject', help='what the bootstrap resamples')
+	parser.add_argument('--seed', type=int, default=None, help='random seed, for reproducible intervals')
+	parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: all cores)')
+	parser.add_argument('--cache', default=None, help='cache directory (default: cache next to the output table)')
+	parser.add_argument('--no-cache', action='store_true', help='read every file again')
+	parser.add_argument('--index', default=trackindex.INDEX, help='tracking-file index')
+	parser.add_argument('--no-index', action='store_true', help='write the table again even if nothing changed')
+	args = parser.parse_args(argv)
+	outDir = os.path.dirname(os.path.abspath(args.out))
+	cacheRoot = None if args.no_cache else (args.cache or os.path.join(outDir, 'cache'))
+	index = None if args.no_index else trackindex.openIndex([args.test], args.index)
+	if index is not None:
+		fnames = sorted(testFiles([args.test], index).values())
+		#the file list is a parameter too, so the table is written again when a run is gone
+		params = (os.path.abspath(args.out), VERSION, args.draws, args.ci, args.unit, args.seed, cache.makeKey(*fnames))
+		if not index.stale('choice', fnames, params):
+			print('%s is up to date' % args.out)
+			index.close()
+			return
+	subjects, trials = studyTrials([args.test], args.jobs, cacheRoot, index)
+	os.makedirs(outDir, exist_ok=True)
+	writeSummary(args.out, summarize(trials, len(subjects), args.draws, args.ci, args.unit, args.seed))
+	print('%s: %d squircle trials, %d subjects' % (args.out, len(trials), len(subjects)))
+	if index is not None:
+		for fname in fnames:
+			index.done('choice', fname, params, args.out)
+		index.close()
+
+
+if __name__ == '__main__':
+	sys.exit(main())
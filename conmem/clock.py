@@ -0,0 +1,99 @@
+"""
+Monotonic high-resolution clock shared by the Squircle task scripts.
+
+Replaces time.clock(), which was removed in Python 3.8 and measures CPU time on some platforms.
+Timestamps are integer nanoseconds from time.perf_counter_ns(), taken against three epochs:
+	session - when the script started
+	run     - set with markRun(); in TEST this is the scanner trigger
+	trial   - set with markTrial() at the start of each trial
+session(), run() and trial() return seconds since the matching epoch.
+sessionClock is the instance the scripts and the other conmem modules share; setSource() swaps its time source (e.g. for a virtual clock).
+"""
+
+# Generic /Built-in
+import time
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+class Clock(object):
+
+	def __init__(self, source=time.perf_counter_ns):
+		self.source = source
+		self.markSession()
+
+	def setSource(self, source):
+		self.source = source
+		self.markSession()
+
+	def now(self):
+		return self.source()
+
+	############
+	## EPOCHS ##
+	############
+
+	def markSession(self):
+		self.sessionEpoch = self.source()
+		self.runEpoch = self.sessionEpoch
+		self.trialEpoch = self.sessionEpoch
+		return self.sessionEpoch
+
+	def markRun(self):
+		self.runEpoch = self.source()
+		self.trialEpoch = self.runEpoch
+		return self.runEpoch
+
+	def markTrial(self):
+		self.trialEpoch = self.source()
+		return self.trialEpoch
+
+	def session(self):
+		return (self.source() - self.sessionEpoch) * 1e-9
+
+	def run(self):
+		return (self.source() - self.runEpoch) * 1e-9
+
+	def trial(self):
+		return (self.source() - self.trialEpoch) * 1e-9
+
+	def seconds(self, ns, epoch='run'):
+		"""Converts raw timestamps (int or numpy array of ns) to seconds since the named epoch."""
+		return (ns - getattr(self, epoch + 'Epoch')) * 1e-9
+
+	#################
+	## SELF-CHECKS ##
+	#################
+
+	def resolution(self, samples=10000):
+		"""Smallest nonzero step seen between consecutive reads, in ns; None if the source never stepped (e.g. a virtual clock)."""
+		source = self.source
+		smallest = None
+		last = source()
+		for i in range(samples):
+			now = source()
+			if now != last and (smallest is None or now - last < smallest):
+				smallest = now - last
+			last = now
+		return smallest
+
+	def overhead(self, samples=10000):
+		"""Mean cost of one timestamp, in ns."""
+		source = self.source
+		start = source()
+		for i in range(samples):
+			source()
+		return (source() - start) / float(samples)
+
+	def report(self):
+		resolution = self.resolution()
+		text = 'clock: ' if resolution is None else 'clock: resolution %d ns, ' % resolution
+		return text + 'overhead %.0f ns per timestamp' % self.overhead()
+
+
+sessionClock = Clock()
+
+def setSource(source):
+	sessionClock.setSource(source)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+
+"""
+BIDS-style events.tsv export of the TEST runs.
+
+Each TEST_tracking_<sub>_<run> file (.txt or .trk) is read once, front to back, and every trial is written out as soon as its 'Replaced'
+row is read, as three rows (trial_type):
+	instruction  from the end of the previous trial (the trigger, for the first one) to its 'Start replace' row
+	rotation     the Replace() sweep, from its 'Rotation, <start>, <end>' row (files from before that row was logged: n/a)
+	response     from the end of the sweep (or the 'Start replace' row) to the 'Replaced' row
+Onsets and durations are in seconds from the scanner trigger (the run epoch set in WaitForTrig()), which is the timebase of TEST files.
+Every row also holds the trial number, context (circle, square, squircle), object, error, error2 (squircle: the square-location
+error) and the squircle choice (1 = closer to the circle location, 2 = the square one); missing values are n/a.
+
+Binary files store each event row's time; in text files an event row takes the time of the pose sample after it, the first one
+recorded after the event. Only the current trial is held in memory, so memory use does not grow with the length of the run.
+Files go to <out>/sub-<sub>/func/sub-<sub>_task-squircle_run-<run>_events.tsv, one process per file. With the tracking-file index
+(conmem.index), only runs that are new or changed since their events.tsv was written, or whose events.tsv is gone, are exported again.
+
+	python -m conmem.events --test ../Data/TestingData --out ../Data/BIDS
+"""
+
+# Generic /Built-in
+import argparse
+import concurrent.futures
+import os
+import sys
+
+#Other libs
+import numpy
+
+from conmem import batch
+from conmem import index as trackindex
+from conmem import tracklog
+from conmem import trackload
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+TASK = 'squircle'
+
+COLUMNS = ['onset','duration','trial_type','trial','context','object','error','error2','choice']
+
+
+#############
+## READING ##
+#############
+
+def eventTimes(fname):
+	"""Yields (time, event text) for every event row of a tracking file, in file order."""
+	if fname.endswith(tracklog.EXTENSIONS['binary']):
+		for records, texts in tracklog.readBlocks(fname):
+			rows = numpy.flatnonzero(records['event'])
+			for t, index in zip(records['t'][rows].tolist(), records['event'][rows].tolist()):
+				yield t, texts[index - 1]
+		return
+	pending = []
+	t = None
+	with open(fname) as f:
+		for line in f:
+			if '\t' in line:
+				t = float(line.split('\t', 1)[0])
+				for text in pending:
+					yield t, text
+				pending = []
+			elif line.strip():
+				pending.append(line.strip())
+	#events after the last sample keep the time of that sample
+	for text in pending:
+		yield t, text
+
+
+def trialRows(events):
+	"""Yields events.tsv rows (one list per row, in COLUMNS order) from (time, event text) pairs, one trial at a time."""
+	trial = 0
+	last = 0.0 #end of the previous trial; the trigger for the first one
+	start = rotation = None
+	context = 0
+	for t, text in events:
+		kind, ctx, obj, choice, error, error2, rotStart, rotEnd = trackload.parseEvent(text)[:8]
+		if kind == trackload.START_REPLACE:
+			trial += 1
+			start = t
+			rotation = None
+			context = ctx
+		elif kind == trackload.ROTATION and start is not None:
+			rotation = (rotStart, rotEnd)
+		elif kind == trackload.REPLACED and start is not None:
+			info = [trial, trackload.CONTEXTS[(ctx or context) - 1] if (ctx or context) else None,
+				trackload.OBJECTS[obj] if obj >= 0 else None, error, error2, choice or None]
+			yield [last, start - last, 'instruction'] + info
+			if rotation is None:
+				yield [start, None, 'rotation'] + info
+				responseStart = start
+			else:
+				yield [rotation[0], rotation[1] - rotation[0], 'rotation'] + info
+				responseStart = rotation[1]
+			yield [responseStart, t - responseStart, 'response'] + info
+			last = t
+			start = None
+
+
+def _format(value):
+	if value is None or (isinstance(value, float) and value != value):
+		return 'n/a'
+	if isinstance(value, float):
+		return '%.4f' % value
+	return str(value)
+
+
+#############
+## WRITING ##
+#############
+
+def eventsName(outDir, subject, run):
+	sub = 'sub-' + subject
+	return os.path.join(outDir, sub, 'func', sub + '_task-' + TASK + '_run-' + str(run) + '_events.tsv')
+
+
+def exportFile(fname, outDir):
+	"""Writes the events.tsv of one TEST tracking file; returns (its name, rows written)."""
+	study, subject, context, run = trackload.parseTrackName(fname)
+	dst = eventsName(outDir, subject, run)
+	os.makedirs(os.path.dirname(dst), exist_ok=True)
+	count = 0
+	tmp = dst + '.%d.tmp' % os.getpid()
+	with open(tmp, 'w') as out:
+		out.write('\t'.join(COLUMNS) + '\n')
+		for row in trialRows(eventTimes(fname)):
+			out.write('\t'.join([_format(v) for v in row]) + '\n')
+			count += 1
+	os.replace(tmp, dst)
+	return dst, count
+
+
+def exportAll(roots, outDir, jobs=None, index=None):
+	"""Writes an events.tsv for every TEST tracking file under roots (with index: every stale one); returns [(name, rows written)]."""
+	files = index.files(roots, 'TEST') if index is not None else batch.findTrackingFiles(roots)
+	fnames = [files[n] for n in sorted(n for n in files if n[0] == 'TEST')]
+	params = (os.path.abspath(outDir),)
+	if index is not None:
+		fnames = index.stale('events', fnames, params)
+	if not fnames:
+		return []
+	with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+		written = list(pool.map(exportFile, fnames, [outDir] * len(fnames)))
+	if index is not None:
+		for fname, (dst, count) in zip(fnames, written):
+			index.done('events', fname, params, dst)
+	return written
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description='Write BIDS-style events.tsv files for every TEST run.')
+	parser.add_argument('--test', default=os.path.join('..', 'Data', 'TestingData'), help='TestingData directory')
+	parser.add_argument('--out', default=os.path.join('..', 'Data', 'BIDS'), help='BIDS root to write sub-*/func/ into')
+	parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: all cores)')
+	parser.add_argument('--index', default=trackindex.INDEX, help='tracking-file index')
+	parser.add_argument('--no-index', action='store_true', help='export every run again')
+	args = parser.parse_args(argv)
+	index = None if args.no_index else trackindex.openIndex([args.test], args.index)
+	written = exportAll([args.test], args.out, args.jobs, index)
+	for fname, count in written:
+		print('%s: %d rows' % (fname, count))
+	if index is not None:
+		print('%d runs exported; the others are unchanged' % len(written))
+		index.close()
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+
+"""
+Per-frame timing and missed-vsync detection for the TEST script.
+
+FrameProfiler.frameStart() runs as the first update of every frame and frameEnd() as the last one (vizact.onupdate with
+viz.PRIORITY_FIRST_UPDATE / viz.PRIORITY_LAST_UPDATE). Each frame stores its start and end clock.Clock timestamps, the current phase
+(trigger, instruction, rotation, response) and the trial number in preallocated numpy arrays; nothing is computed in the frame loop.
+A frame has missed its deadline when the time from its start to the next frame's start is more than 1.5 refresh periods:
+with vsync on, that means at least one refresh was skipped (the count of skipped refreshes is stored with each miss).
+
+save() writes a compressed .npz sidecar next to the tracking file (TEST_tracking_<sub>_<run>.frames.npz) holding
+	start      frame start, ns since the run epoch (the trigger)
+	work       update time, frameStart to frameEnd, ns
+	interval   frame start to next frame start, ns (0 for the last frame)
+	phase, trial
+	trial_start  start of each trial (clock.Clock trial epoch), ns since the run epoch
+	since_trial  frame start, ns since the start of its trial (since the run epoch before the first trial)
+	phases     the phase names phase indexes into
+	hist       (phases, bins) counts of intervals per phase, in edges_ms bins
+	missed     frame index, phase, trial, interval ns and refreshes skipped for every missed deadline
+	refresh    refresh rate in Hz
+Print a summary of a sidecar with: python -m conmem.frameprofile <file>.frames.npz
+"""
+
+# Generic /Built-in
+import os
+import sys
+import time
+
+#Other libs
+import numpy
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+PHASES = ('setup', 'trigger', 'instruction', 'rotation', 'response')
+
+MISSED = numpy.dtype([('frame','<u4'),('phase','u1'),('trial','<u2'),('interval','<i8'),('skipped','<u2')])
+
+
+def sidecarName(trackName):
+	return os.path.splitext(trackName)[0] + '.frames.npz'
+
+
+class FrameProfiler(object):
+
+	def __init__(self, clock, refresh=60.0, epoch='run', chunk=1<<15):
+		self.clock = clock
+		self.refresh = float(refresh)
+		self.period = 1e9 / refresh
+		self.epoch = epoch
+		self.chunk = chunk
+		self.done = [] #full chunks as (starts, ends, phases, trials)
+		self._newChunk()
+		self.phaseIndex = 0
+		self.trial = 0
+		self.trialStarts = []
+		self.current = 0
+
+	def _newChunk(self):
+		self.starts = numpy.zeros(self.chunk, dtype=numpy.int64)
+		self.ends = numpy.zeros(self.chunk, dtype=numpy.int64)
+		self.phases = numpy.zeros(self.chunk, dtype=numpy.uint8)
+		self.trials = numpy.zeros(self.chunk, dtype=numpy.uint16)
+		self.n = 0
+
+	###########
+	## FRAME ##
+	###########
+
+	def frameStart(self):
+		if self.n == self.chunk:
+			self.done.append((self.starts, self.ends, self.phases, self.trials))
+			self._newChunk()
+		n = self.n
+		self.starts[n] = self.clock.now()
+		self.current = self.starts[n]
+		self.phases[n] = self.phaseIndex
+		self.trials[n] = self.trial
+
+	def frameTime(self):
+		"""Start stamp of the current frame, for updates that should all see the same time within a frame."""
+		return self.current
+
+	def frameEnd(self):
+		self.ends[self.n] = self.clock.now()
+		self.n += 1
+
+	def phase(self, name):
+		"""Sets the phase the following frames count towards."""
+		self.phaseIndex = PHASES.index(name)
+
+	def nextTrial(self):
+		"""Counts the following frames towards the next trial, which starts at the clock's trial epoch (call after markTrial())."""
+		self.trial += 1
+		self.trialStarts.append(self.clock.trialEpoch)
+
+	##############
+	## ANALYSIS ##
+	##############
+
+	def frames(self):
+		"""(starts, ends, phases, trials) arrays of all frames recorded so far."""
+		pieces = self.done + [(self.starts[:self.n], self.ends[:self.n], self.phases[:self.n], self.trials[:self.n])]
+		return [numpy.concatenate([p[i] for p in pieces]) for i in range(4)]
+
+	def summary(self, maxMs=None):
+		starts, ends, phases, trials = self.frames()
+		return summarize(starts, ends, phases, trials, self.refresh, maxMs)
+
+	def save(self, fname):
+		starts, ends, phases, trials = self.frames()
+		s = summarize(starts, ends, phases, trials, self.refresh)
+		epoch = getattr(self.clock, self.epoch + 'Epoch')
+		#trial 0 (frames before the first trial) starts at the epoch
+		trialStarts = numpy.array([epoch] + self.trialStarts, dtype=numpy.int64)
+		numpy.savez_compressed(fname, start=starts - epoch, trial_start=trialStarts[1:] - epoch, since_trial=starts - trialStarts[trials],
+			work=(ends - starts).astype(numpy.int32), interval=s['interval'], phase=phases, trial=trials, phases=numpy.array(PHASES),
+			hist=s['hist'], edges_ms=s['edges_ms'], missed=s['missed'], refresh=self.refresh)
+		return s
+
+	def overhead(self, samples=10000):
+		"""Mean wall-clock ns per frame spent in frameStart() + frameEnd(), measured on a scratch profiler with the same clock."""
+		scratch = FrameProfiler(self.clock, self.refresh, self.epoch, chunk=samples)
+		t = time.perf_counter_ns()
+		for i in range(samples):
+			scratch.frameStart()
+			scratch.frameEnd()
+		return (time.perf_counter_ns() - t) / float(samples)
+
+
+def summarize(starts, ends, phases, trials, refresh, maxMs=None):
+	"""Frame intervals, per-phase histograms and missed deadlines from raw frame arrays."""
+	period = 1e9 / refresh
+	interval = numpy.zeros(len(starts), dtype=numpy.int64)
+	interval[:-1] = numpy.diff(starts)
+	#1 ms bins up to four refresh periods; the last bin also counts anything longer
+	if maxMs is None:
+		maxMs = int(numpy.ceil(4 * period / 1e6))
+	edges = numpy.arange(maxMs + 1, dtype=float)
+	clipped = numpy.minimum(interval[:-1] / 1e6, maxMs - 0.5)
+	hist = numpy.zeros((len(PHASES), maxMs), dtype=numpy.int64)
+	for p in range(len(PHASES)):
+		hist[p] = numpy.histogram(clipped[phases[:-1] == p], edges)[0]
+	late = numpy.flatnonzero(interval > 1.5 * period)
+	missed = numpy.zeros(len(late), dtype=MISSED)
+	missed['frame'] = late
+	missed['phase'] = phases[late]
+	missed['trial'] = trials[late]
+	missed['interval'] = interval[late]
+	missed['skipped'] = numpy.rint(interval[late] / period).astype(numpy.int64) - 1
+	return {'interval': interval, 'hist': hist, 'edges_ms': edges, 'missed': missed, 'refresh': refresh, 'frames': len(starts),
+		'work': ends - starts, 'phase': phases}
+
+
+def report(s, overheadNs=None):
+	lines = ['frames: %d at %g Hz, %d missed deadlines (%d refreshes skipped)' % (s['frames'], s['refresh'], len(s['missed']), int(s['missed']['skipped'].sum()))]
+	period = 1e9 / s['refresh']
+	for p, name in enumerate(PHASES):
+		mine = s['phase'][:-1] == p
+		if not mine.any():
+			continue
+		intervals = s['interval'][:-1][mine] / 1e6
+		lines.append('  %-12s %6d frames, interval median %.2f ms, max %.2f ms, missed %d' % (name, mine.sum(), numpy.median(intervals),
+			intervals.max(), (s['missed']['phase'] == p).sum()))
+	if overheadNs is not None:
+		lines.append('  profiler overhead %.1f us per frame (%.3f%% of the frame budget)' % (overheadNs / 1e3, 100.0 * overheadNs / period))
+	return '\n'.join(lines)
+
+
+def loadProfile(fname):
+	with numpy.load(fname) as f:
+		return dict((key, f[key]) for key in f.files)
+
+
+if __name__ == '__main__':
+	for fname in sys.argv[1:]:
+		p = loadProfile(fname)
+		s = {'interval': p['interval'], 'missed': p['missed'], 'refresh': float(p['refresh']), 'frames': len(p['start']), 'phase': p['phase']}
+		print(fname)
+		print(report(s))
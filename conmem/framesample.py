@@ -0,0 +1,66 @@
+"""
+Per-frame pose sampling for the Squircle task scripts.
+
+FrameSampler.record() is registered to run once per rendered frame and copies the viewpoint pose into a preallocated ring buffer; it never touches the disk.
+Event rows are queued with mark(), so they keep their place between the samples.
+drain() hands everything recorded since the last drain to a tracklog writer, and is called by the scripts at trial boundaries (the Instruction() ITIs).
+If a trial outlasts the ring buffer, the oldest samples are overwritten and counted in overwritten.
+Samples and marks are stamped with raw clock.Clock nanoseconds and converted to seconds since the chosen epoch when drained,
+so samples taken before an epoch is set (e.g. before the TEST trigger) come out with negative times.
+"""
+
+#Other libs
+import numpy
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+SAMPLE = numpy.dtype([('t','<i8'),('x','<f8'),('z','<f8'),('yaw','<f8')])
+
+class FrameSampler(object):
+
+	def __init__(self, view, clock, epoch='run', size=1<<16):
+		self.view = view
+		self.clock = clock
+		self.epoch = epoch
+		self.buffer = numpy.zeros(size, dtype=SAMPLE)
+		self.size = size
+		self.head = 0 #samples recorded so far
+		self.tail = 0 #samples drained so far
+		self.marks = [] #(sample count when logged, time, event text)
+		self.overwritten = 0
+
+	def record(self):
+		position = self.view.getPosition()
+		self.buffer[self.head % self.size] = (self.clock.now(), position[0], position[2], self.view.getEuler()[0])
+		self.head += 1
+
+	def mark(self, text):
+		self.marks.append((self.head, self.clock.now(), text))
+
+	def pending(self):
+		return self.head - self.tail
+
+	def drain(self, writer):
+		"""Writes all samples and marks since the last drain to writer, in the order they happened."""
+		head = self.head
+		if head - self.tail > self.size:
+			self.overwritten += head - self.tail - self.size
+			self.tail = head - self.size
+		marks = self.marks
+		self.marks = []
+		for index, t, text in marks:
+			self._write(writer, min(max(index, self.tail), head))
+			writer.event(text, self.clock.seconds(t, self.epoch))
+		self._write(writer, head)
+
+	def _write(self, writer, stop):
+		#copy out [tail, stop) in at most two contiguous pieces of the ring
+		while self.tail < stop:
+			start = self.tail % self.size
+			end = min(start + stop - self.tail, self.size)
+			chunk = self.buffer[start:end]
+			writer.samples(self.clock.seconds(chunk['t'], self.epoch), chunk['x'], chunk['z'], chunk['yaw'])
+			self.tail += end - start
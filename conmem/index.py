@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+
+"""
+Persistent index of the tracking files in a data tree, kept in a SQLite file, so offline stages only process new or changed runs.
+
+refresh() walks the data directories and records every tracking file's size, modification time, content hash and parsed study,
+subject, context and run. Only files whose size or modification time differ from the index are read and hashed again, so a refresh
+after one new session reads one file; a file that was touched or copied back without changing keeps its hash and counts as unchanged.
+
+Stages record what they built from each file with done(stage, path, params, output); stale() returns the files whose contents,
+parameters or output have changed since, which are the only ones a stage needs to redo. events and resample skip the runs whose
+output is current. batch and choice write tables over many runs, so they write a table again only when one of its runs is stale or the
+list of runs changed (it is part of the parameters). batch, choice, occupancy and resample key their per-file caches on the files'
+contents and take the hashes from the index instead of reading every file to hash it.
+
+	python -m conmem.index --train ../Data/TrainingData --test ../Data/TestingData
+"""
+
+# Generic /Built-in
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+from conmem import cache
+from conmem import trackload
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+#default index file, next to the TrainingData and TestingData directories
+INDEX = os.path.join('..', 'Data', 'tracking_index.sqlite')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+	path TEXT PRIMARY KEY, study TEXT, subject TEXT, context INTEGER, run INTEGER,
+	size INTEGER, mtime INTEGER, hash TEXT, indexed REAL);
+CREATE TABLE IF NOT EXISTS artifacts (
+	stage TEXT, path TEXT, hash TEXT, params TEXT, output TEXT, built REAL,
+	PRIMARY KEY (stage, path));
+"""
+
+
+class TrackingIndex(object):
+
+	def __init__(self, fname=INDEX):
+		self.fname = fname
+		folder = os.path.dirname(os.path.abspath(fname))
+		os.makedirs(folder, exist_ok=True)
+		self.db = sqlite3.connect(fname)
+		self.db.executescript(SCHEMA)
+
+	def close(self):
+		self.db.close()
+
+	###########
+	## FILES ##
+	###########
+
+	def refresh(self, roots):
+		"""Brings the index up to date with the tracking files under roots. Returns {'new', 'changed', 'unchanged', 'removed': count}."""
+		counts = dict(new=0, changed=0, unchanged=0, removed=0)
+		known = dict((row[0], row[1:]) for row in self.db.execute('SELECT path, size, mtime, hash FROM files'))
+		seen = set()
+		with self.db:
+			for root in roots:
+				for dirpath, dirnames, filenames in os.walk(root):
+					for f in filenames:
+						name = trackload.parseTrackName(f)
+						if name is None:
+							continue
+						path = os.path.abspath(os.path.join(dirpath, f))
+						seen.add(path)
+						st = os.stat(path)
+						old = known.get(path)
+						if old is not None and old[0] == st.st_size and old[1] == st.st_mtime_ns:
+							counts['unchanged'] += 1
+							continue
+						digest = cache.fileHash(path)
+						if old is None:
+							counts['new'] += 1
+						elif old[2] == digest:
+							counts['unchanged'] += 1
+						else:
+							counts['changed'] += 1
+						self.db.execute('INSERT OR REPLACE INTO files VALUES (?,?,?,?,?,?,?,?,?)',
+							(path, name[0], name[1], name[2], name[3], st.st_size, st.st_mtime_ns, digest, time.time()))
+			#files under the refreshed roots that are gone; other trees in the same index are left alone
+			prefixes = tuple(os.path.join(os.path.abspath(root), '') for root in roots)
+			for path in known:
+				if path not in seen and path.startswith(prefixes):
+					self.db.execute('DELETE FROM files WHERE path = ?', (path,))
+					self.db.execute('DELETE FROM artifacts WHERE path = ?', (path,))
+					counts['removed'] += 1
+		return counts
+
+	def files(self, roots=None, study=None):
+		"""Indexed tracking files (under roots) keyed by (study, subject, context, run), as batch.findTrackingFiles(); .trk wins over .txt."""
+		found = {}
+		prefixes = tuple(os.path.join(os.path.abspath(root), '') for root in roots) if roots is not None else ('',)
+		for path, fileStudy, subject, context, run in self.db.execute('SELECT path, study, subject, context, run FROM files ORDER BY path'):
+			if (study is not None and fileStudy != study) or not path.startswith(prefixes):
+				continue
+			name = (fileStudy, subject, context, run)
+			if name not in found or path.endswith('.trk'):
+				found[name] = path
+		return found
+
+	def digest(self, path):
+		"""Content hash of an indexed file (None if it is not indexed)."""
+		row = self.db.execute('SELECT hash FROM files WHERE path = ?', (os.path.abspath(path),)).fetchone()
+		return row[0] if row else None
+
+	###############
+	## ARTIFACTS ##
+	###############
+
+	def stale(self, stage, paths, params=()):
+		"""The paths whose stage output is missing or was built from other contents or other parameters."""
+		params = repr(params)
+		built = {}
+		for path, same, old, output in self.db.execute('SELECT a.path, f.hash = a.hash, a.params, a.output FROM artifacts a '
+				'JOIN files f ON f.path = a.path WHERE a.stage = ?', (stage,)):
+			built[path] = bool(same) and old == params and (not output or os.path.exists(output))
+		return [p for p in paths if not built.get(os.path.abspath(p), False)]
+
+	def done(self, stage, path, params=(), output=None):
+		"""Records that stage has built output from the indexed contents of path."""
+		path = os.path.abspath(path)
+		with self.db:
+			self.db.execute('INSERT OR REPLACE INTO artifacts VALUES (?,?,?,?,?,?)',
+				(stage, path, self.digest(path), repr(params), output and os.path.abspath(output), time.time()))
+
+	def report(self):
+		files = self.db.execute('SELECT COUNT(*), COUNT(DISTINCT subject) FROM files').fetchone()
+		stages = self.db.execute('SELECT stage, COUNT(*) FROM artifacts GROUP BY stage ORDER BY stage').fetchall()
+		return '%d files, %d subjects; built: %s' % (files[0], files[1], ', '.join('%s %d' % s for s in stages) or 'nothing')
+
+
+def openIndex(roots, fname=INDEX):
+	"""TrackingIndex at fname, refreshed over roots."""
+	index = TrackingIndex(fname)
+	index.refresh([r for r in roots if r and os.path.isdir(r)])
+	return index
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description='Update the index of tracking files and show what changed.')
+	parser.add_argument('--train', default=os.path.join('..', 'Data', 'TrainingData'), help='TrainingData directory')
+	parser.add_argument('--test', default=os.path.join('..', 'Data', 'TestingData'), help='TestingData directory')
+	parser.add_argument('--index', default=INDEX, help='index file')
+	args = parser.parse_args(argv)
+	index = TrackingIndex(args.index)
+	counts = index.refresh([r for r in [args.train, args.test] if os.path.isdir(r)])
+	print('%s: %d new, %d changed, %d unchanged, %d removed' % (args.index, counts['new'], counts['changed'], counts['unchanged'], counts['removed']))
+	print(index.report())
+	index.close()
+
+
+if __name__ == '__main__':
+	sys.exit(main())
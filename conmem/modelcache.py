@@ -0,0 +1,136 @@
+"""
+Load-once, load-early model cache for the distal cues, boundary segments and test objects.
+
+The scripts place the same few .osgb files many times: four CIRCLE and four SQUARE boundary segments per arena, and in TEST the trees and
+boundaries of Scenes 1 and 2 again in Scene3 (squircle). Each file is loaded once, into a hidden master node, and every placement the
+scripts ask for with add() is a group node holding a clone of that master. A clone has its own transform, visibility and scene (all set
+on the group), but shares the loaded geometry and textures, so the file is read, decoded and uploaded to the GPU once.
+
+With asyncLoad, masters are loaded with viz.LOAD_ASYNC. The scripts call preload() right after viz.go(), so the files load in the
+background while the experimenter answers the subject/run prompts and the first instruction screen is up. add() never blocks: until
+its master has loaded, a placement is an empty group that gets its clone as soon as the load finishes. Before the first trial the
+scripts wait on waitReady(), the readiness barrier.
+
+report() gives the number of files loaded, how long the loads took to finish after preload(), the time spent cloning, and the size of the
+model files the clones did not load again.
+"""
+
+# Generic /Built-in
+import os
+import time
+
+#Other libs
+import viz
+import viztask
+
+from conmem import assets
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+class ModelCache(object):
+
+	def __init__(self, asyncLoad=False):
+		self.asyncLoad = asyncLoad
+		self.models = {} #file name -> hidden master node
+		self.waiting = {} #file name -> groups still waiting for their clone
+		self.instances = {} #file name -> groups handed out
+		self.started = time.perf_counter()
+		self.loadTime = None #seconds from the first load to the last one finishing
+		self.cloneTime = 0.0
+		self.failed = []
+
+	def preload(self, filenames):
+		"""Starts loading those of filenames not loaded yet; with asyncLoad the loads run in the background."""
+		filenames = [filename for filename in filenames if filename not in self.models]
+		if filenames:
+			self.started = time.perf_counter()
+		for filename in filenames:
+			self._load(filename)
+
+	def _load(self, filename):
+		if self.asyncLoad:
+			master = viz.addChild(assets.resolve(filename), flags=viz.LOAD_ASYNC)
+		else:
+			master = viz.addChild(assets.resolve(filename))
+		master.visible(viz.OFF)
+		self.models[filename] = master
+		self.waiting[filename] = []
+		self.instances[filename] = 0
+		self.loadTime = None
+
+	def add(self, filename, scene=None):
+		"""New placement of filename in scene (the main scene if None); never waits for the file to load."""
+		if filename not in self.models:
+			self._load(filename)
+		group = viz.addGroup() if scene is None else viz.addGroup(scene=scene)
+		self.instances[filename] += 1
+		self.waiting[filename].append(group)
+		self.update()
+		return group
+
+	def _loaded(self, filename):
+		if not self.asyncLoad:
+			return True
+		status = self.models[filename].getAsyncStatus()
+		if status == viz.ASYNC_FAILED and filename not in self.failed:
+			self.failed.append(filename)
+			print('Info: could not load ' + filename)
+		return status != viz.ASYNC_LOADING
+
+	def update(self):
+		"""Gives every waiting group whose file has loaded its clone; returns True once nothing is loading or waiting."""
+		done = True
+		for filename, groups in self.waiting.items():
+			if not self._loaded(filename):
+				done = False
+				continue
+			if groups:
+				t = time.perf_counter()
+				for group in groups:
+					self.models[filename].clone(parent=group).visible(viz.ON)
+				self.waiting[filename] = []
+				self.cloneTime += time.perf_counter() - t
+		if done and self.loadTime is None:
+			self.loadTime = time.perf_counter() - self.started
+		return done
+
+	def waitReady(self):
+		"""Task that returns once every model has loaded and every placement has its clone."""
+		while not self.update():
+			yield viztask.waitFrame(1)
+
+	def saved(self):
+		"""(loads avoided, bytes of model files not loaded again, or None if a file's size is unknown)."""
+		avoided = 0
+		size = 0
+		for filename, count in self.instances.items():
+			avoided += max(count - 1, 0)
+			fileSize = _fileSize(filename)
+			if fileSize is None:
+				size = None
+			elif size is not None:
+				size += fileSize * max(count - 1, 0)
+		return avoided, size
+
+	def report(self):
+		avoided, size = self.saved()
+		memory = 'model file sizes unknown' if size is None else '%.1f MB of model data not loaded again' % (size / 1e6)
+		loading = 'still loading' if self.loadTime is None else 'loaded %.2f s after preload' % self.loadTime
+		return 'models: %d files %s%s for %d placements; %.3f s cloning, %d reloads avoided, %s' % (len(self.models),
+			'(async) ' if self.asyncLoad else '', loading, sum(self.instances.values()), self.cloneTime, avoided, memory)
+
+
+def _fileSize(filename):
+	#Vizard finds models on its resource path; fall back to the name as given
+	filename = assets.resolve(filename)
+	try:
+		path = viz.res.getFullPath(filename)
+	except AttributeError:
+		path = filename
+	try:
+		return os.path.getsize(path)
+	except (OSError, TypeError):
+		return None
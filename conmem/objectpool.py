@@ -0,0 +1,57 @@
+"""
+Preloaded test objects for the collect phase.
+
+ObjectPool places each test object's .osgb model once at startup, through the scripts' ModelCache, and scales it; buildSensors() then
+gives the proximity engine each object's footprint, once the models have loaded (a footprint is the model's bounding box scaled by sensorScale
+about the box's own centre, which is offset from the node's origin for models like the plant and the beachball, as the old bounding-box sensors were).
+Collect() then only moves, shows and hides the pooled objects, and arms/disarms their footprints in the proximity engine,
+so there is no model loading or sensor construction inside the trial loop.
+"""
+
+#Other libs
+import viz
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+class ObjectPool(object):
+
+	def __init__(self, names, scaleFactors, proximity, models, sensorScale=(1.5,10,1.5)):
+		self.proximity = proximity
+		self.sensorScale = sensorScale
+		self.nodes = {}
+		for name, scale in zip(names, scaleFactors):
+			node = models.add(name + '.osgb')
+			node.setScale([scale,scale,scale])
+			node.visible(viz.OFF)
+			self.nodes[name] = node
+
+	def buildSensors(self):
+		"""Gives the proximity engine the footprints; call after ModelCache.waitReady(). Does nothing the second time."""
+		for name, node in self.nodes.items():
+			if name in self.proximity.footprints:
+				continue
+			#the bounding box is read while the node is visible so it is the model's; it keeps its offset from the node wherever it is shown
+			node.visible(viz.ON)
+			box = node.getBoundingBox()
+			origin = node.getPosition()
+			node.visible(viz.OFF)
+			self.proximity.addFootprint(name, box.size[0] * self.sensorScale[0] / 2.0, box.size[2] * self.sensorScale[2] / 2.0,
+				box.center[0] - origin[0], box.center[2] - origin[2])
+
+	def show(self, name, loc):
+		"""Places the object at loc, shows it and arms its footprint; wait on proximity.waitEnter(name)."""
+		node = self.nodes[name]
+		node.setPosition(loc)
+		node.visible(viz.ON)
+		self.proximity.arm(name, loc)
+
+	def hide(self, name):
+		self.nodes[name].visible(viz.OFF)
+		self.proximity.disarm(name)
+
+	def hideAll(self):
+		for name in self.nodes:
+			self.hide(name)
@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+
+"""
+Occupancy maps: where participants were in the arenas, per subject, context and run, and averaged over the group.
+
+fileMaps() bins one tracking file's navigation samples (from each 'Start ...' row to the trial's 'Replaced' / 'Collected' row; instruction
+screens and ITIs are left out) on a square grid of bins x bins cells spanning [-radius, radius] in x and z, for each context:
+	maps[context - 1, 0]  sample counts
+	maps[context - 1, 1]  dwell time, seconds: each sample counts for the time until the next one (at most MAXGAP)
+Binning is one bincount per file over flat cell indices. Each sample takes its trial's context (TRAIN: the one in the file name).
+
+Per-file maps are cached under a key made from the hash of the file's contents and the bin parameters (cache.contentKey), so a rerun only
+bins files whose contents changed, whatever their names or modification times; a copied tree reuses the same entries. With the
+tracking-file index (conmem.index), the hashes come from the index, so unchanged files are not even read to hash them.
+studyMaps() sums a subject's runs per context, and groupMaps() averages the subjects' dwell maps after normalizing each to proportions
+of that subject's time in the context, so every subject weighs the same.
+
+	python -m conmem.occupancy --train ../Data/TrainingData --out ../Data/Results/occupancy.npz
+"""
+
+# Generic /Built-in
+import argparse
+import concurrent.futures
+import os
+import sys
+
+#Other libs
+import numpy
+
+from conmem import batch
+from conmem import cache
+from conmem import index as trackindex
+from conmem import trackload
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+#bump when the binning changes, so cached maps are recomputed
+VERSION = 1
+
+#a sample never counts for longer than this (s), so a gap in the log does not pile up dwell time in one cell
+MAXGAP = 0.5
+
+STARTS = (trackload.START_COLLECT, trackload.START_REPLACE)
+ENDS = (trackload.REPLACED, trackload.COLLECTED, trackload.COLLECTED_INITIAL)
+
+
+##############
+## BINNING ##
+##############
+
+def navigating(track):
+	"""Boolean mask of the pose samples taken between a trial's start row and its response row."""
+	n = len(track.pose)
+	events = track.events
+	delta = numpy.zeros(n + 1, dtype=numpy.int32)
+	numpy.add.at(delta, numpy.minimum(events['sample'][numpy.isin(events['kind'], STARTS)], n), 1)
+	numpy.add.at(delta, numpy.minimum(events['sample'][numpy.isin(events['kind'], ENDS)], n), -1)
+	return numpy.cumsum(delta)[:n] > 0
+
+
+def sampleContexts(track):
+	"""Context (1-3) of each pose sample, from its trial; 0 outside trials."""
+	contexts = numpy.zeros(len(track.pose), dtype=numpy.int8)
+	trial = track.pose['trial']
+	inTrial = (trial > 0) & (trial <= len(track.trials))
+	contexts[inTrial] = track.trials['context'][trial[inTrial] - 1]
+	return contexts
+
+
+def binMaps(x, z, dwell, contexts, bins, radius):
+	"""(3, 2, bins, bins) counts and dwell maps for samples at x, z."""
+	ix = numpy.floor((x + radius) * (bins / (2.0 * radius))).astype(numpy.int64)
+	iz = numpy.floor((z + radius) * (bins / (2.0 * radius))).astype(numpy.int64)
+	keep = (ix >= 0) & (ix < bins) & (iz >= 0) & (iz < bins) & (contexts > 0)
+	cells = ((contexts[keep].astype(numpy.int64) - 1) * bins + iz[keep]) * bins + ix[keep]
+	size = len(trackload.CONTEXTS) * bins * bins
+	maps = numpy.zeros((len(trackload.CONTEXTS), 2, bins, bins))
+	maps[:, 0] = numpy.bincount(cells, minlength=size).reshape(-1, bins, bins)
+	maps[:, 1] = numpy.bincount(cells, weights=dwell[keep], minlength=size).reshape(-1, bins, bins)
+	return maps
+
+
+def trackMaps(track, bins=29, radius=14.5):
+	"""(3, 2, bins, bins) maps of a loaded trackload.Tracking."""
+	pose = track.pose
+	if len(pose) == 0:
+		return numpy.zeros((len(trackload.CONTEXTS), 2, bins, bins))
+	dwell = numpy.zeros(len(pose))
+	dwell[:-1] = numpy.minimum(numpy.diff(pose['t']), MAXGAP)
+	mask = navigating(track)
+	return binMaps(pose['x'][mask], pose['z'][mask], dwell[mask], sampleContexts(track)[mask], bins, radius)
+
+
+def fileMaps(fname, bins=29, radius=14.5, cacheRoot=None, digest=None):
+	"""(3, 2, bins, bins) maps of one tracking file, from the cache when its contents and the bins are unchanged.
+
+	digest: the file's content hash, if already known (see cache.fileHash).
+	"""
+	store = cache.Cache(cacheRoot) if cacheRoot else None
+	if store is not None:
+		key = cache.contentKey(fname, 'occupancy', bins, radius, MAXGAP, VERSION, digest=digest)
+		maps = store.get(key)
+		if maps is not None:
+			return maps
+	maps = trackMaps(trackload.loadTracking(fname), bins, radius)
+	if store is not None:
+		store.put(key, maps)
+	return maps
+
+
+#################
+## AGGREGATION ##
+#################
+
+def studyMaps(roots, study='TRAIN', bins=29, radius=14.5, jobs=None, cacheRoot=None, index=None):
+	"""{(subject, run): maps} for every file of study under roots, and {subject: maps summed over runs}."""
+	files = index.files(roots, study) if index is not None else batch.findTrackingFiles(roots)
+	names = sorted(n for n in files if n[0] == study)
+	fnames = [files[name] for name in names]
+	digests = [index.digest(f) for f in fnames] if index is not None else [None] * len(fnames)
+	n = len(names)
+	with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+		results = list(pool.map(fileMaps, fnames, [bins] * n, [radius] * n, [cacheRoot] * n, digests))
+	runs = {}
+	subjects = {}
+	for name, maps in zip(names, results):
+		runs[(name[1], name[3])] = maps
+		subjects[name[1]] = subjects.get(name[1], 0) + maps
+	return runs, subjects
+
+
+def groupMaps(subjects):
+	"""(3, bins, bins) mean over subjects of each subject's dwell map as proportions of its time in that context (NaN: no subject)."""
+	dwell = numpy.array([maps[:, 1] for maps in subjects.values()])
+	if len(dwell) == 0:
+		return None
+	totals = dwell.sum(axis=(2, 3), keepdims=True)
+	#subjects who never were in a context do not count towards its mean
+	present = totals > 0
+	proportions = dwell / numpy.where(present, totals, 1.0)
+	with numpy.errstate(invalid='ignore', divide='ignore'):
+		return proportions.sum(axis=0) / present.sum(axis=0)
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description='Occupancy and dwell-time maps of the arenas, per subject and for the group.')
+	parser.add_argument('--train', default=os.path.join('..', 'Data', 'TrainingData'), help='TrainingData directory')
+	parser.add_argument('--test', default=None, help='TestingData directory (maps TEST files instead)')
+	parser.add_argument('--out', default=os.path.join('..', 'Data', 'Results', 'occupancy.npz'), help='output .npz file')
+	parser.add_argument('--bins', type=int, default=29, help='cells per side')
+	parser.add_argument('--radius', type=float, default=14.5, help='half width of the mapped area (m)')
+	parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: all cores)')
+	parser.add_argument('--cache', default=None, help='cache directory (default: cache next to the output file)')
+	parser.add_argument('--no-cache', action='store_true', help='bin every file again')
+	parser.add_argument('--index', default=trackindex.INDEX, help='tracking-file index')
+	parser.add_argument('--no-index', action='store_true', help='hash every file instead of using the index')
+	args = parser.parse_args(argv)
+	outDir = os.path.dirname(os.path.abspath(args.out))
+	cacheRoot = None if args.no_cache else (args.cache or os.path.join(outDir, 'cache'))
+	study, root = ('TEST', args.test) if args.test else ('TRAIN', args.train)
+	index = None if args.no_index or cacheRoot is None else trackindex.openIndex([root], args.index)
+	runs, subjects = studyMaps([root], study, args.bins, args.radius, args.jobs, cacheRoot, index)
+	if index is not None:
+		index.close()
+	os.makedirs(outDir, exist_ok=True)
+	arrays = dict(('sub-%s_run-%d' % key, maps) for key, maps in runs.items())
+	arrays.update(('sub-%s' % subject, maps) for subject, maps in subjects.items())
+	group = groupMaps(subjects)
+	if group is not None:
+		arrays['group'] = group
+	numpy.savez_compressed(args.out, edges=numpy.linspace(-args.radius, args.radius, args.bins + 1), contexts=numpy.array(trackload.CONTEXTS), **arrays)
+	print('%s: %d runs, %d subjects' % (args.out, len(runs), len(subjects)))
+
+
+if __name__ == '__main__':
+	sys.exit(main())
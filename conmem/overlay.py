@@ -0,0 +1,85 @@
+"""
+Reusable instruction and feedback overlay for the Squircle task scripts.
+
+Overlay creates one screen text node and one feedback quad in the instruction scene, and loads the five smile<N>.tif textures, once.
+Instruction(), StartRun() and WaitForTrig() then only change the text, texture, position and visibility of those nodes,
+instead of adding a new text node (and a new quad plus a texture load for feedback) every trial.
+
+SceneSizeCheck samples the number of nodes in the scenes at each trial, so a session can show that the scene graph stays flat.
+"""
+
+#Other libs
+import viz
+
+from conmem import assets
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+class Overlay(object):
+
+	def __init__(self, scene, feedback=True, quadSize=(500,400)):
+		self.scene = scene
+		self.text = viz.addText('', viz.SCREEN, scene=scene)
+		self.text.visible(0)
+		self.smiles = []
+		self.quad = None
+		if feedback:
+			self.smiles = [viz.add(assets.resolve('smile' + str(level) + '.tif')) for level in range(1, 6)]
+			self.quad = viz.addTexQuad(parent=viz.SCREEN, scene=scene, size=list(quadSize))
+			self.quad.setPosition([0.5, 0.5, 0]) #put quad in view
+			self.quad.visible(0)
+
+	def showText(self, message, position=(0.4,0.5,0), fontSize=36, color=viz.WHITE):
+		self.text.message(message)
+		self.text.fontSize(fontSize)
+		self.text.color(list(color))
+		self.text.setPosition(list(position))
+		self.text.visible(1)
+
+	def hideText(self):
+		self.text.visible(0)
+
+	def showFeedback(self, level):
+		"""Shows smile<level>.tif, level 1-5."""
+		self.quad.texture(self.smiles[level - 1])
+		self.quad.visible(1)
+
+	def hideFeedback(self):
+		if self.quad is not None:
+			self.quad.visible(0)
+
+	def hide(self):
+		self.hideText()
+		self.hideFeedback()
+
+
+def sceneNodeCount(scenes=(1,2,3,4)):
+	"""Number of nodes (at any depth) in the given scenes."""
+	total = 0
+	for n in scenes:
+		total += len(getattr(viz, 'Scene' + str(n)).getChildren(all=True))
+	return total
+
+
+class SceneSizeCheck(object):
+	"""Records the scene node count at each sample() and reports whether it grew after the first one."""
+
+	def __init__(self, scenes=(1,2,3,4)):
+		self.scenes = scenes
+		self.counts = []
+
+	def sample(self):
+		count = sceneNodeCount(self.scenes)
+		self.counts.append(count)
+		return count
+
+	def isFlat(self):
+		return len(self.counts) < 2 or max(self.counts) == self.counts[0]
+
+	def report(self):
+		if not self.counts:
+			return 'scene nodes: not sampled'
+		return 'scene nodes: %d at first trial, %d max over %d trials (%s)' % (self.counts[0], max(self.counts), len(self.counts), 'flat' if self.isFlat() else 'GREW')
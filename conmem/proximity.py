@@ -0,0 +1,84 @@
+"""
+Analytic proximity detection for the collect phase.
+
+Collect() used a vizproximity.Manager with one bounding-box sensor per test object, tested in 3D against every target each frame.
+The task only ever needs one target (the viewpoint) and one armed object at a time, at a fixed location, so ProximityEngine keeps
+each object's footprint (the half sizes in x and z of its scaled sensor box and the offset of the box centre from the object's position,
+computed once when the models have loaded) and, once per
+frame, checks the view's x/z against the armed footprints: two subtractions and two compares per object, whatever the scene holds.
+
+On the frame the view is first inside an armed footprint, the object is disarmed, its enter callbacks run, waitEnter() returns on the next
+frame, and the entry is recorded in entries as (name, armed, entered, frame): clock.Clock timestamps of the arming and of the update that
+detected the entry, and viz.getFrameNumber() of that frame.
+"""
+
+#Other libs
+import viz
+import viztask
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+class EnterSignal(viztask.Signal):
+	"""Signal sent when the view enters an object's footprint; center is the centre of the armed footprint (None when disarmed)."""
+
+	def __init__(self):
+		viztask.Signal.__init__(self)
+		self.center = None
+
+
+class ProximityEngine(object):
+
+	def __init__(self, view, clock):
+		self.view = view
+		self.clock = clock
+		self.footprints = {} #name -> (half x, half z, offset x, offset z)
+		self.armed = {} #name -> (x, z, half x, half z, armed at)
+		self.signals = {}
+		self.callbacks = []
+		self.entries = []
+
+	def addFootprint(self, name, halfX, halfZ, offsetX=0.0, offsetZ=0.0):
+		self.footprints[name] = (halfX, halfZ, offsetX, offsetZ)
+		self.signals[name] = EnterSignal()
+
+	def arm(self, name, loc):
+		"""Starts watching for the view to enter name's footprint, for the object placed at loc."""
+		halfX, halfZ, offsetX, offsetZ = self.footprints[name]
+		x = loc[0] + offsetX
+		z = loc[2] + offsetZ
+		self.armed[name] = (x, z, halfX, halfZ, self.clock.now())
+		self.signals[name].center = [x, loc[1], z]
+
+	def disarm(self, name):
+		self.armed.pop(name, None)
+		if name in self.signals:
+			self.signals[name].center = None
+
+	def onEnter(self, function, *args):
+		"""Calls function(name, *args) on every entry."""
+		self.callbacks.append((function, args))
+
+	def waitEnter(self, name):
+		return self.signals[name].wait()
+
+	def update(self):
+		if not self.armed:
+			return
+		pos = self.view.getPosition()
+		for name, (x, z, halfX, halfZ, armedAt) in list(self.armed.items()):
+			if abs(pos[0] - x) <= halfX and abs(pos[2] - z) <= halfZ:
+				self.entries.append((name, armedAt, self.clock.now(), viz.getFrameNumber()))
+				self.disarm(name)
+				for function, args in self.callbacks:
+					function(name, *args)
+				self.signals[name].send()
+
+	def lastEntry(self, name):
+		"""(armed, entered, frame) of name's most recent entry, or None."""
+		for entry in reversed(self.entries):
+			if entry[0] == name:
+				return entry[1:]
+		return None
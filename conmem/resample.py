@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+
+"""
+Resampling of tracking files onto a uniform time grid (the fMRI TR, or e.g. 10 Hz), for building regressors.
+
+resample() interpolates a whole run at once: one searchsorted finds the pose sample before every grid time, and x, z, the yaw and the
+distance walked are interpolated linearly between that sample and the next with numpy array arithmetic. The yaw is unwrapped first
+(359 -> 361, not 359 -> 1), so it never swings back through 0 between two samples; the output yaw is unwrapped too (cumulative heading,
+in degrees), and yawWrapped() folds it back into [-180, 180). Steps longer than batch.TELEPORT are teleports: grid times inside them
+hold the sample before the jump instead of sliding across the arena, and add no distance walked.
+
+Each grid row holds:
+	t       grid time, seconds on the tracking file's timebase (TEST: since the scanner trigger; TRAIN: since the session start)
+	x, z    position
+	yaw     unwrapped heading, degrees
+	speed   distance walked from the previous grid time to this one, divided by the step (m/s; 0 for the first row)
+	trial   trial the sample at or before the grid time belongs to (0 before the first trial)
+	valid   False for grid times outside the recorded samples (their other values are NaN / 0)
+
+resampleMany() does every file in a process pool and caches each result by the hash of the file's contents and the grid parameters,
+so regenerating regressors for a study only resamples new or changed files. With the tracking-file index (conmem.index), the hashes
+come from the index, and main() also skips writing the tables of runs that are unchanged since their table was written.
+
+	python -m conmem.resample --test ../Data/TestingData --step 2.0 --out ../Data/Regressors
+"""
+
+# Generic /Built-in
+import argparse
+import concurrent.futures
+import os
+import sys
+
+#Other libs
+import numpy
+
+from conmem import batch
+from conmem import cache
+from conmem import index as trackindex
+from conmem import trackload
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+#bump when the resampling changes, so cached grids are recomputed
+VERSION = 2
+
+GRID = numpy.dtype([('t','<f8'),('x','<f8'),('z','<f8'),('yaw','<f8'),('speed','<f8'),('trial','<i4'),('valid','?')])
+
+COLUMNS = ['t','x','z','yaw','speed','trial']
+
+
+################
+## RESAMPLING ##
+################
+
+def makeGrid(step, start=0.0, stop=None, pose=None):
+	"""Grid times start, start + step, ... up to stop (default: the last pose sample)."""
+	if stop is None:
+		stop = pose['t'][-1] if pose is not None and len(pose) else start
+	return start + step * numpy.arange(int(numpy.floor((stop - start) / step + 1e-9)) + 1)
+
+
+def resample(pose, times):
+	"""GRID rows for pose (a trackload POSE array) at the given times."""
+	out = numpy.zeros(len(times), dtype=GRID)
+	out['t'] = times
+	n = len(pose)
+	if n == 0:
+		for field in ['x','z','yaw','speed']:
+			out[field] = numpy.nan
+		return out
+
+	t = pose['t']
+	yaw = numpy.degrees(numpy.unwrap(numpy.radians(pose['yaw'])))
+	step = numpy.hypot(numpy.diff(pose['x']), numpy.diff(pose['z']))
+	jump = step > batch.TELEPORT
+	walked = numpy.concatenate(([0], numpy.cumsum(numpy.where(jump, 0, step))))
+
+	#sample before each grid time, and how far the grid time is towards the next one (0 inside a teleport)
+	last = numpy.clip(numpy.searchsorted(t, times, 'right') - 1, 0, n - 1)
+	before = numpy.minimum(last, max(n - 2, 0))
+	after = numpy.minimum(before + 1, n - 1)
+	span = t[after] - t[before]
+	w = numpy.zeros(len(times))
+	moving = span > 0
+	w[moving] = (times[moving] - t[before][moving]) / span[moving]
+	w = numpy.clip(w, 0, 1)
+	if n > 1:
+		w[jump[before]] = 0
+
+	out['x'] = pose['x'][before] + w * (pose['x'][after] - pose['x'][before])
+	out['z'] = pose['z'][before] + w * (pose['z'][after] - pose['z'][before])
+	out['yaw'] = yaw[before] + w * (yaw[after] - yaw[before])
+	distance = walked[before] + w * (walked[after] - walked[before])
+	#the interpolation pairs the last sample with the one before it; the trial is the last sample's own
+	out['trial'] = pose['trial'][last]
+
+	out['valid'] = (times >= t[0]) & (times <= t[-1])
+	if len(times) > 1:
+		out['speed'][1:] = numpy.diff(distance) / numpy.diff(times)
+	invalid = ~out['valid']
+	for field in ['x','z','yaw','speed']:
+		out[field][invalid] = numpy.nan
+	out['trial'][invalid] = 0
+	return out
+
+
+def yawWrapped(yaw):
+	"""Unwrapped yaw folded back into [-180, 180)."""
+	return (yaw + 180.0) % 360.0 - 180.0
+
+
+###########
+## FILES ##
+###########
+
+def fileGrid(fname, step, start=0.0, stop=None, cacheRoot=None, digest=None):
+	"""GRID rows for one tracking file, from the cache when its contents and the grid are unchanged.
+
+	digest: the file's content hash, if already known (see cache.fileHash).
+	"""
+	store = cache.Cache(cacheRoot) if cacheRoot else None
+	if store is not None:
+		key = cache.contentKey(fname, 'resample', step, start, stop, VERSION, digest=digest)
+		grid = store.get(key)
+		if grid is not None:
+			return grid
+	pose = trackload.loadTracking(fname).pose
+	grid = resample(pose, makeGrid(step, start, stop, pose))
+	if store is not None:
+		store.put(key, grid)
+	return grid
+
+
+def resampleMany(fnames, step, start=0.0, stop=None, jobs=None, cacheRoot=None, digests=None):
+	"""GRID arrays for fnames, in the same order, resampled in a process pool; digests: the files' content hashes, if known."""
+	fnames = list(fnames)
+	n = len(fnames)
+	digests = list(digests) if digests is not None else [None] * n
+	if n < 2 or jobs == 1:
+		return [fileGrid(f, step, start, stop, cacheRoot, d) for f, d in zip(fnames, digests)]
+	with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+		return list(pool.map(fileGrid, fnames, [step] * n, [start] * n, [stop] * n, [cacheRoot] * n, digests, chunksize=4))
+
+
+def writeGrid(fname, grid):
+	"""Writes the valid rows of grid as a tab-separated table."""
+	rows = grid[grid['valid']]
+	with open(fname, 'w') as out:
+		out.write('\t'.join(COLUMNS) + '\n')
+		numpy.savetxt(out, numpy.column_stack([rows[c] for c in COLUMNS]), fmt=['%.3f','%.4f','%.4f','%.3f','%.4f','%d'], delimiter='\t')
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description='Resample tracking files onto a uniform time grid (e.g. the TR).')
+	parser.add_argument('--train', default=None, help='TrainingData directory')
+	parser.add_argument('--test', default=os.path.join('..', 'Data', 'TestingData'), help='TestingData directory')
+	parser.add_argument('--out', default=os.path.join('..', 'Data', 'Regressors'), help='directory for the per-run tables')
+	parser.add_argument('--step', type=float, default=2.0, help='grid step in seconds (the TR, or 0.1 for 10 Hz)')
+	parser.add_argument('--start', type=float, default=0.0, help='first grid time (TEST: seconds after the trigger)')
+	parser.add_argument('--stop', type=float, default=None, help='last grid time (default: the end of each file)')
+	parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: all cores)')
+	parser.add_argument('--cache', default=None, help='cache directory (default: <out>/cache)')
+	parser.add_argument('--no-cache', action='store_true', help='resample every file again')
+	parser.add_argument('--index', default=trackindex.INDEX, help='tracking-file index')
+	parser.add_argument('--no-index', action='store_true', help='write every table again')
+	args = parser.parse_args(argv)
+	cacheRoot = None if args.no_cache else (args.cache or os.path.join(args.out, 'cache'))
+	roots = [r for r in [args.train, args.test] if r and os.path.isdir(r)]
+	index = None if args.no_index else trackindex.openIndex(roots, args.index)
+	files = index.files(roots) if index is not None else batch.findTrackingFiles(roots)
+	fnames = [files[n] for n in sorted(files)]
+	params = (os.path.abspath(args.out), args.step, args.start, args.stop, VERSION)
+	if index is not None:
+		fnames = index.stale('resample', fnames, params)
+	digests = [index.digest(f) for f in fnames] if index is not None else None
+	os.makedirs(args.out, exist_ok=True)
+	for source, grid in zip(fnames, resampleMany(fnames, args.step, args.start, args.stop, args.jobs, cacheRoot, digests)):
+		fname = os.path.join(args.out, os.path.splitext(os.path.basename(source))[0] + '_grid.tsv')
+		writeGrid(fname, grid)
+		if index is not None:
+			index.done('resample', source, params, fname)
+		print(fname)
+	if index is not None:
+		index.close()
+
+
+if __name__ == '__main__':
+	sys.exit(main())
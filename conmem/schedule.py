@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+
+"""
+Seeded trial schedules (context and object per trial) for the TEST script.
+
+The schedule follows the original EXPERIMENT() scheme: trial blocks alternate between a random order of contexts 1-2 and of contexts 1-3,
+and each context draws the least-used of its objects (ties broken at random). Picking uniformly among the least-used objects is the same as
+walking through back-to-back random permutations of the objects, which is how the objects are generated here, in one pass per context.
+Every context keeps its own object counts (the old code aliased c2 = c3 = c1, so all contexts shared one count list).
+
+Schedules are tab-separated text files, one "context<TAB>object" row per trial, after a '#' header line that records the seed.
+Write the schedules for a study ahead of time with:
+	python -m conmem.schedule --subjects 1-30 --runs 4 --out ../Data/TestingData --seed 2021
+"""
+
+# Generic /Built-in
+import argparse
+import os
+import sys
+
+#Other libs
+import numpy
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+def makeSchedule(trials_per_context=20, seed=None, nObjects=4):
+	"""Returns (contexts, objects) as int arrays; contexts are 1-3, objects are indices into TestObjects."""
+	rng = numpy.random.default_rng(seed)
+	#block n is a permutation of contexts 1-2 for even n and of 1-3 for odd n
+	sizes = numpy.where(numpy.arange(trials_per_context) % 2 == 1, 3, 2)
+	nTrials = int(sizes.sum())
+	keys = rng.random(nTrials) + numpy.repeat(numpy.arange(trials_per_context), sizes)
+	#sorting random keys within each block shuffles the block; block offsets keep blocks in order
+	order = numpy.argsort(keys)
+	starts = numpy.repeat(numpy.cumsum(sizes) - sizes, sizes)
+	contexts = (numpy.arange(nTrials) - starts + 1)[order].astype(numpy.int8)
+
+	objects = numpy.zeros(nTrials, dtype=numpy.int8)
+	for context in (1, 2, 3):
+		where = numpy.flatnonzero(contexts == context)
+		nBlocks = -(-len(where) // nObjects)
+		perms = numpy.argsort(rng.random((nBlocks, nObjects)), axis=1)
+		objects[where] = perms.ravel()[:len(where)]
+	return contexts, objects
+
+
+def newSeed():
+	"""A fresh random study seed, for schedules made without one; save it with them so they can be made again."""
+	return int(numpy.random.SeedSequence().entropy % (1 << 63))
+
+
+def makeSchedules(count, trials_per_context=20, seed=0, nObjects=4):
+	"""count candidate schedules, each from its own child seed of seed."""
+	return [makeSchedule(trials_per_context, [seed, n], nObjects) for n in range(count)]
+
+
+def validateSchedule(contexts, objects, nObjects=4):
+	"""Raises ValueError unless every context's object counts stay within one of each other at every trial."""
+	contexts = numpy.asarray(contexts)
+	objects = numpy.asarray(objects)
+	if len(contexts) != len(objects):
+		raise ValueError('schedule has %d contexts but %d objects' % (len(contexts), len(objects)))
+	if not numpy.isin(contexts, [1, 2, 3]).all() or not ((objects >= 0) & (objects < nObjects)).all():
+		raise ValueError('schedule has contexts outside 1-3 or objects outside 0-' + str(nObjects - 1))
+	for context in (1, 2, 3):
+		mine = objects[contexts == context]
+		counts = numpy.cumsum(numpy.eye(nObjects, dtype=numpy.int32)[mine], axis=0)
+		if len(mine) and (counts.max(axis=1) - counts.min(axis=1)).max() > 1:
+			raise ValueError('objects are not balanced within context ' + str(context))
+
+
+def saveSchedule(fname, contexts, objects, header=''):
+	validateSchedule(contexts, objects)
+	with open(fname, 'w') as f:
+		f.write('# context\tobject ' + header + '\n')
+		for c, o in zip(numpy.asarray(contexts).tolist(), numpy.asarray(objects).tolist()):
+			f.write(str(c) + '\t' + str(o) + '\n')
+
+
+def loadSchedule(fname):
+	rows = numpy.loadtxt(fname, dtype=numpy.int64, comments='#', ndmin=2)
+	contexts = rows[:, 0].astype(numpy.int8)
+	objects = rows[:, 1].astype(numpy.int8)
+	validateSchedule(contexts, objects)
+	return contexts, objects
+
+
+def scheduleFileName(dpath, subject, runNum):
+	return os.path.join(dpath, 'TEST_schedule_' + str(subject) + '_' + str(runNum) + '.txt')
+
+
+def _numbers(spec):
+	#'1-30' or '1,3,5' or '7'
+	out = []
+	for part in spec.split(','):
+		if '-' in part:
+			a, b = part.split('-')
+			out.extend(range(int(a), int(b) + 1))
+		else:
+			out.append(int(part))
+	return out
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description='Write TEST trial schedules ahead of a study.')
+	parser.add_argument('--subjects', required=True, help="subject numbers, e.g. '1-30' or '1,4,7'")
+	parser.add_argument('--runs', type=int, default=4, help='scan runs per subject')
+	parser.add_argument('--trials', type=int, default=20, help='trials_per_context, as in CONMEM6_TEST.py')
+	parser.add_argument('--seed', type=int, default=0, help='study seed; each subject/run gets its own stream from it')
+	parser.add_argument('--out', default='.', help='directory to write TEST_schedule_<sub>_<run>.txt files to')
+	parser.add_argument('--force', action='store_true', help='overwrite existing schedules')
+	args = parser.parse_args(argv)
+	os.makedirs(args.out, exist_ok=True)
+	for subject in _numbers(args.subjects):
+		for runNum in range(1, args.runs + 1):
+			fname = scheduleFileName(args.out, subject, runNum)
+			if os.path.isfile(fname) and not args.force:
+				print('exists, skipped: ' + fname)
+				continue
+			contexts, objects = makeSchedule(args.trials, [args.seed, subject, runNum])
+			saveSchedule(fname, contexts, objects, 'seed %d subject %d run %d' % (args.seed, subject, runNum))
+			print(fname)
+
+
+if __name__ == '__main__':
+	sys.exit(main())
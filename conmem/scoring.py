@@ -0,0 +1,89 @@
+"""
+Replace-error and feedback scoring, shared by the task scripts and offline analysis.
+
+Feedback levels 1-5 come from the error thresholds [3,5,7,9] (meters): level 1 below 3, level 2 from 3 up to 5, ..., level 5 from 9 up.
+An error exactly on a threshold gets the higher level (the scripts used to compare with strict < and >, which left those errors without a level).
+The scalar functions are used live, once per trial; the array functions score any number of responses in one numpy pass,
+e.g. to re-score a whole study under alternative threshold sets with rescore().
+"""
+
+# Generic /Built-in
+import bisect
+import math
+
+#Other libs
+import numpy
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+THRESHOLDS = (3, 5, 7, 9)
+
+#object locations, used by CONMEM6_TRAIN.py / CONMEM6_TEST.py as TestObjectLocs: [context][object] = (x, y, z), context 1 = circle, 2 = square
+OBJECT_LOCS = [[(-4,0.07,9),(2,0.29,5),(-7,0.07,-4),(10,0.05,-5)] , [(4,0.07,9),(-2,0.29,5),(7,0.07,-4),(-10,0.05,-5)]]
+
+
+##########
+## LIVE ##
+##########
+
+def replaceError(corrLoc, actualLoc):
+	"""Ground-plane distance between two (x, y, z) positions."""
+	dx = corrLoc[0] - actualLoc[0]
+	dz = corrLoc[2] - actualLoc[2]
+	return math.sqrt(dx * dx + dz * dz)
+
+
+def feedbackLevel(error, thresholds=THRESHOLDS):
+	return bisect.bisect_right(thresholds, error) + 1
+
+
+def computeError(corrLoc, actualLoc, thresholds=THRESHOLDS):
+	"""Returns (error, feedback level) for one response."""
+	error = replaceError(corrLoc, actualLoc)
+	return error, feedbackLevel(error, thresholds)
+
+
+################
+## VECTORIZED ##
+################
+
+def targetLocations(objects, contexts, objectLocs=OBJECT_LOCS):
+	"""(n, 2) array of target (x, z) for arrays of object indices and contexts (1 or 2)."""
+	locs = numpy.asarray(objectLocs, dtype=float)[:, :, [0, 2]]
+	return locs[numpy.asarray(contexts) - 1, numpy.asarray(objects)]
+
+
+def replaceErrors(responses, targets):
+	"""Errors for (n, 2) arrays of (x, z) or (n, 3) arrays of (x, y, z) responses and targets."""
+	responses = numpy.asarray(responses, dtype=float)
+	targets = numpy.asarray(targets, dtype=float)
+	if responses.shape[-1] == 3:
+		responses = responses[..., [0, 2]]
+	if targets.shape[-1] == 3:
+		targets = targets[..., [0, 2]]
+	d = responses - targets
+	#same arithmetic as replaceError(), so live and offline errors match to the bit
+	return numpy.sqrt(d[..., 0] * d[..., 0] + d[..., 1] * d[..., 1])
+
+
+def feedbackLevels(errors, thresholds=THRESHOLDS):
+	#digitize with right=False puts an error equal to a threshold in the upper bin, like feedbackLevel()
+	return numpy.digitize(errors, thresholds) + 1
+
+
+def scoreResponses(responses, objects, contexts, thresholds=THRESHOLDS, objectLocs=OBJECT_LOCS):
+	"""Returns (errors, feedback levels) for arrays of responses, object indices and contexts."""
+	errors = replaceErrors(responses, targetLocations(objects, contexts, objectLocs))
+	return errors, feedbackLevels(errors, thresholds)
+
+
+def rescore(errors, thresholdSets):
+	"""Feedback levels of errors under each threshold set; returns an (n sets, n errors) array."""
+	errors = numpy.asarray(errors, dtype=float)
+	levels = numpy.empty((len(thresholdSets),) + errors.shape, dtype=numpy.int8)
+	for i, thresholds in enumerate(thresholdSets):
+		levels[i] = numpy.searchsorted(numpy.asarray(thresholds, dtype=float), errors, side='right') + 1
+	return levels
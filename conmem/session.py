@@ -0,0 +1,190 @@
+"""
+Session host: runs the FREE, TRAIN and TEST scripts one after another in one Vizard process.
+
+On their own, each script opens the window, asks for the subject (and TEST for the run), loads every model, and ends with viz.quit(), so a
+session is one launch per phase and per scan run. CONMEM6_SESSION.py instead opens the window and starts loading every model once, then
+runs each phase as a task with Session.run(): the phase script is executed again in a fresh namespace, so all of its per-run state (data
+file, schedule, clocks, counters) starts over, while the window and the loaded models stay. Its placements are clones of models that are
+already loaded, so setting up the next phase or scan run takes milliseconds.
+
+The scripts make the calls that differ through this module:
+	askSubject(), askRun()  - the prompts, answered by the session when hosted
+	modelCache()            - the session's shared ModelCache when hosted, a new one that starts loading the given files otherwise
+	schedule(), onupdate()  - viztask.schedule / vizact.onupdate; when hosted, the phase's tasks and updates are removed when it ends
+	onexit()                - viz.callback(viz.EXIT_EVENT); when hosted, the functions run when the phase ends
+	own()                   - navigators, proximity managers and lights the script adds; when hosted, removed when the phase ends
+	collision()             - viz.collision(); when hosted, turned off again when the phase ends
+	quit()                  - viz.quit(); when hosted, ends the phase. Neither stops the caller, so callers return right after it
+	                          (at script top level: raise SystemExit, which Session.run() takes as the script ending)
+When a phase ends, the nodes it added to scenes 1-4 are removed too, so the next phase starts from the window and the loaded models only.
+"""
+
+# Generic /Built-in
+import os
+import time
+
+#Other libs
+import viz
+import viztask
+import vizact
+import vizinput
+
+from conmem.modelcache import ModelCache
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+#the Session running the scripts, set by CONMEM6_SESSION.py; None when a script was launched on its own
+host = None
+
+SCENES = (1, 2, 3, 4)
+
+
+class Phase(object):
+	"""Tasks, updates and exit functions of one running script."""
+
+	def __init__(self, script, runNum=None):
+		self.script = script
+		self.runNum = runNum
+		self.tasks = []
+		self.updates = []
+		self.exits = []
+		self.owned = []
+		self.collision = False
+		self.ended = False
+		self.closed = False
+
+	def close(self):
+		if self.closed:
+			return
+		self.closed = True
+		for function in self.exits:
+			function()
+		for update in self.updates:
+			update.remove()
+		for task in self.tasks:
+			task.kill()
+		for resource in self.owned:
+			resource.remove()
+		if self.collision:
+			viz.collision(viz.OFF)
+
+
+class Session(object):
+
+	def __init__(self, subject, models, root=None):
+		self.subject = subject
+		self.models = models
+		self.root = root
+		self.phase = None
+		self.switches = [] #seconds from one phase ending to the next one running
+
+	def run(self, script, runNum=None):
+		"""Task that runs script (relative to root) until it calls quit(), then removes what it added."""
+		t = time.perf_counter()
+		self.phase = Phase(script, runNum)
+		before = set(self._sceneNodes())
+		path = script if self.root is None else os.path.join(self.root, script)
+		with open(path) as source:
+			code = compile(source.read(), path, 'exec')
+		try:
+			exec(code, {'__name__': '__main__', '__file__': path})
+		except SystemExit:
+			#the script stopped itself during setup, after quit()
+			self.phase.ended = True
+		self.switches.append(time.perf_counter() - t)
+		while not self.phase.ended:
+			yield viztask.waitFrame(1)
+
+		t = time.perf_counter()
+		self.phase.close()
+		keep = set(self.models.models.values())
+		for node in self._sceneNodes():
+			if node not in before and node not in keep:
+				node.remove()
+		self.switches[-1] += time.perf_counter() - t
+		print('Info: ' + script + ('' if runNum is None else ' run ' + str(runNum)) + ' done')
+
+	def close(self):
+		"""Closes the running phase (its exit functions write out its data); for viz.EXIT_EVENT, when Vizard closes mid-phase."""
+		if self.phase is not None:
+			self.phase.close()
+
+	def _sceneNodes(self):
+		nodes = []
+		for n in SCENES:
+			nodes.extend(getattr(viz, 'Scene' + str(n)).getChildren())
+		return nodes
+
+	def report(self):
+		if not self.switches:
+			return 'session: no phases run'
+		return 'session: %d phases, setup and teardown %.1f ms mean, %.1f ms max per phase' % (len(self.switches),
+			1e3 * sum(self.switches) / len(self.switches), 1e3 * max(self.switches))
+
+
+#############
+## SCRIPTS ##
+#############
+
+def askSubject(prompt='What is the sub number?'):
+	if host is not None:
+		return host.subject
+	return int(vizinput.input(prompt))
+
+
+def askRun(prompt='What is the run rumber?'):
+	if host is not None and host.phase.runNum is not None:
+		return host.phase.runNum
+	return int(vizinput.input(prompt))
+
+
+def modelCache(filenames):
+	"""The session's models, or a new async ModelCache; either way filenames start loading now if they are not loaded yet."""
+	models = ModelCache(asyncLoad=True) if host is None else host.models
+	models.preload(filenames)
+	return models
+
+
+def schedule(task):
+	handle = viztask.schedule(task)
+	if host is not None:
+		host.phase.tasks.append(handle)
+	return handle
+
+
+def onupdate(priority, function, *args):
+	handle = vizact.onupdate(priority, function, *args)
+	if host is not None:
+		host.phase.updates.append(handle)
+	return handle
+
+
+def onexit(function):
+	if host is not None:
+		host.phase.exits.append(function)
+	else:
+		viz.callback(viz.EXIT_EVENT, function)
+
+
+def own(resource):
+	"""Returns resource (anything with a remove() method), which is removed when the phase ends."""
+	if host is not None:
+		host.phase.owned.append(resource)
+	return resource
+
+
+def collision(state):
+	viz.collision(state)
+	if host is not None:
+		host.phase.collision = bool(state)
+
+
+def quit():
+	"""Ends the phase (or Vizard). The caller keeps running until it returns, so nothing that writes data may follow the call."""
+	if host is not None:
+		host.phase.ended = True
+	else:
+		viz.quit()
@@ -0,0 +1,61 @@
+"""
+Time-driven view rotation for the TEST replace phase.
+
+The sweep used to advance 0.5 deg per "yield viztask.waitTime(1 / 720)", i.e. one step per frame, so its length depended on the frame rate
+(12 s at 60 Hz, 6 s at 120 Hz) and every step cost a generator resume plus setPosition/setEuler calls.
+RotationSweep.update() is registered once as a per-frame update; while a sweep is running it sets the view yaw from the elapsed clock time,
+so a sweep always takes duration seconds (ending on the first frame at or after it), whatever the display does.
+It also puts the view back at the sweep's start position each frame, so navigation input cannot move the participant during the turn.
+The yaw is computed from the frame's timestamp (frameTime, e.g. FrameProfiler.frameTime, read once at the start of the frame), not from
+the clock at the moment update() runs, so it does not jitter with how much update work runs before it. Without frameTime, the clock is read.
+startTime and endTime are frame timestamps too (clock.Clock ns), so the logged sweep lasts exactly as long as the rotation shown.
+"""
+
+#Other libs
+import viztask
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+class RotationSweep(object):
+
+	def __init__(self, view, clock, duration, degrees=360.0, frameTime=None):
+		self.view = view
+		self.clock = clock
+		self.frameTime = frameTime or clock.now
+		self.duration = duration
+		self.degrees = degrees
+		self.active = False
+		self.startTime = None
+		self.endTime = None
+		self.signal = viztask.Signal()
+
+	def start(self, startAng):
+		"""Starts a sweep from yaw startAng; the view position stays where it is."""
+		self.startAng = startAng
+		self.position = self.view.getPosition()
+		self.span = int(self.duration * 1e9)
+		self.startTime = self.frameTime()
+		self.endTime = None
+		self.active = True
+		self.view.setEuler(startAng, 0, 0)
+
+	def update(self):
+		if not self.active:
+			return
+		now = self.frameTime()
+		elapsed = now - self.startTime
+		self.view.setPosition(self.position)
+		if elapsed >= self.span:
+			self.view.setEuler(self.startAng + self.degrees, 0, 0)
+			self.active = False
+			self.endTime = now
+			self.signal.send()
+		else:
+			self.view.setEuler(self.startAng + self.degrees * elapsed / self.span, 0, 0)
+
+	def wait(self):
+		"""Condition for a task to yield on until the current sweep has finished."""
+		return self.signal.wait()
@@ -0,0 +1,314 @@
+#!/usr/bin/env python
+
+"""
+Fast loader for the tracking files written by the TRAIN and TEST scripts.
+
+loadTracking() memory-maps one TRAIN_tracking_* / TEST_tracking_* file (text .txt or binary .trk) and returns a Tracking object holding:
+	pose   - structured array, one row per pose sample [t, x, z, yaw, trial]
+	events - structured array, one row per event row, with the pose-sample offset at which it was logged
+	trials - structured array, one row per trial with its start/response/stop sample offsets, context, object, error(s) and squircle choice,
+	         and for TEST replaces the logged start and end times of the rotation sweep (NaN in files from before it was logged),
+	         and for TRAIN collects the logged time the view reached the object and the latency from the object appearing (NaN if not logged)
+Pose rows are parsed in one numpy call per file; only the (few) event rows are handled in Python.
+
+Trials: a trial starts at each 'Start replace' row, and at each 'Start collect' row that does not directly follow a replace
+(the TRAIN initial collects). In TRAIN, the feedback collect after a replace belongs to the same trial.
+
+loadMany() loads a list of files in a process pool. Run as a script for a quick summary of one or more files:
+	python -m conmem.trackload ../Data/TestingData/TEST_tracking_*.txt
+"""
+
+# Generic /Built-in
+import mmap
+import multiprocessing
+import os
+import re
+import sys
+
+#Other libs
+import numpy
+
+from conmem import tracklog
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+################
+## VOCABULARY ##
+################
+
+#object and context names as written by the scripts; indices match TestObjects and the context numbers
+OBJECTS = ['cone', 'beachball', 'plant', 'pumpkin']
+CONTEXTS = ['circle', 'square', 'squircle']
+
+#event kinds
+START_COLLECT = 1
+START_REPLACE = 2
+REPLACED = 3
+COLLECTED = 4
+COLLECTED_INITIAL = 5
+ROTATION = 6
+ENTERED = 7
+OTHER = 9
+
+POSE = numpy.dtype([('t','<f8'),('x','<f8'),('z','<f8'),('yaw','<f8'),('trial','<i4')])
+EVENT = numpy.dtype([('sample','<i8'),('trial','<i4'),('kind','i1'),('context','i1'),('object','i1'),('choice','i1'),('error','<f8'),('error2','<f8'),
+	('rotStart','<f8'),('rotEnd','<f8'),('entered','<f8'),('latency','<f8')])
+TRIAL = numpy.dtype([('trial','<i4'),('start','<i8'),('response','<i8'),('stop','<i8'),('replace','?'),('context','i1'),('object','i1'),('choice','i1'),('error','<f8'),('error2','<f8'),
+	('rotStart','<f8'),('rotEnd','<f8'),('entered','<f8'),('latency','<f8')])
+
+#TRAIN_tracking_<sub>_<ctx>_<run> and TEST_tracking_<sub>_<run>
+NAME = re.compile(r'^(TRAIN|TEST)_tracking_([^_]+)_(?:(\d+)_)?(\d+)\.(txt|trk)$')
+
+def parseTrackName(fname):
+	"""Returns (study, subject, context, run) from a tracking file name, or None if it is not one. context is 0 for TEST files."""
+	match = NAME.match(os.path.basename(fname))
+	if match is None:
+		return None
+	study, subject, context, run, ext = match.groups()
+	if (study == 'TRAIN') != (context is not None):
+		return None
+	return study, subject, int(context or 0), int(run)
+
+
+def parseEvent(text):
+	"""Returns (kind, context, object, choice, error, error2, rotStart, rotEnd, entered, latency) for one event row of either script.
+
+	rotStart and rotEnd are the logged start and end times of the TEST replace sweep ('Rotation, <start>, <end>' rows), and entered and
+	latency the TRAIN collect entry time and latency ('Entered <obj>, <time>, <frame>, <latency>' rows); NaN otherwise.
+	"""
+	context = 0
+	obj = -1
+	choice = 0
+	error = numpy.nan
+	error2 = numpy.nan
+	rotStart = numpy.nan
+	rotEnd = numpy.nan
+	entered = numpy.nan
+	latency = numpy.nan
+	parts = [p.strip() for p in text.strip().split(',')]
+	head = parts[0]
+	if head == 'Start collect':
+		kind = START_COLLECT
+	elif head == 'Start replace':
+		kind = START_REPLACE
+		if len(parts) > 1 and parts[1] in CONTEXTS:
+			context = CONTEXTS.index(parts[1]) + 1
+	elif head.startswith('Replaced '):
+		kind = REPLACED
+		name = head[len('Replaced '):]
+		if name in CONTEXTS:
+			#TEST: Replaced <context>, <obj>, <error> or Replaced squircle, <obj>, <1|2>, <error1>, <error2>
+			context = CONTEXTS.index(name) + 1
+			obj = _objectIndex(parts[1])
+			if context == 3:
+				choice = int(parts[2])
+				error = float(parts[3])
+				error2 = float(parts[4])
+			else:
+				error = float(parts[2])
+		else:
+			#TRAIN: Replaced <obj>, <error>
+			obj = _objectIndex(name)
+			error = float(parts[1])
+	elif head.endswith(' Collected Initial'):
+		kind = COLLECTED_INITIAL
+		obj = _objectIndex(head[:-len(' Collected Initial')])
+	elif head.startswith('Collected '):
+		kind = COLLECTED
+		obj = _objectIndex(head[len('Collected '):])
+	elif head == 'Rotation' and len(parts) == 3:
+		kind = ROTATION
+		rotStart = float(parts[1])
+		rotEnd = float(parts[2])
+	elif head.startswith('Entered ') and len(parts) == 4:
+		kind = ENTERED
+		obj = _objectIndex(head[len('Entered '):])
+		entered = float(parts[1])
+		latency = float(parts[3])
+	else:
+		kind = OTHER
+	return kind, context, obj, choice, error, error2, rotStart, rotEnd, entered, latency
+
+
+def _objectIndex(name):
+	if name in OBJECTS:
+		return OBJECTS.index(name)
+	return -1
+
+
+#############
+## LOADING ##
+#############
+
+class Tracking(object):
+	"""Pose samples, events and trials of one tracking file."""
+
+	def __init__(self, fname, pose, events, trials):
+		self.fname = fname
+		self.name = parseTrackName(fname)
+		self.pose = pose
+		self.events = events
+		self.trials = trials
+
+	def __repr__(self):
+		return '<Tracking %s: %d samples, %d events, %d trials>' % (os.path.basename(self.fname), len(self.pose), len(self.events), len(self.trials))
+
+
+def _readText(fname):
+	"""Returns (pose values as an (n,4) array, [(sample offset, event text)]) from a text tracking file."""
+	with open(fname, 'rb') as f:
+		if os.fstat(f.fileno()).st_size == 0:
+			return numpy.zeros((0,4)), []
+		mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+		try:
+			buf = numpy.frombuffer(mm, dtype=numpy.uint8)
+			#line ends (adding one past the end for a missing final newline) and the number of tabs on each line
+			ends = numpy.flatnonzero(buf == 10)
+			if len(ends) == 0 or ends[-1] != len(buf) - 1:
+				ends = numpy.append(ends, len(buf))
+			starts = numpy.concatenate(([0], ends[:-1] + 1))
+			tabs = numpy.flatnonzero(buf == 9)
+			tabsPerLine = numpy.searchsorted(tabs, ends) - numpy.searchsorted(tabs, starts)
+			#pose rows have tabs, event rows are the other non-empty lines
+			isPose = tabsPerLine > 0
+			isEvent = ~isPose & (ends - starts > 0)
+			eventLines = numpy.flatnonzero(isEvent)
+			#offset of each event = number of pose rows before it
+			offsets = numpy.cumsum(isPose)[eventLines] if len(eventLines) else eventLines
+			nPose = int(isPose.sum())
+			del buf
+
+			events = []
+			pieces = []
+			pos = 0
+			for line, offset in zip(eventLines.tolist(), offsets.tolist()):
+				pieces.append(mm[pos:starts[line]])
+				pos = ends[line] + 1
+				text = mm[starts[line]:ends[line]].decode('utf-8').strip()
+				if text:
+					events.append((offset, text))
+			pieces.append(mm[pos:])
+		finally:
+			mm.close()
+
+	values = numpy.fromstring(b' '.join(pieces), sep=' ')
+	if len(values) != 4 * nPose:
+		raise ValueError(fname + ': could not parse all pose rows as four columns')
+	return values.reshape(-1, 4), events
+
+
+def _readBinary(fname):
+	records, texts = tracklog.readBinary(fname)
+	isPose = records['event'] == 0
+	values = numpy.empty((int(isPose.sum()), 4))
+	for i, field in enumerate(['t','x','z','yaw']):
+		values[:,i] = records[field][isPose]
+	#offset of each event = number of pose rows before it
+	offsets = numpy.cumsum(isPose)[~isPose].tolist()
+	return values, list(zip(offsets, texts))
+
+
+def loadTracking(fname):
+	"""Loads one text (.txt) or binary (.trk) tracking file into a Tracking object."""
+	if fname.endswith(tracklog.EXTENSIONS['binary']):
+		values, rawEvents = _readBinary(fname)
+	else:
+		values, rawEvents = _readText(fname)
+
+	events = numpy.zeros(len(rawEvents), dtype=EVENT)
+	trial = 0
+	lastKind = 0
+	for i, (offset, text) in enumerate(rawEvents):
+		kind, context, obj, choice, error, error2, rotStart, rotEnd, entered, latency = parseEvent(text)
+		if kind == START_REPLACE or (kind == START_COLLECT and lastKind != REPLACED):
+			trial += 1
+		events[i] = (offset, trial, kind, context, obj, choice, error, error2, rotStart, rotEnd, entered, latency)
+		lastKind = kind
+
+	pose = numpy.zeros(len(values), dtype=POSE)
+	pose['t'] = values[:,0]
+	pose['x'] = values[:,1]
+	pose['z'] = values[:,2]
+	pose['yaw'] = values[:,3]
+	if len(events):
+		#each sample belongs to the trial of the last event logged before it
+		starts = numpy.searchsorted(events['sample'], numpy.arange(len(pose)), side='right') - 1
+		pose['trial'] = numpy.where(starts >= 0, events['trial'][numpy.maximum(starts, 0)], 0)
+
+	name = parseTrackName(fname)
+	return Tracking(fname, pose, events, _trialTable(events, len(pose), name[2] if name else 0))
+
+
+def _trialTable(events, nSamples, context=0):
+	nTrials = int(events['trial'].max()) if len(events) else 0
+	trials = numpy.zeros(nTrials, dtype=TRIAL)
+	trials['trial'] = numpy.arange(1, nTrials + 1)
+	trials['response'] = -1
+	trials['context'] = context
+	trials['object'] = -1
+	trials['error'] = numpy.nan
+	trials['error2'] = numpy.nan
+	trials['rotStart'] = numpy.nan
+	trials['rotEnd'] = numpy.nan
+	trials['entered'] = numpy.nan
+	trials['latency'] = numpy.nan
+	if nTrials == 0:
+		return trials
+
+	#trial numbers never decrease, so the first event of each trial is found by a sorted search
+	inTrial = events[events['trial'] > 0]
+	first = numpy.searchsorted(inTrial['trial'], trials['trial'])
+	trials['start'] = inTrial['sample'][first]
+	trials['replace'] = inTrial['kind'][first] == START_REPLACE
+	#a trial runs until the next one starts, or to the end of the file for the last one
+	trials['stop'][:-1] = trials['start'][1:]
+	trials['stop'][-1] = nSamples
+
+	started = inTrial[first]
+	hasContext = started['context'] > 0
+	trials['context'][hasContext] = started['context'][hasContext]
+
+	collected = inTrial[(inTrial['kind'] == COLLECTED) | (inTrial['kind'] == COLLECTED_INITIAL)]
+	trials['object'][collected['trial'] - 1] = collected['object']
+
+	replaced = inTrial[inTrial['kind'] == REPLACED]
+	rows = replaced['trial'] - 1
+	trials['response'][rows] = replaced['sample']
+	trials['object'][rows] = replaced['object']
+	trials['choice'][rows] = replaced['choice']
+	trials['error'][rows] = replaced['error']
+	trials['error2'][rows] = replaced['error2']
+
+	rotated = inTrial[inTrial['kind'] == ROTATION]
+	trials['rotStart'][rotated['trial'] - 1] = rotated['rotStart']
+	trials['rotEnd'][rotated['trial'] - 1] = rotated['rotEnd']
+
+	entries = inTrial[inTrial['kind'] == ENTERED]
+	trials['entered'][entries['trial'] - 1] = entries['entered']
+	trials['latency'][entries['trial'] - 1] = entries['latency']
+	return trials
+
+
+def _load(fname):
+	return loadTracking(fname)
+
+
+def loadMany(fnames, processes=None):
+	"""Loads many tracking files in parallel and returns their Tracking objects in the same order."""
+	fnames = list(fnames)
+	if len(fnames) < 2 or processes == 1:
+		return [loadTracking(f) for f in fnames]
+	pool = multiprocessing.Pool(processes)
+	try:
+		return pool.map(_load, fnames, chunksize=max(1, len(fnames) // (4 * (processes or os.cpu_count() or 1))))
+	finally:
+		pool.close()
+		pool.join()
+
+
+if __name__ == '__main__':
+	for t in loadMany(sys.argv[1:]):
+		print(t)
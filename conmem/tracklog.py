@@ -0,0 +1,327 @@
+#!/usr/bin/env python
+
+"""
+Tracking-log writers for the Squircle task scripts.
+
+The scripts hand every pose sample (time, x-pos, z-pos, orientation) and every trial event row to a writer instead of writing strings to the data file themselves.
+TextTrackWriter writes the original tab-separated TRAIN_tracking_* / TEST_tracking_* layout.
+BinaryTrackWriter stores fixed-width records in a preallocated buffer and only touches the file once per block.
+ThreadedTrackWriter wraps either one and does the writing on a background thread fed by a bounded queue, so disk latency never stalls the viztask scheduler.
+It fsyncs the file after each 'Start replace' and 'Collected' row, so a crash or forced quit loses at most the current trial.
+
+Binary file layout: an 8 byte file header (MAGIC), followed by blocks. Each block is a BLOCK header (tag, number of records, number of text bytes),
+the records themselves (RECORD dtype), and the UTF-8 text of the event rows in that block, each terminated by a newline.
+Pose records have event == 0; event records carry the 1-based index of their row in the block text.
+Time and pose are stored as doubles, the Python floats the scripts log, so converting back to text writes exactly what TextTrackWriter would have.
+Trial numbers are not stored: trackload derives them from the event rows, for text and binary files alike.
+
+Run as a script to convert a binary log back to text:
+	python -m conmem.tracklog TEST_tracking_1_1.trk [TEST_tracking_1_1.txt]
+"""
+
+# Generic /Built-in
+import abc
+import atexit
+import os
+import struct
+import sys
+import queue
+import threading
+
+#Other libs
+import numpy
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+#################
+## FILE LAYOUT ##
+#################
+
+MAGIC = b'CMTRK1\x00\x00'
+BLOCK = struct.Struct('<4sII')
+BLOCK_TAG = b'BLK0'
+
+#one row per pose sample or event
+RECORD = numpy.dtype([('t','<f8'),('x','<f8'),('z','<f8'),('yaw','<f8'),('event','<u2')])
+
+#file extension for each log format
+EXTENSIONS = {'text':'.txt', 'binary':'.trk'}
+
+def trackFileName(base, logFormat):
+	return base + EXTENSIONS[logFormat]
+
+
+#############
+## WRITERS ##
+#############
+
+class TrackWriter(abc.ABC):
+	"""Interface shared by all tracking-log writers."""
+
+	@abc.abstractmethod
+	def sample(self, t, x, z, yaw):
+		pass
+
+	def samples(self, t, x, z, yaw):
+		for row in zip(t.tolist(), x.tolist(), z.tolist(), yaw.tolist()):
+			self.sample(*row)
+
+	@abc.abstractmethod
+	def event(self, text, t=0.0):
+		pass
+
+	def flush(self):
+		pass
+
+	def sync(self):
+		#flush, then ask the OS to put the file on disk
+		self.flush()
+		os.fsync(self.file.fileno())
+
+	def close(self):
+		pass
+
+
+class TextTrackWriter(TrackWriter):
+	"""Writes the original tab-separated layout, one line per call."""
+
+	def __init__(self, fname):
+		self.fname = fname
+		self.file = open(fname, 'a')
+
+	def sample(self, t, x, z, yaw):
+		self.file.write(str(t) + '\t' + str(x) + '\t' + str(z) + '\t' + str(yaw) + '\n')
+
+	def event(self, text, t=0.0):
+		self.file.write(text + '\n')
+
+	def flush(self):
+		self.file.flush()
+
+	def close(self):
+		if not self.file.closed:
+			self.file.close()
+
+
+class BinaryTrackWriter(TrackWriter):
+	"""Buffers fixed-width records and writes them out one block at a time."""
+
+	def __init__(self, fname, blockSize=4096):
+		self.fname = fname
+		self.records = numpy.zeros(blockSize, dtype=RECORD)
+		self.count = 0
+		self.events = []
+		isNew = not os.path.isfile(fname) or os.path.getsize(fname) == 0
+		if not isNew:
+			with open(fname, 'rb') as f:
+				if f.read(len(MAGIC)) != MAGIC:
+					raise ValueError(fname + ' is not a binary tracking log; cannot append to it')
+		self.file = open(fname, 'ab')
+		if isNew:
+			self.file.write(MAGIC)
+
+	def sample(self, t, x, z, yaw):
+		self.records[self.count] = (t, x, z, yaw, 0)
+		self.count += 1
+		if self.count == len(self.records):
+			self.flush()
+
+	def samples(self, t, x, z, yaw):
+		done = 0
+		while done < len(t):
+			n = min(len(t) - done, len(self.records) - self.count)
+			block = self.records[self.count:self.count + n]
+			block['t'] = t[done:done + n]
+			block['x'] = x[done:done + n]
+			block['z'] = z[done:done + n]
+			block['yaw'] = yaw[done:done + n]
+			block['event'] = 0
+			self.count += n
+			done += n
+			if self.count == len(self.records):
+				self.flush()
+
+	def event(self, text, t=0.0):
+		self.events.append(text)
+		self.records[self.count] = (t, 0, 0, 0, len(self.events))
+		self.count += 1
+		if self.count == len(self.records) or len(self.events) == 0xFFFF:
+			self.flush()
+
+	def flush(self):
+		if self.count == 0:
+			return
+		text = ''.join([e + '\n' for e in self.events]).encode('utf-8')
+		self.file.write(BLOCK.pack(BLOCK_TAG, self.count, len(text)))
+		self.file.write(self.records[:self.count].tobytes())
+		self.file.write(text)
+		self.file.flush()
+		self.count = 0
+		self.events = []
+
+	def close(self):
+		if not self.file.closed:
+			self.flush()
+			self.file.close()
+
+
+class ThreadedTrackWriter(TrackWriter):
+	"""Queues records for another writer, which runs on a background thread.
+
+	At most maxQueue calls are held in memory; anything beyond that is dropped and its records counted in dropped.
+	"""
+
+	def __init__(self, writer, maxQueue=4096, syncOn=('Start replace', 'Collected')):
+		self.writer = writer
+		self.fname = writer.fname
+		self.syncOn = syncOn
+		self.queue = queue.Queue(maxQueue)
+		self.dropped = 0
+		self.error = None
+		self.closed = False
+		self.thread = threading.Thread(target=self._run, name='TrackWriter')
+		self.thread.daemon = True
+		self.thread.start()
+		#also close if the script dies without a Vizard exit event
+		atexit.register(self.close)
+
+	def _put(self, item, records):
+		try:
+			self.queue.put_nowait(item)
+		except queue.Full:
+			self.dropped += records
+
+	def sample(self, t, x, z, yaw):
+		self._put(('sample', (t, x, z, yaw)), 1)
+
+	def samples(self, t, x, z, yaw):
+		#copy, the caller's arrays may be views into a buffer that is reused
+		self._put(('samples', (t.copy(), x.copy(), z.copy(), yaw.copy())), len(t))
+
+	def event(self, text, t=0.0):
+		self._put(('event', (text, t)), 1)
+
+	def flush(self):
+		self._put(('flush', ()), 0)
+
+	def sync(self):
+		self._put(('sync', ()), 0)
+
+	def _run(self):
+		writer = self.writer
+		while True:
+			kind, args = self.queue.get()
+			try:
+				if kind == 'stop':
+					writer.sync()
+					writer.close()
+					return
+				elif kind == 'sample':
+					writer.sample(*args)
+				elif kind == 'samples':
+					writer.samples(*args)
+				elif kind == 'event':
+					writer.event(*args)
+					for prefix in self.syncOn:
+						if prefix in args[0]:
+							writer.sync()
+							break
+				elif kind == 'flush':
+					writer.flush()
+				elif kind == 'sync':
+					writer.sync()
+			except Exception as e:
+				#keep draining so the task never blocks on a broken writer; report on close
+				self.error = e
+
+	def close(self):
+		if self.closed:
+			return
+		self.closed = True
+		#the stop marker must get through even when the queue is full
+		self.queue.put(('stop', ()))
+		self.thread.join()
+		if self.dropped:
+			print('Info: ' + str(self.dropped) + ' tracking records dropped (writer queue full)')
+		if self.error is not None:
+			print('Info: tracking writer error: ' + str(self.error))
+
+
+def openTrackWriter(fname, logFormat='binary', background=False):
+	if logFormat == 'text':
+		writer = TextTrackWriter(fname)
+	elif logFormat == 'binary':
+		writer = BinaryTrackWriter(fname)
+	else:
+		raise ValueError('unknown log format: ' + str(logFormat))
+	if background:
+		return ThreadedTrackWriter(writer)
+	return writer
+
+
+#############
+## READERS ##
+#############
+
+def readBlocks(fname):
+	"""Yields (records, event rows) for each block of a binary log."""
+	with open(fname, 'rb') as f:
+		if f.read(len(MAGIC)) != MAGIC:
+			raise ValueError(fname + ' is not a binary tracking log')
+		while True:
+			head = f.read(BLOCK.size)
+			if len(head) < BLOCK.size:
+				#a short header means the session ended mid-write; keep what was complete
+				return
+			tag, nRecords, nText = BLOCK.unpack(head)
+			if tag != BLOCK_TAG:
+				raise ValueError(fname + ': corrupt block header')
+			body = f.read(nRecords * RECORD.itemsize)
+			text = f.read(nText)
+			if len(body) < nRecords * RECORD.itemsize or len(text) < nText:
+				return
+			records = numpy.frombuffer(body, dtype=RECORD)
+			events = text.decode('utf-8').split('\n')[:-1]
+			yield records, events
+
+
+def readBinary(fname):
+	"""Returns all records of a binary log as one array, plus the event rows in file order."""
+	allRecords = []
+	allEvents = []
+	for records, events in readBlocks(fname):
+		allRecords.append(records)
+		allEvents.extend(events)
+	if allRecords:
+		return numpy.concatenate(allRecords), allEvents
+	return numpy.zeros(0, dtype=RECORD), allEvents
+
+
+def iterTextRows(fname):
+	"""Yields the rows of a binary log exactly as the text writer would have written them."""
+	for records, events in readBlocks(fname):
+		for t, x, z, yaw, event in zip(*[records[field].tolist() for field in ['t','x','z','yaw','event']]):
+			if event:
+				yield events[event - 1] + '\n'
+			else:
+				yield str(t) + '\t' + str(x) + '\t' + str(z) + '\t' + str(yaw) + '\n'
+
+
+def toText(src, dst=None):
+	"""Converts a binary log to the tab-separated TRAIN_tracking_* / TEST_tracking_* layout."""
+	if dst is None:
+		dst = os.path.splitext(src)[0] + EXTENSIONS['text']
+	with open(dst, 'w') as out:
+		for row in iterTextRows(src):
+			out.write(row)
+	return dst
+
+
+if __name__ == '__main__':
+	if len(sys.argv) < 2:
+		print('usage: python -m conmem.tracklog <binary log> [text output]')
+		sys.exit(1)
+	print(toText(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None))
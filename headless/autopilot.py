@@ -0,0 +1,85 @@
+"""
+Scripted participant and experimenter for headless runs.
+
+Autopilot listens for the conditions tasks yield (viz.engine.waitListeners) and answers them the way a person at the scanner would:
+	- experimenter keys ('t' start prompts, 's' scanner trigger) are pressed after promptDelay seconds,
+	- response keys ('p' TRAIN replace, 'a' TEST replace, 'b' FREE exploration) are pressed after walking to a random point in the arena,
+	- vizproximity.waitEnter() is answered by walking to the sensor's node, and a wait on a signal with a center (conmem.proximity's
+	  EnterSignal) by walking to that point.
+Walking moves viz.MainView at speed m/s along a straight line, facing the direction of travel, from an update that runs before the
+proximity managers and engines, so entries are detected on the frame the view crosses into a sensor.
+"""
+
+# Generic /Built-in
+import math
+import random
+
+#Other libs
+import viz
+import vizact
+import viztask
+import vizproximity
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+EXPERIMENTER_KEYS = ('t', 's')
+RESPONSE_KEYS = ('p', 'a', 'b')
+
+
+class Autopilot(object):
+
+	def __init__(self, speed=3.0, promptDelay=1.0, radius=8.0, seed=0):
+		self.speed = speed
+		self.promptDelay = promptDelay
+		self.radius = radius
+		self.rng = random.Random(seed)
+		self.goal = None
+		self.condition = None
+		self.key = None
+		viz.engine.waitListeners.append(self.onWait)
+		self.updater = vizact.onupdate(viz.PRIORITY_FIRST_UPDATE, self.update)
+
+	def onWait(self, condition):
+		if isinstance(condition, viztask.waitKeyDown) and condition.keys:
+			keys = [k.lower() for k in condition.keys]
+			if any(k in EXPERIMENTER_KEYS for k in keys):
+				viz.engine.pressKey(condition.keys[0], self.promptDelay)
+			elif any(k in RESPONSE_KEYS for k in keys):
+				self.walkTo(self.randomPoint(), condition, condition.keys[0])
+		elif isinstance(condition, vizproximity.waitEnter):
+			self.walkTo(condition.sensor.source.getPosition(), condition)
+		elif isinstance(condition, viztask.waitSignal) and getattr(condition.signal, 'center', None) is not None:
+			self.walkTo(condition.signal.center, condition)
+
+	def randomPoint(self):
+		rho = self.radius * math.sqrt(self.rng.random())
+		phi = self.rng.uniform(0, 2 * math.pi)
+		return [rho * math.cos(phi), 0.0, rho * math.sin(phi)]
+
+	def walkTo(self, goal, condition, key=None):
+		self.goal = [goal[0], goal[2]]
+		self.condition = condition
+		self.key = key
+
+	def update(self):
+		if self.goal is None:
+			return
+		if self.condition.ready():
+			self.goal = None
+			return
+		pos = viz.MainView.getPosition()
+		dx = self.goal[0] - pos[0]
+		dz = self.goal[1] - pos[2]
+		dist = math.sqrt(dx * dx + dz * dz)
+		step = self.speed / viz.engine.frameRate
+		if dist <= step:
+			viz.MainView.setPosition(self.goal[0], pos[1], self.goal[1])
+			if self.key is not None:
+				viz.engine.pressKey(self.key)
+			self.goal = None
+			return
+		viz.MainView.setPosition(pos[0] + dx * step / dist, pos[1], pos[2] + dz * step / dist)
+		viz.MainView.setEuler(math.degrees(math.atan2(dx, dz)), 0, 0)
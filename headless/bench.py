@@ -0,0 +1,262 @@
+#!/usr/bin/env python
+
+"""
+Benchmarks for the task scripts, run on the headless stand-ins (see run.py).
+
+Each scenario plays a whole script with a fixed seed and reports:
+	setup_ms       - wall time of the script's top level (scene, object and overlay setup) before the first frame
+	wall_ms        - wall time of the whole run (best of --repeat runs, after a warm-up run)
+	per-function   - calls and wall time spent inside ContextGen(), Instruction(), Collect(), Replace(), getData() and StartRun().
+	                 Generator functions are timed per resume, so waits are not counted; time in sub-tasks they yield is not counted either.
+	alloc_peak_kb  - tracemalloc peak over the run, and alloc_net_kb what was still allocated at the end (measured in a second run,
+	                 because tracemalloc slows Python down)
+	scene_nodes    - nodes in scenes 1-4 at the end, scene_nodes_max the largest count sampled at a trial start
+	loads          - models and textures loaded, clones the model clones made instead of loads
+	log_bytes, trials, log_bytes_per_trial - tracking files written and the trials found in them with conmem.trackload
+	trial_ms       - wall_ms / trials
+
+Scenarios: train (full TRAIN session), test (one TEST run, runLength = 8.075*60 s as set in the script), free (FREE exploration).
+
+	python headless/bench.py                          run all scenarios and print the results
+	python headless/bench.py --save                   also write them to the baseline file
+	python headless/bench.py --compare                compare against the baseline; exit status 1 on a regression
+	python headless/bench.py train --repeat 5 --tolerance 0.1
+
+A metric regresses when it is more than tolerance (relative) above its baseline. Timing metrics also need to be at least
+--min-ms above it, so timer noise on sub-millisecond functions does not count. Baselines are machine-specific: save them on the
+machine that runs the comparison.
+"""
+
+# Generic /Built-in
+import argparse
+import functools
+import gc
+import glob
+import inspect
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import run #puts the stand-ins and the repo on sys.path
+
+#Other libs
+from conmem import schedule
+from conmem import trackload
+from conmem.overlay import sceneNodeCount
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+SCENARIOS = {
+	'train': ('CONMEM6_TRAIN.py', ['1']),
+	'test': ('CONMEM6_TEST.py', ['1', '1']),
+	'free': ('CONMEM6_FREE.py', ['1']),
+	}
+
+TIMED = ('ContextGen', 'StartRun', 'Instruction', 'Collect', 'Replace', 'getData')
+
+BASELINE = os.path.join(run.HERE, 'baselines.json')
+
+
+############
+## TIMING ##
+############
+
+class FunctionTimer(object):
+	"""Wraps named functions in a script's globals and sums the wall time spent inside them."""
+
+	def __init__(self, names=TIMED):
+		self.names = names
+		self.calls = dict((name, 0) for name in names)
+		self.seconds = dict((name, 0.0) for name in names)
+
+	def install(self, scope):
+		for name in self.names:
+			if name in scope:
+				scope[name] = self.wrap(name, scope[name])
+
+	def wrap(self, name, function):
+		timer = self
+		if inspect.isgeneratorfunction(function):
+			@functools.wraps(function)
+			def timed(*args, **kw):
+				timer.calls[name] += 1
+				generator = function(*args, **kw)
+				while True:
+					t = time.perf_counter()
+					try:
+						item = next(generator)
+					except StopIteration:
+						timer.seconds[name] += time.perf_counter() - t
+						return
+					timer.seconds[name] += time.perf_counter() - t
+					yield item
+		else:
+			@functools.wraps(function)
+			def timed(*args, **kw):
+				timer.calls[name] += 1
+				t = time.perf_counter()
+				try:
+					return function(*args, **kw)
+				finally:
+					timer.seconds[name] += time.perf_counter() - t
+		return timed
+
+
+###############
+## SCENARIOS ##
+###############
+
+def runScenario(name, seed=0, traceAlloc=False):
+	"""One run of a scenario; returns a flat dict of metrics."""
+	script, inputs = SCENARIOS[name]
+	workdir = tempfile.mkdtemp(prefix='squircle_bench_')
+	if script == 'CONMEM6_TEST.py':
+		#the schedule is written ahead from the seed, as in a study; one generated at launch gets a fresh seed and changes every run
+		dpath = os.path.join(run.makeWorkdir(workdir), 'Data', 'TestingData')
+		contexts, objects = schedule.makeSchedule(20, [seed, 1, 1])
+		schedule.saveSchedule(schedule.scheduleFileName(dpath, 1, 1), contexts, objects, 'seed %d subject 1 run 1' % seed)
+	timer = FunctionTimer()
+	marks = {}
+
+	def setup(scope):
+		marks['setup'] = time.perf_counter()
+		timer.install(scope)
+
+	gc.collect()
+	if traceAlloc:
+		tracemalloc.start()
+	start = time.perf_counter()
+	try:
+		engine, scope, workdir = run.runScript(script, inputs, workdir, seed, setup=setup)
+		wall = time.perf_counter() - start
+		if traceAlloc:
+			net, peak = tracemalloc.get_traced_memory()
+	finally:
+		if traceAlloc:
+			tracemalloc.stop()
+
+	metrics = {'wall_ms': wall * 1e3, 'setup_ms': (marks['setup'] - start) * 1e3, 'virtual_s': engine.time, 'frames': engine.frame,
+		'loads': len(engine.loads), 'clones': len(engine.clones), 'scene_nodes': sceneNodeCount()}
+	check = scope.get('sceneCheck')
+	metrics['scene_nodes_max'] = max(check.counts) if check is not None and check.counts else metrics['scene_nodes']
+	for fname in timer.names:
+		if timer.calls[fname]:
+			metrics[fname + '_calls'] = timer.calls[fname]
+			metrics[fname + '_ms'] = timer.seconds[fname] * 1e3
+	if traceAlloc:
+		metrics['alloc_peak_kb'] = peak / 1024.0
+		metrics['alloc_net_kb'] = net / 1024.0
+
+	logs = [f for f in sorted(glob.glob(os.path.join(workdir, 'Data', '*', '*_tracking_*'))) if trackload.parseTrackName(f) is not None]
+	metrics['log_bytes'] = sum(os.path.getsize(f) for f in logs)
+	metrics['trials'] = sum(len(trackload.loadTracking(f).trials) for f in logs)
+	metrics['log_bytes_per_trial'] = metrics['log_bytes'] / float(metrics['trials']) if metrics['trials'] else 0.0
+	shutil.rmtree(workdir, ignore_errors=True)
+	return metrics
+
+
+def benchScenario(name, repeat=5, seed=0, traceAlloc=True):
+	"""Best of repeat timed runs after one warm-up run (first imports, caches), plus one tracemalloc run for the allocation metrics.
+
+	Timing metrics keep the fastest run, as timeit does: slower runs measure other load on the machine, not the code.
+	"""
+	runScenario(name, seed)
+	runs = [runScenario(name, seed) for n in range(repeat)]
+	result = dict(runs[0])
+	for key in result:
+		if key.endswith('_ms'):
+			result[key] = min(r[key] for r in runs)
+	if result['trials']:
+		result['trial_ms'] = result['wall_ms'] / result['trials']
+	if traceAlloc:
+		traced = runScenario(name, seed, traceAlloc=True)
+		result['alloc_peak_kb'] = traced['alloc_peak_kb']
+		result['alloc_net_kb'] = traced['alloc_net_kb']
+	return result
+
+
+###############
+## BASELINES ##
+###############
+
+#metrics that are counts of the run itself, not costs; they are reported but never flagged
+INFO = ('virtual_s', 'frames', 'trials')
+
+
+def compare(results, baseline, tolerance=0.25, minMs=1.0):
+	"""Returns a list of (scenario, metric, baseline, value) that regressed."""
+	regressions = []
+	for name, metrics in results.items():
+		for key, value in metrics.items():
+			if key in INFO or key.endswith('_calls') or key not in baseline.get(name, {}):
+				continue
+			base = baseline[name][key]
+			limit = base * (1 + tolerance)
+			if key.endswith('_ms'):
+				limit = max(limit, base + minMs)
+			if value > limit + 1e-9:
+				regressions.append((name, key, base, value))
+	return regressions
+
+
+def printResults(results):
+	for name, metrics in results.items():
+		print('[' + name + ']')
+		for key in sorted(metrics):
+			value = metrics[key]
+			print('  %-24s %s' % (key, ('%.3f' % value) if isinstance(value, float) else value))
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description='Benchmark the task scripts on the headless stand-ins.')
+	parser.add_argument('scenarios', nargs='*', default=sorted(SCENARIOS), help='any of: ' + ', '.join(sorted(SCENARIOS)))
+	parser.add_argument('--repeat', type=int, default=5, help='timed runs per scenario (the fastest is kept)')
+	parser.add_argument('--seed', type=int, default=0)
+	parser.add_argument('--no-alloc', action='store_true', help='skip the tracemalloc run')
+	parser.add_argument('--baseline', default=BASELINE, help='baseline JSON file')
+	parser.add_argument('--save', action='store_true', help='write the results to the baseline file (merged by scenario)')
+	parser.add_argument('--compare', action='store_true', help='compare with the baseline file')
+	parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative increase before a metric counts as a regression')
+	parser.add_argument('--min-ms', type=float, default=1.0, help='allowed absolute increase of timing metrics, in ms')
+	args = parser.parse_args(argv)
+
+	results = {}
+	for name in args.scenarios:
+		if name not in SCENARIOS:
+			parser.error('unknown scenario: ' + name)
+		results[name] = benchScenario(name, args.repeat, args.seed, not args.no_alloc)
+	printResults(results)
+
+	status = 0
+	if args.compare:
+		if not os.path.isfile(args.baseline):
+			parser.error('no baseline file: ' + args.baseline)
+		with open(args.baseline) as f:
+			baseline = json.load(f)
+		regressions = compare(results, baseline, args.tolerance, args.min_ms)
+		for name, key, base, value in regressions:
+			print('REGRESSION %s %s: %.3f -> %.3f (%+.0f%%)' % (name, key, base, value, 100.0 * (value - base) / base if base else float('inf')))
+		if not regressions:
+			print('no regressions beyond %.0f%%' % (100 * args.tolerance))
+		status = 1 if regressions else 0
+	if args.save:
+		baseline = {}
+		if os.path.isfile(args.baseline):
+			with open(args.baseline) as f:
+				baseline = json.load(f)
+		baseline.update(results)
+		with open(args.baseline, 'w') as f:
+			json.dump(baseline, f, indent=1, sort_keys=True)
+		print('saved ' + args.baseline)
+	return status
+
+
+if __name__ == '__main__':
+	sys.exit(main())
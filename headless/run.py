@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+
+"""
+Runs a CONMEM6_*.py script without Vizard, on the stand-in modules in this directory.
+
+The script is executed as __main__ with this directory first on sys.path, so "import viz" etc. pick up the stand-ins. Its tasks are then
+run on viz.engine's virtual clock (conmem.clock.sessionClock reads it too) until the script calls viz.quit(), its tasks finish, or
+--max-time seconds of virtual time have passed; EXIT_EVENT callbacks run at the end, as when Vizard closes.
+An Autopilot answers prompts, walks to objects and makes responses, and vizinput.input() answers come from --input.
+Data go to <workdir>/Data/TrainingData and <workdir>/Data/TestingData; the script runs from <workdir>/task so its ../Data paths resolve.
+
+	python headless/run.py CONMEM6_TRAIN.py --input 1
+	python headless/run.py CONMEM6_TEST.py --input 1 --input 2 --workdir /tmp/squircle
+"""
+
+# Generic /Built-in
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+for path in (ROOT, HERE):
+	if path in sys.path:
+		sys.path.remove(path)
+	sys.path.insert(0, path)
+
+#Other libs
+import numpy
+import viz
+
+from autopilot import Autopilot
+from conmem.clock import sessionClock
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+def makeWorkdir(workdir=None):
+	if workdir is None:
+		workdir = tempfile.mkdtemp(prefix='squircle_')
+	for sub in ('task', os.path.join('Data', 'TrainingData'), os.path.join('Data', 'TestingData')):
+		os.makedirs(os.path.join(workdir, sub), exist_ok=True)
+	return workdir
+
+
+def runScript(script, inputs=(), workdir=None, seed=0, frameRate=60.0, maxTime=None, autopilot=True, setup=None):
+	"""Runs script to completion in virtual time; returns (viz.engine, the script's globals, workdir).
+
+	setup(scope), if given, is called with the script's live globals after its top level has run and before the frame loop starts,
+	so callers can wrap or replace the script's functions (the tasks look them up there when they call them).
+	"""
+	script = os.path.abspath(script if os.path.isfile(script) else os.path.join(ROOT, script))
+	workdir = makeWorkdir(workdir)
+	viz.engine.reset(frameRate)
+	viz.engine.inputs = list(inputs)
+	sessionClock.setSource(lambda: int(round(viz.engine.time * 1e9)))
+	numpy.random.seed(seed)
+	random.seed(seed)
+	if autopilot:
+		Autopilot(seed=seed)
+	cwd = os.getcwd()
+	os.chdir(os.path.join(workdir, 'task'))
+	try:
+		with open(script) as source:
+			code = compile(source.read(), script, 'exec')
+		scope = {'__name__': '__main__', '__file__': script, '__builtins__': __builtins__}
+		try:
+			exec(code, scope)
+		except SystemExit:
+			#the script stopped itself during setup (after viz.quit()); exit callbacks it registered still run
+			pass
+		if setup is not None:
+			setup(scope)
+		viz.engine.run(maxTime)
+	finally:
+		viz.engine.shutdown()
+		os.chdir(cwd)
+	return viz.engine, scope, workdir
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description='Run a CONMEM6 script headless, in virtual time.')
+	parser.add_argument('script', help='CONMEM6_FREE.py, CONMEM6_TRAIN.py or CONMEM6_TEST.py')
+	parser.add_argument('--input', action='append', default=[], help='answer to the next vizinput.input() prompt (repeatable)')
+	parser.add_argument('--workdir', default=None, help='directory for Data/ and task/ (default: a new temp dir)')
+	parser.add_argument('--seed', type=int, default=0)
+	parser.add_argument('--fps', type=float, default=60.0, help='virtual frame rate')
+	parser.add_argument('--max-time', type=float, default=None, help='stop after this many seconds of virtual time')
+	args = parser.parse_args(argv)
+	wall = time.perf_counter()
+	engine, scope, workdir = runScript(args.script, args.input, args.workdir, args.seed, args.fps, args.max_time)
+	print('%s: %.1f s virtual time, %d frames, %.2f s wall, %d loads, data in %s' % (os.path.basename(args.script), engine.time, engine.frame,
+		time.perf_counter() - wall, len(engine.loads), os.path.join(workdir, 'Data')))
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -0,0 +1,481 @@
+"""
+Headless stand-in for Vizard's viz module.
+
+Implements the part of the viz API the CONMEM6_*.py scripts use (scenes, nodes, textures, MainView, MainWindow, callbacks, quit),
+plus the frame loop that Vizard normally runs after a script returns. Nothing is rendered and nothing is loaded from disk:
+model and texture "loads" only create placeholder objects and are counted in engine.loads (clones in engine.clones).
+A model added with flags=LOAD_ASYNC reports ASYNC_LOADING from getAsyncStatus() for engine.asyncDelay seconds of virtual time.
+
+Time is virtual. Every engine.step() advances engine.time by one frame (1/engine.frameRate seconds), so a session runs as fast as
+the Python code allows. The other stand-in modules (viztask, vizact, vizproximity, ...) hook into engine.
+"""
+
+# Generic /Built-in
+import heapq
+import os
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+###############
+## CONSTANTS ##
+###############
+
+ON = 1
+OFF = 0
+TOGGLE = -1
+FULLSCREEN = 1
+REPEAT = 'repeat'
+CLAMP = 'clamp'
+REL_LOCAL = 'rel_local'
+REL_PARENT = 'rel_parent'
+WORLD = 'world'
+SCREEN = 'screen'
+
+WHITE = [1.0, 1.0, 1.0]
+BLACK = [0.0, 0.0, 0.0]
+RED = [1.0, 0.0, 0.0]
+GREEN = [0.0, 1.0, 0.0]
+BLUE = [0.0, 0.0, 1.0]
+
+PRIORITY_FIRST_UPDATE = -100000
+PRIORITY_DEFAULT = 0
+PRIORITY_LAST_UPDATE = 100000
+
+LOAD_ASYNC = 1
+ASYNC_LOADING = 0
+ASYNC_SUCCESS = 1
+ASYNC_FAILED = 2
+
+EXIT_EVENT = 'exit'
+KEYDOWN_EVENT = 'keydown'
+UPDATE_EVENT = 'update'
+
+#texture file types; anything else passed to add() is treated as a model
+TEXTURE_TYPES = ('.jpg', '.jpeg', '.png', '.tif', '.tiff', '.bmp', '.dds', '.ktx')
+
+antialias = 0
+
+
+###########
+## NODES ##
+###########
+
+class Node(object):
+	"""Placeholder scene node with a transform, visibility and children."""
+
+	def __init__(self, filename=None, scene=None, parent=None):
+		self.filename = filename
+		self.scene = scene
+		self.parent = parent
+		self.children = []
+		self._position = [0.0, 0.0, 0.0]
+		self._euler = [0.0, 0.0, 0.0]
+		self._scale = [1.0, 1.0, 1.0]
+		self.isVisible = True
+		self.removed = False
+		self.textureObject = None
+		self.loadedAt = 0.0 #virtual time an async load finishes
+		if parent is not None and parent not in (WORLD, SCREEN):
+			parent.children.append(self)
+		elif scene is not None:
+			scene.children.append(self)
+
+	def setPosition(self, x, y=None, z=None, mode=None):
+		self._position = _vec(x, y, z)
+
+	def getPosition(self, mode=None):
+		return list(self._position)
+
+	def setEuler(self, x, y=None, z=None, mode=None):
+		self._euler = _vec(x, y, z)
+
+	def getEuler(self, mode=None):
+		return list(self._euler)
+
+	def setScale(self, x, y=None, z=None):
+		self._scale = _vec(x, y, z)
+
+	def getScale(self):
+		return list(self._scale)
+
+	def visible(self, state=ON):
+		self.isVisible = (not self.isVisible) if state == TOGGLE else bool(state)
+
+	def getVisible(self):
+		return self.isVisible
+
+	def texture(self, tex, *args, **kw):
+		self.textureObject = tex
+
+	def texmat(self, matrix):
+		self.textureMatrix = matrix
+
+	def getAsyncStatus(self):
+		return ASYNC_LOADING if engine.time < self.loadedAt else ASYNC_SUCCESS
+
+	def getBoundingBox(self):
+		#placeholder geometry is a 1 m cube around the node origin
+		return BoundingBox(self._position, self._scale)
+
+	def clone(self, parent=None, scene=None, **kw):
+		"""New node sharing this one's (placeholder) model: nothing is loaded, and the clone is counted in engine.clones."""
+		engine.clones.append(self.filename)
+		node = Node(self.filename, _scene(scene), parent)
+		node._position = list(self._position)
+		node._euler = list(self._euler)
+		node._scale = list(self._scale)
+		return node
+
+	def getChildren(self, all=False):
+		if not all:
+			return list(self.children)
+		out = []
+		for child in self.children:
+			out.append(child)
+			out.extend(child.getChildren(all=True))
+		return out
+
+	def remove(self):
+		if self.removed:
+			return
+		self.removed = True
+		owner = self.parent if isinstance(self.parent, Node) else self.scene
+		if owner is not None and self in owner.children:
+			owner.children.remove(self)
+
+
+class TextNode(Node):
+
+	def __init__(self, message, parent=WORLD, scene=None):
+		Node.__init__(self, None, scene, parent)
+		self.text = message
+		self.size = 1
+		self.rgb = WHITE
+
+	def message(self, text):
+		self.text = text
+
+	def getMessage(self):
+		return self.text
+
+	def fontSize(self, size):
+		self.size = size
+
+	def color(self, *rgb):
+		self.rgb = rgb[0] if len(rgb) == 1 else list(rgb)
+
+
+class Light(Node):
+
+	def enable(self):
+		self.enabled = True
+
+	def disable(self):
+		self.enabled = False
+
+	def position(self, x, y, z, w=1):
+		self.lightPosition = [x, y, z, w]
+
+	def spread(self, angle):
+		self.lightSpread = angle
+
+	def intensity(self, value):
+		self.lightIntensity = value
+
+
+class Texture(object):
+
+	def __init__(self, filename, wrap=None):
+		self.filename = filename
+		self.wrap = wrap
+
+
+class BoundingBox(object):
+
+	def __init__(self, center, size):
+		self.center = list(center)
+		self.size = list(size)
+		self.xmin = center[0] - size[0] / 2.0
+		self.xmax = center[0] + size[0] / 2.0
+		self.ymin = center[1] - size[1] / 2.0
+		self.ymax = center[1] + size[1] / 2.0
+		self.zmin = center[2] - size[2] / 2.0
+		self.zmax = center[2] + size[2] / 2.0
+
+
+class Scene(Node):
+
+	def __init__(self, number):
+		Node.__init__(self)
+		self.number = number
+
+
+class View(object):
+	"""The viewpoint (viz.MainView): a pose only."""
+
+	def __init__(self):
+		self.reset()
+
+	def reset(self):
+		self._position = [0.0, 1.82, 0.0]
+		self._euler = [0.0, 0.0, 0.0]
+
+	def setPosition(self, x, y=None, z=None, mode=None):
+		self._position = _vec(x, y, z)
+
+	def getPosition(self, mode=None):
+		return list(self._position)
+
+	def setEuler(self, x, y=None, z=None, mode=None):
+		self._euler = _vec(x, y, z)
+
+	def getEuler(self, mode=None):
+		return list(self._euler)
+
+
+class Window(object):
+
+	def __init__(self):
+		self.scene = 1
+
+	def setScene(self, scene):
+		self.scene = scene.number if isinstance(scene, Scene) else scene
+
+	def getScene(self):
+		return self.scene
+
+	def screenCapture(self, filename):
+		pass
+
+
+class Matrix(object):
+
+	def __init__(self, values=None):
+		self.values = values
+
+	@staticmethod
+	def scale(x, y, z):
+		return Matrix(('scale', x, y, z))
+
+
+class Mouse(object):
+
+	def setVisible(self, state):
+		self.isVisible = state
+
+
+def _vec(x, y, z):
+	if y is None:
+		return [float(v) for v in x]
+	return [float(x), float(y), float(z)]
+
+
+############
+## ENGINE ##
+############
+
+class Engine(object):
+	"""Virtual-time frame loop, per-frame callbacks, task list and scripted input."""
+
+	def __init__(self):
+		self.reset()
+
+	def reset(self, frameRate=60.0, asyncDelay=0.5):
+		self.frameRate = float(frameRate)
+		self.asyncDelay = asyncDelay
+		self.frame = 0
+		self.time = 0.0
+		self.quitting = False
+		self.exited = False
+		self.serial = 0
+		self.updates = [] #vizact-style EventFunctions, sorted by priority
+		self.tasks = []
+		self.callbacks = {}
+		self.keyWaiters = []
+		self.keyHandlers = []
+		self.pendingKeys = [] #heap of (time, serial, key)
+		self.waitListeners = []
+		self.inputs = []
+		self.loads = []
+		self.clones = []
+		self.settings = {}
+		for scene in scenes:
+			scene.children = []
+		MainView.reset()
+		MainWindow.scene = 1
+
+	def nextSerial(self):
+		self.serial += 1
+		return self.serial
+
+	def addUpdate(self, function):
+		self.updates.append(function)
+		self.updates.sort(key=lambda f: (f.priority, f.serial))
+
+	def removeUpdate(self, function):
+		if function in self.updates:
+			self.updates.remove(function)
+
+	###########
+	## INPUT ##
+	###########
+
+	def pressKey(self, key, delay=0.0):
+		"""Queues a key press delay seconds from now (at the earliest on the next frame)."""
+		heapq.heappush(self.pendingKeys, (self.time + delay, self.nextSerial(), key))
+
+	def _keyDown(self, key):
+		for waiter in list(self.keyWaiters):
+			waiter.keyDown(key)
+		for handler in list(self.keyHandlers):
+			handler.keyDown(key)
+		for function in self.callbacks.get(KEYDOWN_EVENT, []):
+			function(key)
+
+	def nextInput(self, prompt):
+		if self.inputs:
+			return str(self.inputs.pop(0))
+		return '1'
+
+	def notifyWait(self, condition):
+		for listener in list(self.waitListeners):
+			listener(condition)
+
+	##########
+	## LOOP ##
+	##########
+
+	def step(self):
+		self.frame += 1
+		self.time = self.frame / self.frameRate
+		while self.pendingKeys and self.pendingKeys[0][0] <= self.time:
+			t, serial, key = heapq.heappop(self.pendingKeys)
+			self._keyDown(key)
+		for task in list(self.tasks):
+			task.step()
+		self.tasks = [task for task in self.tasks if task.alive]
+		for function in list(self.updates):
+			function.update(self)
+
+	def run(self, maxTime=None, maxFrames=None):
+		"""Runs frames until viz.quit(), until every task has finished, or until maxTime seconds / maxFrames frames."""
+		while not self.quitting:
+			if maxTime is not None and self.time >= maxTime:
+				break
+			if maxFrames is not None and self.frame >= maxFrames:
+				break
+			if not self.tasks and not self.pendingKeys:
+				break
+			self.step()
+		self.shutdown()
+
+	def shutdown(self):
+		if self.exited:
+			return
+		self.exited = True
+		for function in self.callbacks.get(EXIT_EVENT, []):
+			function()
+
+
+scenes = [Scene(n) for n in range(1, 5)]
+Scene1, Scene2, Scene3, Scene4 = scenes
+MainScene = Scene1
+MainView = View()
+MainWindow = Window()
+mouse = Mouse()
+engine = Engine()
+
+
+def _scene(scene):
+	if scene is None:
+		return Scene1
+	if isinstance(scene, Scene):
+		return scene
+	return scenes[scene - 1]
+
+
+#############
+## LOADING ##
+#############
+
+def add(filename, *args, **kw):
+	if os.path.splitext(filename)[1].lower() in TEXTURE_TYPES:
+		return addTexture(filename, **kw)
+	return addChild(filename, *args, **kw)
+
+
+def addChild(filename, parent=None, scene=None, flags=0, **kw):
+	engine.loads.append(filename)
+	node = Node(filename, _scene(scene), parent)
+	if flags & LOAD_ASYNC:
+		node.loadedAt = engine.time + engine.asyncDelay
+	return node
+
+
+def addTexture(filename, wrap=None, **kw):
+	engine.loads.append(filename)
+	return Texture(filename, wrap)
+
+
+def addText(message, parent=WORLD, scene=None, **kw):
+	return TextNode(message, parent, _scene(scene))
+
+
+def addTexQuad(parent=WORLD, scene=None, size=None, texture=None, **kw):
+	quad = Node(None, _scene(scene), parent)
+	quad.size = size
+	if texture is not None:
+		quad.texture(texture)
+	return quad
+
+
+def addGroup(parent=None, scene=None, **kw):
+	return Node(None, _scene(scene), parent)
+
+
+def addLight(parent=None, scene=None, **kw):
+	return Light(None, _scene(scene), parent)
+
+
+##############
+## SETTINGS ##
+##############
+
+def _setting(name):
+	def set(*args, **kw):
+		engine.settings[name] = args
+	return set
+
+fov = _setting('fov')
+setMultiSample = _setting('multisample')
+go = _setting('go')
+vsync = _setting('vsync')
+clearcolor = _setting('clearcolor')
+collision = _setting('collision')
+
+
+def callback(event, function):
+	engine.callbacks.setdefault(event, []).append(function)
+
+
+def quit():
+	engine.quitting = True
+
+
+def tick():
+	return engine.time
+
+
+def getFrameTime():
+	return engine.time
+
+
+def getFrameNumber():
+	return engine.frame
+
+
+def getFrameElapsed():
+	return 1.0 / engine.frameRate
@@ -0,0 +1,75 @@
+"""
+Headless stand-in for Vizard's vizact module: per-frame, timer and key-press callbacks driven by viz.engine.
+"""
+
+#Other libs
+import viz
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+class EventFunction(object):
+
+	def __init__(self, priority, function, args, kw, interval=None, repeats=None):
+		self.priority = priority
+		self.serial = viz.engine.nextSerial()
+		self.function = function
+		self.args = args
+		self.kw = kw
+		self.interval = interval
+		self.repeats = repeats
+		self.next = viz.engine.time + (interval or 0)
+		self.enabled = True
+
+	def update(self, engine):
+		if not self.enabled:
+			return
+		if self.interval is not None:
+			if engine.time < self.next - 5e-7:
+				return
+			self.next += self.interval if self.interval > 0 else 0
+			if self.repeats is not None:
+				self.repeats -= 1
+				if self.repeats < 0:
+					self.remove()
+					return
+		self.function(*self.args, **self.kw)
+
+	def keyDown(self, key):
+		if self.enabled and key == self.key:
+			self.function(*self.args, **self.kw)
+
+	def setEnabled(self, state):
+		self.enabled = bool(state)
+
+	def remove(self):
+		viz.engine.removeUpdate(self)
+		if self in viz.engine.keyHandlers:
+			viz.engine.keyHandlers.remove(self)
+
+
+def onupdate(priority, function, *args, **kw):
+	event = EventFunction(priority, function, args, kw)
+	viz.engine.addUpdate(event)
+	return event
+
+
+def ontimer(interval, function, *args, **kw):
+	event = EventFunction(viz.PRIORITY_DEFAULT, function, args, kw, interval)
+	viz.engine.addUpdate(event)
+	return event
+
+
+def ontimer2(interval, repeats, function, *args, **kw):
+	event = EventFunction(viz.PRIORITY_DEFAULT, function, args, kw, interval, repeats)
+	viz.engine.addUpdate(event)
+	return event
+
+
+def onkeydown(key, function, *args, **kw):
+	event = EventFunction(viz.PRIORITY_DEFAULT, function, args, kw)
+	event.key = key
+	viz.engine.keyHandlers.append(event)
+	return event
@@ -0,0 +1,30 @@
+"""
+Headless stand-in for Vizard's vizcam module.
+
+The navigators only record their settings; in headless runs viz.MainView is driven by the autopilot (or by the script itself).
+"""
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+class Navigator(object):
+
+	def __init__(self, **kw):
+		self.settings = kw
+		self.enabled = True
+
+	def setEnabled(self, state):
+		self.enabled = bool(state)
+
+	def remove(self):
+		self.enabled = False
+
+
+class KeyboardCamera(Navigator):
+	pass
+
+
+class WalkNavigate(Navigator):
+	pass
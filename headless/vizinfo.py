@@ -0,0 +1,22 @@
+"""
+Headless stand-in for Vizard's vizinfo module.
+"""
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+class InfoPanel(object):
+
+	def __init__(self, text='', **kw):
+		self.text = text
+
+	def setText(self, text):
+		self.text = text
+
+	def visible(self, state):
+		self.isVisible = state
+
+	def remove(self):
+		pass
@@ -0,0 +1,14 @@
+"""
+Headless stand-in for Vizard's vizinput module: input() answers come from viz.engine.inputs, in order ('1' once they run out).
+"""
+
+#Other libs
+import viz
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+def input(prompt='', value='', **kw):
+	return viz.engine.nextInput(prompt)
@@ -0,0 +1,147 @@
+"""
+Headless stand-in for Vizard's vizproximity module.
+
+Sensors are axis-aligned boxes that follow their source node. Each Manager checks its targets against its sensors once per frame
+(from an engine update at PRIORITY_DEFAULT), and fires enter/exit callbacks and waitEnter() conditions on the frame a target crosses in.
+"""
+
+#Other libs
+import viz
+import vizact
+import viztask
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+class Target(object):
+
+	def __init__(self, source):
+		self.source = source
+
+	def getPosition(self):
+		return self.source.getPosition()
+
+
+class Box(object):
+
+	def __init__(self, size, center=(0,0,0)):
+		self.half = [s / 2.0 for s in size]
+		self.center = list(center)
+
+	def contains(self, origin, pos):
+		for axis in range(3):
+			if abs(pos[axis] - origin[axis] - self.center[axis]) > self.half[axis]:
+				return False
+		return True
+
+
+class Sensor(object):
+
+	def __init__(self, shape, source):
+		self.shape = shape
+		self.source = source
+		self.waiters = []
+
+	def contains(self, pos):
+		return self.shape.contains(self.source.getPosition(), pos)
+
+
+def addBoundingBoxSensor(node, scale=(1,1,1)):
+	box = node.getBoundingBox()
+	size = [box.size[axis] * scale[axis] for axis in range(3)]
+	return Sensor(Box(size), node)
+
+
+class Manager(object):
+
+	def __init__(self):
+		self.targets = []
+		self.sensors = []
+		self.inside = set()
+		self.enterCallbacks = []
+		self.exitCallbacks = []
+		self.updater = vizact.onupdate(viz.PRIORITY_DEFAULT, self.update)
+
+	def remove(self):
+		self.updater.remove()
+		self.targets = []
+		self.sensors = []
+		self.inside = set()
+
+	def addTarget(self, target):
+		self.targets.append(target)
+
+	def removeTarget(self, target):
+		self.targets.remove(target)
+
+	def addSensor(self, sensor):
+		if sensor not in self.sensors:
+			self.sensors.append(sensor)
+
+	def removeSensor(self, sensor):
+		if sensor in self.sensors:
+			self.sensors.remove(sensor)
+		self.inside = set(pair for pair in self.inside if pair[0] is not sensor)
+
+	def getSensors(self):
+		return list(self.sensors)
+
+	def onEnter(self, sensor, function, *args):
+		self.enterCallbacks.append((sensor, function, args))
+
+	def onExit(self, sensor, function, *args):
+		self.exitCallbacks.append((sensor, function, args))
+
+	def update(self):
+		for sensor in list(self.sensors):
+			for target in self.targets:
+				pair = (sensor, target)
+				if sensor.contains(target.getPosition()):
+					if pair not in self.inside:
+						self.inside.add(pair)
+						self._fire(self.enterCallbacks, sensor, target)
+						for waiter in list(sensor.waiters):
+							waiter.enter(target)
+				elif pair in self.inside:
+					self.inside.discard(pair)
+					self._fire(self.exitCallbacks, sensor, target)
+
+	def _fire(self, callbacks, sensor, target):
+		for s, function, args in callbacks:
+			if s is None or s is sensor:
+				function(ProximityEvent(sensor, target, self), *args)
+
+
+class ProximityEvent(object):
+
+	def __init__(self, sensor, target, manager):
+		self.sensor = sensor
+		self.target = target
+		self.manager = manager
+
+
+class waitEnter(viztask.Condition):
+
+	def __init__(self, sensor, target=None):
+		self.sensor = sensor
+		self.target = target
+		self.entered = False
+
+	def start(self):
+		viztask.Condition.start(self)
+		self.entered = False
+		self.sensor.waiters.append(self)
+
+	def enter(self, target):
+		if self.target is None or target is self.target:
+			self.entered = True
+			self.stop()
+
+	def ready(self):
+		return self.entered
+
+	def stop(self):
+		if self in self.sensor.waiters:
+			self.sensor.waiters.remove(self)
@@ -0,0 +1,28 @@
+"""
+Headless stand-in for Vizard's vizshape module.
+"""
+
+#Other libs
+import viz
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+AXIS_X = 'x'
+AXIS_Y = 'y'
+AXIS_Z = 'z'
+
+
+def addPlane(size=(1.0,1.0), axis=AXIS_Y, scene=None, **kw):
+	plane = viz.addGroup(scene=scene)
+	plane.size = size
+	plane.axis = axis
+	return plane
+
+
+def addBox(size=(1.0,1.0,1.0), scene=None, **kw):
+	box = viz.addGroup(scene=scene)
+	box.setScale(size)
+	return box
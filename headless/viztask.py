@@ -0,0 +1,168 @@
+"""
+Headless stand-in for Vizard's viztask module: generator tasks and the conditions they yield.
+
+A task is stepped once per frame by viz.engine. When it yields a condition it sleeps until the condition is met, and at the earliest on
+the next frame. When it yields another generator, that generator runs as a sub-task and the parent resumes once it returns, like
+"yield subtask()" in Vizard.
+"""
+
+# Generic /Built-in
+import types
+
+#Other libs
+import viz
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+################
+## CONDITIONS ##
+################
+
+class Condition(object):
+	"""Base condition; subclasses override ready(). start() is called when a task yields it."""
+
+	def start(self):
+		self.startFrame = viz.engine.frame
+
+	def ready(self):
+		return True
+
+	def done(self):
+		return viz.engine.frame > self.startFrame and self.ready()
+
+	def stop(self):
+		pass
+
+
+class waitTime(Condition):
+
+	def __init__(self, seconds):
+		self.seconds = seconds
+
+	def start(self):
+		Condition.start(self)
+		self.end = viz.engine.time + self.seconds
+
+	def ready(self):
+		#half a microsecond of slack so that sums of frame periods land on the frame they are meant to
+		return viz.engine.time >= self.end - 5e-7
+
+
+class waitFrame(Condition):
+
+	def __init__(self, frames=1):
+		self.frames = frames
+
+	def ready(self):
+		return viz.engine.frame - self.startFrame >= self.frames
+
+
+class waitKeyDown(Condition):
+
+	def __init__(self, keys=None):
+		if isinstance(keys, str):
+			keys = [keys]
+		self.keys = keys
+		self.key = None
+
+	def start(self):
+		Condition.start(self)
+		self.key = None
+		viz.engine.keyWaiters.append(self)
+
+	def keyDown(self, key):
+		if self.key is None and (self.keys is None or key in self.keys):
+			self.key = key
+			self.stop()
+
+	def ready(self):
+		return self.key is not None
+
+	def stop(self):
+		if self in viz.engine.keyWaiters:
+			viz.engine.keyWaiters.remove(self)
+
+
+class Signal(object):
+
+	def __init__(self):
+		self.count = 0
+
+	def send(self):
+		self.count += 1
+
+	def wait(self):
+		return waitSignal(self)
+
+
+class waitSignal(Condition):
+
+	def __init__(self, signal):
+		self.signal = signal
+
+	def start(self):
+		Condition.start(self)
+		self.count = self.signal.count
+
+	def ready(self):
+		return self.signal.count > self.count
+
+
+class waitTask(Condition):
+
+	def __init__(self, task):
+		self.task = task
+
+	def ready(self):
+		return not self.task.alive
+
+
+###########
+## TASKS ##
+###########
+
+class Task(object):
+
+	def __init__(self, generator):
+		self.stack = [generator]
+		self.waiting = None
+		self.alive = True
+
+	def step(self):
+		while self.alive:
+			if self.waiting is not None:
+				if not self.waiting.done():
+					return
+				self.waiting = None
+			try:
+				item = next(self.stack[-1])
+			except StopIteration:
+				self.stack.pop()
+				self.alive = bool(self.stack)
+				continue
+			if isinstance(item, types.GeneratorType):
+				self.stack.append(item)
+				continue
+			if isinstance(item, Task):
+				item = waitTask(item)
+			elif item is None:
+				item = waitFrame(1)
+			item.start()
+			self.waiting = item
+			viz.engine.notifyWait(item)
+
+	def kill(self):
+		if self.waiting is not None:
+			self.waiting.stop()
+		self.alive = False
+
+
+def schedule(generator):
+	if callable(generator) and not isinstance(generator, types.GeneratorType):
+		generator = generator()
+	task = Task(generator)
+	viz.engine.tasks.append(task)
+	return task
@@ -0,0 +1,17 @@
+"""
+pytest configuration: puts the repository root on sys.path, so the tests import conmem however pytest is started, and the headless
+Vizard stand-ins (headless/), so modules that import viz or viztask can be tested without Vizard.
+"""
+
+# Generic /Built-in
+import os
+import sys
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (os.path.join(ROOT, 'headless'), ROOT):
+	sys.path.insert(0, path)
@@ -0,0 +1,72 @@
+"""
+Tests for conmem.arena: which quadrants are round, and how ArenaCollision holds the view inside each arena shape.
+"""
+
+# Generic /Built-in
+import math
+
+#Other libs
+import numpy
+import pytest
+
+from conmem import arena
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+class View(object):
+
+	def __init__(self, x, z):
+		self.position = [x, 1.8, z]
+
+	def getPosition(self):
+		return list(self.position)
+
+	def setPosition(self, x, y, z):
+		self.position = [x, y, z]
+
+
+def inside(x, z, shape, limit):
+	if arena.ROUND[shape][arena.quadrant(x, z)]:
+		return math.hypot(x, z) <= limit + 1e-9
+	return abs(x) <= limit and abs(z) <= limit
+
+
+@pytest.mark.parametrize('shape', [arena.CIRCLE, arena.SQUARE, arena.SQUIRCLE])
+def test_heldInside(shape):
+	rng = numpy.random.default_rng(shape)
+	collision = arena.ArenaCollision(View(0.0, 0.0), shape, radius=14.5, buffer=0.5)
+	for x, z in rng.uniform(-20, 20, (2000, 2)).tolist():
+		collision.view.position = [x, 1.8, z]
+		collision.update()
+		cx, y, cz = collision.view.position
+		assert y == 1.8
+		assert inside(cx, cz, shape, 14.0)
+		if inside(x, z, shape, 14.0):
+			#positions inside the walls are left alone
+			assert (cx, cz) == (x, z)
+	assert collision.contacts > 0
+
+
+def test_squircleQuadrants():
+	#round walls in (+x,-z) and (-x,+z), square ones in the other two
+	limit = 14.0
+	assert arena.constrain(12.0, -12.0, arena.SQUIRCLE, limit) == pytest.approx((limit / 2 ** 0.5, -limit / 2 ** 0.5))
+	assert arena.constrain(-12.0, 12.0, arena.SQUIRCLE, limit) == pytest.approx((-limit / 2 ** 0.5, limit / 2 ** 0.5))
+	assert arena.constrain(-13.5, -13.5, arena.SQUIRCLE, limit) == (-13.5, -13.5)
+	assert arena.constrain(20.0, 13.0, arena.SQUIRCLE, limit) == (14.0, 13.0)
+
+
+def test_slidesAlongWall():
+	collision = arena.ArenaCollision(View(0.0, 0.0), arena.SQUARE, radius=14.5, buffer=0.5)
+	collision.view.position = [15.0, 1.8, 3.0]
+	collision.update()
+	#the movement into the wall is dropped, the movement along it kept
+	assert collision.view.position == [14.0, 1.8, 3.0]
+	collision.setShape(arena.CIRCLE)
+	collision.view.position = [0.0, 1.8, -20.0]
+	collision.update()
+	assert collision.view.position == pytest.approx([0.0, 1.8, -14.0])
+	assert collision.contacts == 2
@@ -0,0 +1,69 @@
+"""
+Tests for conmem.batch: per-trial metrics, the per-file cache and its invalidation, and the study tables.
+"""
+
+# Generic /Built-in
+import os
+
+#Other libs
+import numpy
+
+from conmem import batch
+from conmem import cache
+from conmem import trackload
+from test_trackload import TEST_ROWS, TRAIN_ROWS, writeText
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+def test_trialMetrics(tmp_path):
+	metrics = batch.trialMetrics(trackload.loadTracking(writeText(str(tmp_path / 'TEST_tracking_1_1.txt'), TEST_ROWS)))
+	#the logged sweep times give the rotation; walking starts after it
+	assert metrics['rotation'][0] == 12.0 and metrics['path'][0] == 0.0
+	#the squircle trial's step is a teleport, and its sweep was not logged or completed
+	assert metrics['path'][1] == 0.0 and numpy.isnan(metrics['rotation'][1])
+	assert metrics['response'].tolist() == [12.0, 1.0]
+	metrics = batch.trialMetrics(trackload.loadTracking(writeText(str(tmp_path / 'TRAIN_tracking_1_2_1.txt'), TRAIN_ROWS)))
+	assert numpy.allclose(metrics['path'], [0.5 ** 0.5, 0.5 ** 0.5])
+	assert numpy.isnan(metrics['response'][0]) and numpy.isclose(metrics['response'][1], 0.1)
+
+
+def test_cache(tmp_path, monkeypatch):
+	fname = writeText(str(tmp_path / 'TEST_tracking_1_1.txt'), TEST_ROWS)
+	cacheRoot = str(tmp_path / 'cache')
+	loads = []
+	load = trackload.loadTracking
+	monkeypatch.setattr(trackload, 'loadTracking', lambda f: loads.append(f) or load(f))
+	first = batch.fileMetrics(fname, cacheRoot)
+	assert batch.fileMetrics(fname, cacheRoot).tobytes() == first.tobytes()
+	assert len(loads) == 1
+
+	#the key is the file's contents: a touched file still hits the cache, and a digest from the index saves hashing it
+	st = os.stat(fname)
+	os.utime(fname, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+	batch.fileMetrics(fname, cacheRoot, digest=cache.fileHash(fname))
+	assert len(loads) == 1
+
+	#a changed file misses, and gets its new metrics
+	writeText(fname, TEST_ROWS[:5])
+	assert len(batch.fileMetrics(fname, cacheRoot)) == 1
+	assert len(loads) == 2
+
+
+def test_runBatch(tmp_path):
+	train = tmp_path / 'TrainingData'
+	test = tmp_path / 'TestingData'
+	train.mkdir()
+	test.mkdir()
+	writeText(str(train / 'TRAIN_tracking_2_2_1.txt'), TRAIN_ROWS)
+	writeText(str(test / 'TEST_tracking_10_1.txt'), TEST_ROWS)
+	writeText(str(test / 'TEST_tracking_2_1.txt'), TEST_ROWS[:5])
+	tables = batch.runBatch([str(train), str(test)], str(tmp_path / 'out'), jobs=1)
+	assert [os.path.basename(t) for t in tables] == ['TRAIN_trials.tsv', 'TEST_trials.tsv']
+	with open(tables[1]) as f:
+		rows = [line.rstrip('\n').split('\t') for line in f]
+	assert rows[0] == batch.COLUMNS
+	#subjects sort numerically
+	assert [(r[1], r[4], r[2], r[6]) for r in rows[1:]] == [('2', '1', '1', 'plant'), ('10', '1', '1', 'plant'), ('10', '2', '3', 'pumpkin')]
@@ -0,0 +1,61 @@
+"""
+Tests for conmem.choice: the bias measure and the pooled summary rows.
+"""
+
+# Generic /Built-in
+import warnings
+
+#Other libs
+import numpy
+
+from conmem import choice
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+def test_bias():
+	assert choice.bias(numpy.array([0.0, 2.0, 1.0]), numpy.array([4.0, 0.0, 1.0])).tolist() == [1.0, -1.0, 0.0]
+
+
+def test_summarize():
+	trials = numpy.zeros(4, dtype=choice.TRIALS)
+	trials['subject'] = [0, 0, 1, 1]
+	trials['object'] = [0, 1, 0, 0]
+	trials['choice'] = [1, 2, 1, 1]
+	trials['bias'] = [1.0, -1.0, 0.5, numpy.nan]
+	trials['quadrant'] = [0, 0, 3, -1]
+	rows = dict(((r[0], r[1]), r) for r in choice.summarize(trials, 2, draws=200, seed=1))
+	assert rows[('all', 'all')][2:5] == [4, 2, 0.75]
+	#an undefined bias counts as 0 but the trial still counts for the choice
+	assert rows[('all', 'all')][7] == 0.125
+	assert rows[('object', choice.trackload.OBJECTS[1])][2:4] == [1, 1]
+	assert rows[('quadrant', '+x-z ' + choice.WALLS[0])][2] == 2
+	lo, hi = rows[('all', 'all')][5:7]
+	assert 0.0 <= lo <= 0.75 <= hi <= 1.0
+
+
+def test_emptyCells():
+	#objects 2 and 3 and most quadrants have no trials: their intervals are NaN, without warnings
+	trials = numpy.zeros(2, dtype=choice.TRIALS)
+	trials['subject'] = [0, 1]
+	trials['choice'] = [1, 2]
+	trials['bias'] = [0.5, -0.5]
+	with warnings.catch_warnings():
+		warnings.simplefilter('error')
+		for unit in ['subject', 'trial']:
+			rows = dict(((r[0], r[1]), r) for r in choice.summarize(trials, 2, draws=100, unit=unit, seed=1))
+			empty = rows[('object', choice.trackload.OBJECTS[3])]
+			assert empty[2:4] == [0, 0] and numpy.isnan(empty[4:]).all()
+			assert numpy.isfinite(rows[('all', 'all')][4:]).all()
+
+
+def test_noSubjects():
+	circleCI, biasCI = choice.bootstrapSubjects(numpy.zeros((0, 3)), numpy.zeros((0, 3)), numpy.zeros((0, 3)), draws=10)
+	assert circleCI.shape == biasCI.shape == (2, 3) and numpy.isnan(circleCI).all() and numpy.isnan(biasCI).all()
+	with warnings.catch_warnings():
+		warnings.simplefilter('error')
+		rows = choice.summarize(numpy.zeros(0, dtype=choice.TRIALS), 0, draws=10)
+	assert len(rows) == len(choice.cells(numpy.zeros(0, dtype=choice.TRIALS)))
+	assert all(row[2] == 0 and numpy.isnan(row[4:]).all() for row in rows)
@@ -0,0 +1,69 @@
+"""
+Tests for conmem.events: the BIDS events.tsv columns, rows and timing of a TEST run, from text and binary tracking files.
+"""
+
+# Generic /Built-in
+import os
+
+from conmem import events
+from conmem import tracklog
+from test_trackload import TEST_ROWS, writeText
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+#text files: each event takes the time of the next pose sample
+EXPECTED = [
+	['onset','duration','trial_type','trial','context','object','error','error2','choice'],
+	['0.0000','1.0000','instruction','1','circle','plant','3.2500','n/a','n/a'],
+	['1.0000','12.0000','rotation','1','circle','plant','3.2500','n/a','n/a'],
+	['13.0000','7.0000','response','1','circle','plant','3.2500','n/a','n/a'],
+	['20.0000','0.0000','instruction','2','squircle','pumpkin','7.5000','1.2500','2'],
+	['20.0000','n/a','rotation','2','squircle','pumpkin','7.5000','1.2500','2'],
+	['20.0000','1.0000','response','2','squircle','pumpkin','7.5000','1.2500','2'],
+	]
+
+
+def readTable(fname):
+	with open(fname) as f:
+		return [line.rstrip('\n').split('\t') for line in f]
+
+
+def test_text(tmp_path):
+	fname = writeText(str(tmp_path / 'TEST_tracking_7_2.txt'), TEST_ROWS)
+	dst, count = events.exportFile(fname, str(tmp_path / 'bids'))
+	assert dst == os.path.join(str(tmp_path / 'bids'), 'sub-7', 'func', 'sub-7_task-squircle_run-2_events.tsv')
+	assert count == 6
+	assert readTable(dst) == EXPECTED
+
+
+def test_binary(tmp_path):
+	#binary files store each event's own time
+	fname = str(tmp_path / 'TEST_tracking_7_2.trk')
+	writer = tracklog.openTrackWriter(fname, 'binary')
+	writer.event('Start replace, circle', 2.0)
+	writer.sample(2.5, 0.0, 0.0, 0.0)
+	writer.event('Rotation, 2.5, 14.5', 14.5)
+	writer.event('Replaced circle, cone, 1.5', 18.0)
+	writer.close()
+	dst, count = events.exportFile(fname, str(tmp_path / 'bids'))
+	assert [row[:4] for row in readTable(dst)[1:]] == [['0.0000','2.0000','instruction','1'], ['2.5000','12.0000','rotation','1'],
+		['14.5000','3.5000','response','1']]
+
+
+def test_unfinishedTrial():
+	#a trial without its 'Replaced' row (the run ended) writes nothing
+	rows = list(events.trialRows([(1.0, 'Start replace, circle'), (2.0, 'Rotation, 1.0, 2.0')]))
+	assert rows == []
+
+
+def test_exportAll(tmp_path):
+	data = tmp_path / 'TestingData'
+	data.mkdir()
+	writeText(str(data / 'TEST_tracking_1_1.txt'), TEST_ROWS)
+	writeText(str(data / 'TEST_tracking_1_2.txt'), TEST_ROWS[:5])
+	writeText(str(data / 'TRAIN_tracking_1_1_1.txt'), ['Start collect'])
+	written = events.exportAll([str(data)], str(tmp_path / 'bids'), jobs=1)
+	assert sorted(count for dst, count in written) == [3, 6]
@@ -0,0 +1,101 @@
+"""
+Tests for conmem.framesample: the ring buffer keeps the newest samples across wraparound, and marks keep their place between samples.
+"""
+
+#Other libs
+import numpy
+
+from conmem import clock
+from conmem import framesample
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+class Ticks(object):
+	"""Time source that steps 1 ms per read."""
+
+	def __init__(self):
+		self.ns = 0
+
+	def __call__(self):
+		self.ns += 1000000
+		return self.ns
+
+
+class View(object):
+
+	def __init__(self):
+		self.x = 0.0
+
+	def getPosition(self):
+		return [self.x, 0.0, -self.x]
+
+	def getEuler(self):
+		return [2 * self.x, 0.0, 0.0]
+
+
+class Rows(object):
+	"""Writer that keeps ('sample', x) and ('event', text) rows in order."""
+
+	def __init__(self):
+		self.rows = []
+		self.times = []
+
+	def samples(self, t, x, z, yaw):
+		assert numpy.array_equal(z, -x) and numpy.array_equal(yaw, 2 * x)
+		self.rows.extend(('sample', v) for v in x.tolist())
+		self.times.extend(t.tolist())
+
+	def event(self, text, t=0.0):
+		self.rows.append(('event', text))
+
+
+def sampler(size):
+	view = View()
+	return view, framesample.FrameSampler(view, clock.Clock(Ticks()), 'session', size)
+
+
+def record(view, sampler, values):
+	for v in values:
+		view.x = float(v)
+		sampler.record()
+
+
+def test_drainInOrder():
+	view, s = sampler(8)
+	record(view, s, [1, 2])
+	s.mark('a')
+	record(view, s, [3])
+	s.mark('b')
+	out = Rows()
+	s.drain(out)
+	assert out.rows == [('sample', 1.0), ('sample', 2.0), ('event', 'a'), ('sample', 3.0), ('event', 'b')]
+	assert numpy.all(numpy.diff(out.times) > 0)
+	assert s.pending() == 0 and s.overwritten == 0
+
+
+def test_wraparound():
+	view, s = sampler(4)
+	out = Rows()
+	record(view, s, [1, 2, 3])
+	s.drain(out)
+	#the next drain starts at slot 3 and wraps to the start of the ring
+	record(view, s, [4, 5, 6])
+	s.drain(out)
+	assert [v for kind, v in out.rows] == [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+	assert s.overwritten == 0
+
+
+def test_overwritten():
+	view, s = sampler(4)
+	record(view, s, [1, 2])
+	s.mark('early')
+	record(view, s, [3, 4, 5, 6, 7])
+	s.mark('late')
+	out = Rows()
+	s.drain(out)
+	#1-3 were overwritten; a mark whose samples are gone comes out before the oldest sample kept
+	assert out.rows == [('event', 'early'), ('sample', 4.0), ('sample', 5.0), ('sample', 6.0), ('sample', 7.0), ('event', 'late')]
+	assert s.overwritten == 3
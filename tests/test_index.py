@@ -0,0 +1,103 @@
+"""
+Tests for conmem.index: what a refresh counts as new, changed, unchanged and removed, and which files a stage has to redo.
+"""
+
+# Generic /Built-in
+import os
+
+from conmem import batch
+from conmem import choice
+from conmem import index
+from test_trackload import TEST_ROWS, writeText
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+def write(path, text):
+	with open(str(path), 'w') as f:
+		f.write(text)
+	return str(path)
+
+
+def test_refreshAndStale(tmp_path):
+	data = tmp_path / 'TestingData'
+	data.mkdir()
+	a = write(data / 'TEST_tracking_1_1.txt', 'Start replace, circle\n0.0\t1.0\t2.0\t3.0\n')
+	b = write(data / 'TEST_tracking_2_1.txt', 'Start replace, square\n')
+	write(data / 'notes.txt', 'not a tracking file\n')
+	idx = index.TrackingIndex(str(tmp_path / 'index.sqlite'))
+	assert idx.refresh([str(data)]) == dict(new=2, changed=0, unchanged=0, removed=0)
+	assert sorted(idx.files([str(data)])) == [('TEST', '1', 0, 1), ('TEST', '2', 0, 1)]
+
+	#nothing built yet; after done() only a changed input, other parameters or a missing output make a file stale
+	assert idx.stale('events', [a, b]) == [a, b]
+	out = write(tmp_path / 'a.tsv', 'onset\n')
+	idx.done('events', a, ('x',), out)
+	idx.done('events', b, ('x',))
+	assert idx.stale('events', [a, b], ('x',)) == []
+	assert idx.stale('events', [a, b], ('y',)) == [a, b]
+	assert idx.stale('resample', [a, b], ('x',)) == [a, b]
+
+	#touched but unchanged: hashed again, still unchanged, still built
+	st = os.stat(a)
+	os.utime(a, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+	assert idx.refresh([str(data)]) == dict(new=0, changed=0, unchanged=2, removed=0)
+	assert idx.stale('events', [a, b], ('x',)) == []
+
+	write(a, 'Start replace, circle\n0.0\t1.0\t2.0\t4.0\n')
+	os.remove(b)
+	assert idx.refresh([str(data)]) == dict(new=0, changed=1, unchanged=0, removed=1)
+	assert idx.stale('events', [a], ('x',)) == [a]
+
+	idx.done('events', a, ('x',), out)
+	os.remove(out)
+	assert idx.stale('events', [a], ('x',)) == [a]
+	idx.close()
+
+
+def test_trkPreferred(tmp_path):
+	write(tmp_path / 'TEST_tracking_1_1.txt', '')
+	write(tmp_path / 'TEST_tracking_1_1.trk', '')
+	idx = index.openIndex([str(tmp_path)], str(tmp_path / 'index.sqlite'))
+	assert idx.files()[('TEST', '1', 0, 1)].endswith('.trk')
+	idx.close()
+
+
+def test_batchTables(tmp_path):
+	data = tmp_path / 'TestingData'
+	data.mkdir()
+	a = writeText(str(data / 'TEST_tracking_1_1.txt'), TEST_ROWS)
+	b = writeText(str(data / 'TEST_tracking_2_1.txt'), TEST_ROWS[:5])
+	out = str(tmp_path / 'out')
+	idx = index.openIndex([str(data)], str(tmp_path / 'index.sqlite'))
+	assert len(batch.runBatch([str(data)], out, jobs=1, index=idx)) == 1
+	#nothing changed: nothing is written
+	assert batch.runBatch([str(data)], out, jobs=1, index=idx) == []
+	#a run gone: the table is written again without it
+	os.remove(b)
+	idx.refresh([str(data)])
+	tables = batch.runBatch([str(data)], out, jobs=1, index=idx)
+	with open(tables[0]) as f:
+		assert [line.split('\t')[1] for line in f.read().splitlines()[1:]] == ['1', '1']
+	#a changed run, or a missing table, too
+	writeText(a, TEST_ROWS[:5])
+	idx.refresh([str(data)])
+	assert len(batch.runBatch([str(data)], out, jobs=1, index=idx)) == 1
+	os.remove(tables[0])
+	assert len(batch.runBatch([str(data)], out, jobs=1, index=idx)) == 1
+	idx.close()
+
+
+def test_choiceTable(tmp_path, capsys):
+	data = tmp_path / 'TestingData'
+	data.mkdir()
+	writeText(str(data / 'TEST_tracking_1_1.txt'), TEST_ROWS)
+	args = ['--test', str(data), '--out', str(tmp_path / 'choice.tsv'), '--index', str(tmp_path / 'index.sqlite'), '--draws', '50', '--jobs', '1']
+	choice.main(args + ['--seed', '1'])
+	choice.main(args + ['--seed', '1'])
+	assert capsys.readouterr().out.splitlines()[-1].endswith('is up to date')
+	#other bootstrap parameters are a new table
+	choice.main(args + ['--seed', '2'])
+	assert '1 squircle trials, 1 subjects' in capsys.readouterr().out
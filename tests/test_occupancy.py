@@ -0,0 +1,101 @@
+"""
+Tests for conmem.occupancy: which samples are binned and where, dwell times, the group average and the content-keyed cache.
+"""
+
+# Generic /Built-in
+import os
+import shutil
+
+#Other libs
+import numpy
+
+from conmem import occupancy
+from conmem import trackload
+from test_trackload import TEST_ROWS, writeText
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+def test_trackMaps(tmp_path):
+	track = trackload.loadTracking(writeText(str(tmp_path / 'TEST_tracking_1_1.txt'), TEST_ROWS))
+	maps = occupancy.trackMaps(track, bins=29, radius=14.5)
+	assert maps.shape == (3, 2, 29, 29)
+	#1 m cells; maps[context - 1, kind, z cell, x cell]
+	assert maps[0, 0].sum() == 2 and maps[1].sum() == 0 and maps[2, 0].sum() == 2
+	assert maps[0, 0, 14, 14] == 1 and maps[0, 0, 15, 15] == 1
+	assert maps[2, 0, 12, 16] == 1 and maps[2, 0, 22, 8] == 1
+	#each sample dwells until the next one, at most MAXGAP; the last one not at all
+	assert maps[0, 1, 14, 14] == occupancy.MAXGAP
+	assert maps[2, 1, 12, 16] == min(1.0, occupancy.MAXGAP)
+	assert maps[2, 1, 22, 8] == 0
+
+
+def test_navigatingOnly(tmp_path):
+	rows = [
+		'Start collect',
+		(0.0, 1.0, 1.0, 0.0),
+		'cone Collected Initial',
+		#instruction screen between the trials
+		(0.1, -5.0, -5.0, 0.0),
+		'Start replace',
+		(0.2, 2.0, 2.0, 0.0),
+		(0.3, 20.0, 0.0, 0.0),
+		'Replaced cone, 1.0',
+		]
+	track = trackload.loadTracking(writeText(str(tmp_path / 'TRAIN_tracking_1_2_1.txt'), rows))
+	assert occupancy.navigating(track).tolist() == [True, False, True, True]
+	maps = occupancy.trackMaps(track, bins=29, radius=14.5)
+	#TRAIN samples take the file's context; the sample outside the arena is not binned
+	assert maps[1, 0].sum() == 2 and maps[1, 0, 15, 15] == 1 and maps[1, 0, 16, 16] == 1
+	assert maps[0].sum() == 0 and maps[2].sum() == 0
+
+
+def test_groupMaps():
+	a = numpy.zeros((3, 2, 2, 2))
+	b = numpy.zeros((3, 2, 2, 2))
+	a[0, 1, 0, 0] = 3.0
+	a[0, 1, 1, 1] = 1.0
+	b[0, 1, 1, 1] = 10.0
+	b[1, 1, 0, 1] = 2.0
+	group = occupancy.groupMaps({'1': a, '2': b})
+	#each subject's dwell as proportions of its own time in the context, so both weigh the same
+	assert group[0].tolist() == [[0.375, 0.0], [0.0, 0.625]]
+	#only subject 2 was in context 2; nobody was in context 3
+	assert group[1].tolist() == [[0.0, 1.0], [0.0, 0.0]]
+	assert numpy.isnan(group[2]).all()
+	assert occupancy.groupMaps({}) is None
+
+
+def test_fileMapsCache(tmp_path, monkeypatch):
+	fname = writeText(str(tmp_path / 'TEST_tracking_1_1.txt'), TEST_ROWS)
+	cacheRoot = str(tmp_path / 'cache')
+	loads = []
+	load = trackload.loadTracking
+	monkeypatch.setattr(trackload, 'loadTracking', lambda f: loads.append(f) or load(f))
+	maps = occupancy.fileMaps(fname, cacheRoot=cacheRoot)
+	#touched or copied, the contents are the same, so the cached maps are used
+	st = os.stat(fname)
+	os.utime(fname, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+	copy = str(tmp_path / 'copy' / 'TEST_tracking_1_1.txt')
+	os.makedirs(os.path.dirname(copy))
+	shutil.copy(fname, copy)
+	assert numpy.array_equal(occupancy.fileMaps(fname, cacheRoot=cacheRoot), maps)
+	assert numpy.array_equal(occupancy.fileMaps(copy, cacheRoot=cacheRoot), maps)
+	assert len(loads) == 1
+	#other bins or other contents are binned again
+	occupancy.fileMaps(fname, bins=15, cacheRoot=cacheRoot)
+	writeText(fname, TEST_ROWS[:5])
+	assert occupancy.fileMaps(fname, cacheRoot=cacheRoot)[2].sum() == 0
+	assert len(loads) == 3
+
+
+def test_studyMaps(tmp_path):
+	data = tmp_path / 'TestingData'
+	data.mkdir()
+	writeText(str(data / 'TEST_tracking_1_1.txt'), TEST_ROWS)
+	writeText(str(data / 'TEST_tracking_1_2.txt'), TEST_ROWS[:5])
+	runs, subjects = occupancy.studyMaps([str(data)], 'TEST', jobs=1)
+	assert sorted(runs) == [('1', 1), ('1', 2)]
+	assert numpy.array_equal(subjects['1'], runs[('1', 1)] + runs[('1', 2)])
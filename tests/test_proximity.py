@@ -0,0 +1,71 @@
+"""
+Tests for conmem.proximity.ProximityEngine against a brute-force check of the view against every armed sensor box.
+"""
+
+#Other libs
+import numpy
+
+from conmem import clock
+from conmem import proximity
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+class View(object):
+
+	def __init__(self):
+		self.position = [0.0, 0.0, 0.0]
+
+	def getPosition(self):
+		return list(self.position)
+
+
+def test_matchesBruteForce():
+	rng = numpy.random.default_rng(3)
+	view = View()
+	engine = proximity.ProximityEngine(view, clock.Clock())
+	#name -> (half x, half z, offset x, offset z, loc)
+	boxes = {}
+	for i in range(6):
+		halfX, halfZ = rng.uniform(0.2, 1.5, 2)
+		offsetX, offsetZ = rng.uniform(-0.5, 0.5, 2)
+		loc = [rng.uniform(-10, 10), 0.0, rng.uniform(-10, 10)]
+		engine.addFootprint('obj%d' % i, halfX, halfZ, offsetX, offsetZ)
+		boxes['obj%d' % i] = (halfX, halfZ, offsetX, offsetZ, loc)
+	entered = []
+	engine.onEnter(lambda name: entered.append(name))
+	armed = set(boxes)
+	for name in armed:
+		engine.arm(name, boxes[name][4])
+	expected = []
+	for step in range(5000):
+		view.position = [rng.uniform(-12, 12), 1.8, rng.uniform(-12, 12)]
+		#brute force: the view is inside the box centred on the object's location plus the box offset
+		inside = sorted(name for name in armed if abs(view.position[0] - boxes[name][4][0] - boxes[name][2]) <= boxes[name][0]
+			and abs(view.position[2] - boxes[name][4][2] - boxes[name][3]) <= boxes[name][1])
+		expected.extend(inside)
+		armed -= set(inside)
+		engine.update()
+		assert sorted(entered[len(expected) - len(inside):]) == inside
+	assert entered and sorted(entered) == sorted(expected)
+	#each object fires once, then stays disarmed until armed again
+	assert len(set(entered)) == len(entered)
+
+
+def test_entry():
+	view = View()
+	engine = proximity.ProximityEngine(view, clock.Clock())
+	engine.addFootprint('cone', 0.5, 1.0, 0.25, -0.25)
+	engine.arm('cone', [4.0, 0.0, 2.0])
+	assert engine.signals['cone'].center == [4.25, 0.0, 1.75]
+	view.position = [4.8, 0.0, 1.75]
+	engine.update()
+	assert engine.lastEntry('cone') is None
+	view.position = [4.7, 0.0, 0.8]
+	engine.update()
+	armedAt, enteredAt, frame = engine.lastEntry('cone')
+	assert enteredAt >= armedAt
+	assert engine.signals['cone'].count == 1 and engine.signals['cone'].center is None
+	assert engine.armed == {}
@@ -0,0 +1,77 @@
+"""
+Tests for conmem.resample: linear interpolation onto the grid, yaw unwrapping, teleports, and grid times outside the recording.
+"""
+
+#Other libs
+import numpy
+import pytest
+
+from conmem import resample
+from conmem import trackload
+from test_trackload import TEST_ROWS, writeText
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+def pose(rows):
+	"""POSE array from (t, x, z, yaw, trial) rows."""
+	return numpy.array([tuple(r) for r in rows], dtype=trackload.POSE)
+
+
+def test_makeGrid():
+	p = pose([(0.0, 0, 0, 0, 0), (5.0, 0, 0, 0, 0)])
+	assert resample.makeGrid(2.0, pose=p).tolist() == [0.0, 2.0, 4.0]
+	#a stop on the grid is included despite rounding
+	assert resample.makeGrid(0.1, 0.0, 0.3).tolist() == pytest.approx([0.0, 0.1, 0.2, 0.3])
+
+
+def test_interpolation():
+	p = pose([(0.0, 0.0, 0.0, 0.0, 1), (1.0, 1.0, 0.0, 10.0, 1), (2.0, 1.0, 2.0, 20.0, 2)])
+	grid = resample.resample(p, numpy.array([0.0, 0.5, 1.5, 2.0]))
+	assert grid['x'].tolist() == [0.0, 0.5, 1.0, 1.0]
+	assert grid['z'].tolist() == [0.0, 0.0, 1.0, 2.0]
+	assert grid['yaw'].tolist() == [0.0, 5.0, 15.0, 20.0]
+	#the trial of the sample at or before each grid time, the last sample's included
+	assert grid['trial'].tolist() == [1, 1, 1, 2]
+	#distance walked per second between grid times
+	assert grid['speed'].tolist() == [0.0, 1.0, 1.5, 2.0]
+	assert grid['valid'].all()
+
+
+def test_yawUnwrapped():
+	p = pose([(0.0, 0, 0, 350.0, 1), (1.0, 0, 0, 10.0, 1), (2.0, 0, 0, 30.0, 1)])
+	grid = resample.resample(p, numpy.array([0.5, 1.0, 2.0]))
+	#through 360, not back through 180
+	assert grid['yaw'].tolist() == pytest.approx([360.0, 370.0, 390.0])
+	assert resample.yawWrapped(grid['yaw']).tolist() == pytest.approx([0.0, 10.0, 30.0])
+
+
+def test_teleport():
+	p = pose([(0.0, 0.0, 0.0, 0, 1), (1.0, 10.0, 0.0, 0, 1), (2.0, 11.0, 0.0, 0, 1)])
+	grid = resample.resample(p, numpy.array([0.0, 0.5, 1.0, 1.5]))
+	#inside the jump the sample before it is held, and the jump is not walked
+	assert grid['x'].tolist() == [0.0, 0.0, 10.0, 10.5]
+	assert grid['speed'].tolist() == [0.0, 0.0, 0.0, 1.0]
+
+
+def test_outsideRecording():
+	p = pose([(1.0, 0, 0, 0, 1), (2.0, 1, 0, 0, 1)])
+	grid = resample.resample(p, numpy.array([0.0, 1.0, 2.0, 3.0]))
+	assert grid['valid'].tolist() == [False, True, True, False]
+	assert numpy.isnan(grid['x'][[0, 3]]).all() and grid['trial'].tolist() == [0, 1, 1, 0]
+	empty = resample.resample(pose([]), numpy.array([0.0, 1.0]))
+	assert not empty['valid'].any() and numpy.isnan(empty['x']).all()
+
+
+def test_fileGrid(tmp_path):
+	fname = writeText(str(tmp_path / 'TEST_tracking_1_1.txt'), TEST_ROWS)
+	grid = resample.fileGrid(fname, 4.0, cacheRoot=str(tmp_path / 'cache'))
+	assert grid['t'].tolist() == [0.0, 4.0, 8.0, 12.0, 16.0, 20.0]
+	assert grid['valid'].tolist() == [False, True, True, True, True, True]
+	assert resample.fileGrid(fname, 4.0, cacheRoot=str(tmp_path / 'cache')).tobytes() == grid.tobytes()
+	resample.writeGrid(str(tmp_path / 'grid.tsv'), grid)
+	with open(str(tmp_path / 'grid.tsv')) as f:
+		lines = f.read().splitlines()
+	assert lines[0].split('\t') == resample.COLUMNS and len(lines) == 6
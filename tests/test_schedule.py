@@ -0,0 +1,67 @@
+"""
+Tests for conmem.schedule: seeded generation, block structure, object balance and the validation of saved schedules.
+"""
+
+#Other libs
+import numpy
+import pytest
+
+from conmem import schedule
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+def test_seeded():
+	a = schedule.makeSchedule(20, [5, 1, 2])
+	b = schedule.makeSchedule(20, [5, 1, 2])
+	c = schedule.makeSchedule(20, [5, 1, 3])
+	assert numpy.array_equal(a[0], b[0]) and numpy.array_equal(a[1], b[1])
+	assert not (numpy.array_equal(a[0], c[0]) and numpy.array_equal(a[1], c[1]))
+
+
+def test_blocks():
+	contexts, objects = schedule.makeSchedule(20, 7)
+	assert len(contexts) == 10 * 2 + 10 * 3
+	start = 0
+	for block in range(20):
+		size = 3 if block % 2 else 2
+		assert sorted(contexts[start:start + size].tolist()) == list(range(1, size + 1))
+		start += size
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_balanced(seed):
+	contexts, objects = schedule.makeSchedule(20, seed)
+	schedule.validateSchedule(contexts, objects)
+	for context in (1, 2, 3):
+		counts = numpy.bincount(objects[contexts == context], minlength=4)
+		assert counts.max() - counts.min() <= 1
+
+
+def test_validateRejects():
+	with pytest.raises(ValueError):
+		schedule.validateSchedule([1, 1], [0])
+	with pytest.raises(ValueError):
+		schedule.validateSchedule([4], [0])
+	with pytest.raises(ValueError):
+		schedule.validateSchedule([1], [4])
+	#the same object twice in a context before the others have been used
+	with pytest.raises(ValueError):
+		schedule.validateSchedule([1, 1, 1], [0, 0, 1])
+	#balanced within each context, whatever the other contexts do
+	schedule.validateSchedule([1, 2, 1, 2], [0, 0, 1, 1])
+
+
+def test_saveLoad(tmp_path):
+	contexts, objects = schedule.makeSchedule(6, 3)
+	fname = schedule.scheduleFileName(str(tmp_path), 4, 2)
+	schedule.saveSchedule(fname, contexts, objects, 'seed 3 subject 4 run 2')
+	loaded = schedule.loadSchedule(fname)
+	assert numpy.array_equal(loaded[0], contexts) and numpy.array_equal(loaded[1], objects)
+
+
+def test_saveRejectsUnbalanced(tmp_path):
+	with pytest.raises(ValueError):
+		schedule.saveSchedule(str(tmp_path / 's.txt'), [1, 1, 1], [2, 2, 2])
@@ -0,0 +1,48 @@
+"""
+Tests for conmem.scoring: feedback levels on and around the thresholds, and the vectorized functions against the live ones.
+"""
+
+#Other libs
+import numpy
+import pytest
+
+from conmem import scoring
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+@pytest.mark.parametrize('error, level', [(0.0, 1), (2.999, 1), (3.0, 2), (4.5, 2), (5.0, 3), (7.0, 4), (8.99, 4), (9.0, 5), (40.0, 5)])
+def test_feedbackLevel(error, level):
+	#an error exactly on a threshold gets the higher level
+	assert scoring.feedbackLevel(error) == level
+
+
+def test_feedbackLevelsMatchLive():
+	errors = numpy.concatenate([numpy.array(scoring.THRESHOLDS, dtype=float), numpy.linspace(0, 12, 241)])
+	assert scoring.feedbackLevels(errors).tolist() == [scoring.feedbackLevel(e) for e in errors.tolist()]
+
+
+def test_rescore():
+	errors = [2.0, 3.0, 6.0, 10.0]
+	levels = scoring.rescore(errors, [scoring.THRESHOLDS, (2, 4, 6, 8)])
+	assert levels.tolist() == [[1, 2, 3, 5], [2, 2, 4, 5]]
+
+
+def test_replaceErrorsMatchLive():
+	rng = numpy.random.default_rng(1)
+	responses = rng.uniform(-14, 14, (50, 3))
+	objects = rng.integers(0, 4, 50)
+	contexts = rng.integers(1, 3, 50)
+	errors, levels = scoring.scoreResponses(responses, objects, contexts)
+	for i in range(50):
+		target = scoring.OBJECT_LOCS[contexts[i] - 1][objects[i]]
+		error, level = scoring.computeError(target, responses[i].tolist())
+		#bit-identical, so live feedback and offline rescoring never disagree
+		assert errors[i] == error
+		assert levels[i] == level
+
+
+def test_targetLocations():
+	assert scoring.targetLocations([0, 3], [1, 2]).tolist() == [[-4.0, 9.0], [-10.0, -5.0]]
@@ -0,0 +1,91 @@
+"""
+Tests for conmem.sweep.RotationSweep: the yaw follows the frame timestamps, the sweep lasts its duration at any frame rate, and its logged
+start and end are on the frame timebase.
+"""
+
+#Other libs
+import pytest
+
+from conmem import clock
+from conmem import sweep
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+class View(object):
+
+	def __init__(self):
+		self.position = [3.0, 0.0, -2.0]
+		self.yaw = None
+
+	def getPosition(self):
+		return list(self.position)
+
+	def setPosition(self, position):
+		self.position = list(position)
+
+	def setEuler(self, yaw, pitch, roll):
+		self.yaw = yaw
+
+
+class Frames(object):
+	"""Frame stamps every period ns; the clock itself runs ahead of them by a fixed latency."""
+
+	def __init__(self, period, latency=3000000):
+		self.period = period
+		self.latency = latency
+		self.stamp = 0
+
+	def next(self):
+		self.stamp += self.period
+
+	def now(self):
+		return self.stamp + self.latency
+
+
+def run(rate):
+	view = View()
+	frames = Frames(int(1e9 / rate))
+	rotation = sweep.RotationSweep(view, clock.Clock(frames.now), 2.0, frameTime=lambda: frames.stamp)
+	frames.next()
+	rotation.start(90)
+	yaws = []
+	count = 0
+	while rotation.active:
+		frames.next()
+		#navigation input during the sweep does not move the view
+		view.position = [0.0, 0.0, 0.0]
+		rotation.update()
+		yaws.append(view.yaw)
+		count += 1
+	return view, rotation, yaws, count
+
+
+@pytest.mark.parametrize('rate', [60, 120, 144])
+def test_duration(rate):
+	view, rotation, yaws, frames = run(rate)
+	#the sweep ends on the first frame at or after its duration, whatever the frame rate
+	assert rotation.endTime - rotation.startTime == frames * int(1e9 / rate) >= 2e9
+	assert frames == int(-(-2e9 // int(1e9 / rate)))
+	assert yaws[-1] == 450
+	assert all(a < b for a, b in zip(yaws, yaws[1:]))
+	assert view.position == [3.0, 0.0, -2.0]
+
+
+def test_frameTimebase():
+	view, rotation, yaws, frames = run(60)
+	#start and end are both frame stamps, not clock reads, so the logged span is exactly the sweep shown
+	period = int(1e9 / 60)
+	assert rotation.startTime == period
+	assert rotation.endTime == (frames + 1) * period
+	assert yaws[0] == pytest.approx(90 + 360.0 * period / 2e9)
+
+
+def test_signal():
+	view, rotation, yaws, frames = run(60)
+	assert rotation.signal.count == 1
+	#updates after the end do nothing
+	rotation.update()
+	assert rotation.signal.count == 1 and view.yaw == 450
@@ -0,0 +1,135 @@
+"""
+Tests for conmem.trackload on small synthetic tracking files, text (LF and CRLF) and binary.
+"""
+
+# Generic /Built-in
+import os
+
+#Other libs
+import numpy
+import pytest
+
+from conmem import tracklog
+from conmem import trackload
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+#TRAIN run: one initial collect, then a replace followed by its feedback collect; pose rows are (t, x, z, yaw)
+TRAIN_ROWS = [
+	'Start collect',
+	(0.0, 1.0, 2.0, 10.0),
+	(0.1, 1.5, 2.5, 20.0),
+	'Entered cone, 0.15, 9, 0.12',
+	'cone Collected Initial',
+	'Start replace',
+	(0.2, -3.0, 4.0, 30.0),
+	(0.3, -3.5, 4.5, 40.0),
+	'Replaced cone, 2.5',
+	'Start collect',
+	(0.4, -4.0, 9.0, 50.0),
+	'Collected cone',
+	]
+
+#TEST run: a circle replace and a squircle replace with its logged sweep
+TEST_ROWS = [
+	'Start replace, circle',
+	(1.0, 0.0, 0.0, 0.0),
+	'Rotation, 1.0, 13.0',
+	(13.0, 1.0, 1.0, 5.0),
+	'Replaced circle, plant, 3.25',
+	'Start replace, squircle',
+	(20.0, 2.0, -2.0, 15.0),
+	(21.0, -6.0, 8.0, 25.0),
+	'Replaced squircle, pumpkin, 2, 7.5, 1.25',
+	]
+
+
+def writeText(fname, rows, newline='\n'):
+	with open(fname, 'w', newline='') as f:
+		for row in rows:
+			if isinstance(row, str):
+				f.write(row + newline)
+			else:
+				f.write('\t'.join(str(v) for v in row) + newline)
+	return fname
+
+
+def writeBinary(fname, rows):
+	writer = tracklog.openTrackWriter(fname, 'binary')
+	for row in rows:
+		if isinstance(row, str):
+			writer.event(row)
+		else:
+			writer.sample(*row)
+	writer.close()
+	return fname
+
+
+def test_parseTrackName():
+	assert trackload.parseTrackName('TRAIN_tracking_7_2_3.trk') == ('TRAIN', '7', 2, 3)
+	assert trackload.parseTrackName(os.path.join('a', 'TEST_tracking_12_4.txt')) == ('TEST', '12', 0, 4)
+	assert trackload.parseTrackName('TRAIN_tracking_7_3.txt') is None
+	assert trackload.parseTrackName('TEST_schedule_1_1.txt') is None
+
+
+def test_trainTrialSplit(tmp_path):
+	track = trackload.loadTracking(writeText(str(tmp_path / 'TRAIN_tracking_1_2_1.txt'), TRAIN_ROWS))
+	assert len(track.pose) == 5
+	#the feedback collect after the replace is part of the replace trial
+	assert track.trials['trial'].tolist() == [1, 2]
+	assert track.trials['replace'].tolist() == [False, True]
+	assert track.pose['trial'].tolist() == [1, 1, 2, 2, 2]
+	assert track.trials['start'].tolist() == [0, 2]
+	assert track.trials['stop'].tolist() == [2, 5]
+	assert track.trials['response'].tolist() == [-1, 4]
+	assert track.trials['object'].tolist() == [0, 0]
+	assert track.trials['context'].tolist() == [2, 2]
+	assert numpy.isnan(track.trials['error'][0]) and track.trials['error'][1] == 2.5
+	assert track.trials['entered'][0] == 0.15 and track.trials['latency'][0] == 0.12
+
+
+def test_testTrials(tmp_path):
+	track = trackload.loadTracking(writeText(str(tmp_path / 'TEST_tracking_1_1.txt'), TEST_ROWS))
+	trials = track.trials
+	assert trials['context'].tolist() == [1, 3]
+	assert trials['object'].tolist() == [2, 3]
+	assert trials['choice'].tolist() == [0, 2]
+	assert trials['error'].tolist() == [3.25, 7.5]
+	assert trials['error2'][1] == 1.25 and numpy.isnan(trials['error2'][0])
+	assert (trials['rotStart'][0], trials['rotEnd'][0]) == (1.0, 13.0)
+	assert numpy.isnan(trials['rotEnd'][1])
+
+
+@pytest.mark.parametrize('rows', [TRAIN_ROWS, TEST_ROWS])
+def test_crlfMatchesLf(tmp_path, rows):
+	(tmp_path / 'lf').mkdir()
+	(tmp_path / 'crlf').mkdir()
+	fname = 'TEST_tracking_1_1.txt' if rows is TEST_ROWS else 'TRAIN_tracking_1_1_1.txt'
+	lf = trackload.loadTracking(writeText(str(tmp_path / 'lf' / fname), rows))
+	crlf = trackload.loadTracking(writeText(str(tmp_path / 'crlf' / fname), rows, '\r\n'))
+	assert numpy.array_equal(lf.pose, crlf.pose)
+	assert lf.events.tobytes() == crlf.events.tobytes()
+	assert lf.trials.tobytes() == crlf.trials.tobytes()
+
+
+@pytest.mark.parametrize('rows', [TRAIN_ROWS, TEST_ROWS])
+def test_binaryMatchesText(tmp_path, rows):
+	base = 'TEST_tracking_1_1' if rows is TEST_ROWS else 'TRAIN_tracking_1_1_1'
+	text = trackload.loadTracking(writeText(str(tmp_path / (base + '.txt')), rows))
+	binary = trackload.loadTracking(writeBinary(str(tmp_path / (base + '.trk')), rows))
+	assert numpy.array_equal(text.pose, binary.pose)
+	assert text.trials.tobytes() == binary.trials.tobytes()
+	#and the binary log converts back to the same text
+	converted = tracklog.toText(str(tmp_path / (base + '.trk')), str(tmp_path / 'converted.txt'))
+	with open(converted) as a, open(str(tmp_path / (base + '.txt'))) as b:
+		assert a.read() == b.read()
+
+
+def test_emptyFile(tmp_path):
+	fname = tmp_path / 'TEST_tracking_1_1.txt'
+	fname.write_bytes(b'')
+	track = trackload.loadTracking(str(fname))
+	assert len(track.pose) == 0 and len(track.trials) == 0
@@ -0,0 +1,86 @@
+"""
+Tests for conmem.tracklog.ThreadedTrackWriter: dropped records when the queue is full, fsync at trial boundaries, and the flush at close.
+"""
+
+# Generic /Built-in
+import threading
+
+#Other libs
+import numpy
+
+from conmem import tracklog
+from conmem import trackload
+
+# Owned
+__author__ = "Josh Julian"
+__license__ = "MIT"
+
+
+class Calls(tracklog.TrackWriter):
+	"""Writer that records its calls; an event 'block' holds the writer thread until release is set."""
+
+	def __init__(self):
+		self.fname = 'calls'
+		self.calls = []
+		self.blocked = threading.Event()
+		self.release = threading.Event()
+
+	def sample(self, t, x, z, yaw):
+		self.calls.append(('sample', t))
+
+	def event(self, text, t=0.0):
+		if text == 'block':
+			self.blocked.set()
+			self.release.wait(5)
+		self.calls.append(('event', text))
+
+	def flush(self):
+		self.calls.append(('flush',))
+
+	def sync(self):
+		self.calls.append(('sync',))
+
+	def close(self):
+		self.calls.append(('close',))
+
+
+def test_syncAtTrialBoundaries():
+	inner = Calls()
+	writer = tracklog.ThreadedTrackWriter(inner)
+	for text in ['Start replace, circle', 'Replaced circle, plant, 2.0', 'Start collect', 'Collected plant', 'cone Collected Initial']:
+		writer.event(text)
+	writer.close()
+	assert inner.calls == [('event', 'Start replace, circle'), ('sync',), ('event', 'Replaced circle, plant, 2.0'), ('event', 'Start collect'),
+		('event', 'Collected plant'), ('sync',), ('event', 'cone Collected Initial'), ('sync',), ('sync',), ('close',)]
+
+
+def test_dropped():
+	inner = Calls()
+	writer = tracklog.ThreadedTrackWriter(inner, maxQueue=2)
+	writer.event('block')
+	assert inner.blocked.wait(5)
+	#the writer thread is held; two calls fit in the queue, the rest are dropped and their records counted
+	writer.sample(1.0, 0.0, 0.0, 0.0)
+	writer.event('kept')
+	writer.sample(2.0, 0.0, 0.0, 0.0)
+	writer.samples(numpy.zeros(5), numpy.zeros(5), numpy.zeros(5), numpy.zeros(5))
+	writer.flush()
+	assert writer.dropped == 6
+	inner.release.set()
+	writer.close()
+	assert inner.calls == [('event', 'block'), ('sample', 1.0), ('event', 'kept'), ('sync',), ('close',)]
+
+
+def test_closeFlushes(tmp_path):
+	fname = str(tmp_path / 'TEST_tracking_1_1.trk')
+	writer = tracklog.openTrackWriter(fname, 'binary', background=True)
+	writer.event('Start replace, circle', 0.0)
+	t = numpy.arange(10) * 0.1
+	writer.samples(t, t + 1, t + 2, t + 3)
+	writer.event('Replaced circle, plant, 2.5', 1.0)
+	#nothing has filled a block yet; close() must still get every record to the file
+	writer.close()
+	track = trackload.loadTracking(fname)
+	assert numpy.array_equal(track.pose['t'], t)
+	assert track.trials['error'].tolist() == [2.5]
+	assert writer.dropped == 0 and writer.error is None